@@ -21,6 +21,9 @@ from app.models.client import Client
 from app.models.rate import Rate
 from app.models.shipment import Shipment
 from app.models.expense import Expense
+from app.models.shipment_finance import ShipmentFinance
+from app.models.data_version import DataVersion
+from app.models.finance_daily import FinanceDaily
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
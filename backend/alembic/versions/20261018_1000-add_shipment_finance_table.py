@@ -0,0 +1,64 @@
+"""Add shipment_finance table
+
+Revision ID: add_shipment_finance
+Revises: add_client_number
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_shipment_finance'
+down_revision: Union[str, None] = 'add_client_number'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'shipment_finance',
+        sa.Column('shipment_id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('revenue', sa.Float, nullable=False, server_default='0'),
+        sa.Column('cost_of_goods', sa.Float, nullable=False, server_default='0'),
+        sa.Column('total_expenses', sa.Float, nullable=False, server_default='0'),
+        sa.Column('profit', sa.Float, nullable=False, server_default='0'),
+        sa.Column('margin_percent', sa.Float, nullable=False, server_default='0'),
+        sa.Column('version', sa.Integer, nullable=False, server_default='1'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(['shipment_id'], ['shipments.id'], ondelete='CASCADE'),
+    )
+
+    # Backfill finance for existing shipments
+    op.execute("""
+        INSERT INTO shipment_finance (shipment_id, revenue, cost_of_goods, total_expenses, profit, margin_percent, version)
+        SELECT
+            f.shipment_id,
+            f.revenue,
+            f.cost_of_goods,
+            f.total_expenses,
+            f.revenue - f.cost_of_goods - f.total_expenses,
+            CASE WHEN f.revenue > 0
+                THEN (f.revenue - f.cost_of_goods - f.total_expenses) / f.revenue * 100
+                ELSE 0 END,
+            1
+        FROM (
+            SELECT
+                s.id AS shipment_id,
+                s.quantity * r.sell_rate AS revenue,
+                s.quantity * r.buy_rate AS cost_of_goods,
+                COALESCE(SUM(e.amount), 0) AS total_expenses
+            FROM shipments s
+            JOIN rates r ON r.id = s.rate_id
+            LEFT JOIN expenses e ON e.shipment_id = s.id
+            GROUP BY s.id, r.id
+        ) f
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('shipment_finance')
@@ -0,0 +1,33 @@
+"""Add data_versions table
+
+Revision ID: add_data_versions
+Revises: add_shipment_finance
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_data_versions'
+down_revision: Union[str, None] = 'add_shipment_finance'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'data_versions',
+        sa.Column('name', sa.String(50), primary_key=True),
+        sa.Column('version', sa.BigInteger, nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+    op.execute("INSERT INTO data_versions (name, version) VALUES ('dashboard', 0)")
+
+
+def downgrade() -> None:
+    op.drop_table('data_versions')
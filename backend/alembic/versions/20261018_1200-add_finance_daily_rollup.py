@@ -0,0 +1,61 @@
+"""Add finance_daily rollup table
+
+Revision ID: add_finance_daily
+Revises: add_data_versions
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_finance_daily'
+down_revision: Union[str, None] = 'add_data_versions'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'finance_daily',
+        sa.Column('day', sa.Date, primary_key=True),
+        sa.Column('client_id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('supplier_id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('cargo_type', sa.String(255), primary_key=True),
+        sa.Column(
+            'status',
+            postgresql.ENUM('planned', 'in_transit', 'delivered', name='shipmentstatusenum', create_type=False),
+            primary_key=True
+        ),
+        sa.Column('shipment_count', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('quantity', sa.Float, nullable=False, server_default='0'),
+        sa.Column('revenue', sa.Float, nullable=False, server_default='0'),
+        sa.Column('cost_of_goods', sa.Float, nullable=False, server_default='0'),
+        sa.Column('total_expenses', sa.Float, nullable=False, server_default='0'),
+        sa.Column('profit', sa.Float, nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['client_id'], ['clients.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['supplier_id'], ['suppliers.id'], ondelete='CASCADE'),
+    )
+
+    # Backfill from shipment_finance
+    op.execute("""
+        INSERT INTO finance_daily (
+            day, client_id, supplier_id, cargo_type, status,
+            shipment_count, quantity, revenue, cost_of_goods, total_expenses, profit
+        )
+        SELECT
+            date(s.created_at), s.client_id, s.supplier_id, s.cargo_type, s.status,
+            COUNT(*), SUM(s.quantity), SUM(f.revenue), SUM(f.cost_of_goods),
+            SUM(f.total_expenses), SUM(f.profit)
+        FROM shipments s
+        JOIN shipment_finance f ON f.shipment_id = s.id
+        GROUP BY date(s.created_at), s.client_id, s.supplier_id, s.cargo_type, s.status
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('finance_daily')
@@ -0,0 +1,40 @@
+"""Index shipment_finance profit and margin_percent
+
+The indexes are built CONCURRENTLY in an autocommit block: shipment_finance
+is refreshed on every shipment and expense write, which a plain CREATE
+INDEX would block until the build ends.
+
+Revision ID: index_finance_profit_margin
+Revises: add_finance_daily
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'index_finance_profit_margin'
+down_revision: Union[str, None] = 'add_finance_daily'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_shipment_finance_profit', 'shipment_finance', ['profit'], postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_shipment_finance_margin_percent', 'shipment_finance', ['margin_percent'],
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_shipment_finance_margin_percent', table_name='shipment_finance', postgresql_concurrently=True
+        )
+        op.drop_index('ix_shipment_finance_profit', table_name='shipment_finance', postgresql_concurrently=True)
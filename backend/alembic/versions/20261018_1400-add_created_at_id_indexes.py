@@ -0,0 +1,46 @@
+"""Add (created_at, id) indexes for keyset pagination
+
+Built CONCURRENTLY outside the migration transaction, so shipments and the
+other large tables keep taking writes during the build. A failed build
+leaves an INVALID index: drop it and re-run the migration.
+
+Revision ID: add_created_at_id_indexes
+Revises: index_finance_profit_margin
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_created_at_id_indexes'
+down_revision: Union[str, None] = 'index_finance_profit_margin'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('shipments', 'clients', 'suppliers', 'rates', 'expenses', 'orders')
+
+
+def _existing_tables():
+    # orders predates the migrations and may be missing on fresh databases
+    inspector = sa.inspect(op.get_bind())
+    return [table for table in TABLES if inspector.has_table(table)]
+
+
+def upgrade() -> None:
+    tables = _existing_tables()
+    with op.get_context().autocommit_block():
+        for table in tables:
+            op.create_index(
+                f'ix_{table}_created_at_id', table, ['created_at', 'id'], postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    tables = _existing_tables()
+    with op.get_context().autocommit_block():
+        for table in tables:
+            op.drop_index(f'ix_{table}_created_at_id', table_name=table, postgresql_concurrently=True)
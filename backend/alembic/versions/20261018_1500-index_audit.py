@@ -0,0 +1,70 @@
+"""Index audit: add foreign key / report indexes, drop redundant ones
+
+Adds the indexes hot finance, report and list queries rely on and drops
+indexes duplicated by primary keys and unique constraints. Indexes are
+built and dropped CONCURRENTLY, outside the migration transaction, so
+writes are not blocked. If a concurrent build fails it leaves an INVALID
+index behind: drop it and re-run the migration.
+
+Revision ID: index_audit
+Revises: add_created_at_id_indexes
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'index_audit'
+down_revision: Union[str, None] = 'add_created_at_id_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# name -> (table, columns, extra create_index kwargs)
+NEW_INDEXES = {
+    'ix_expenses_shipment_id': ('expenses', ['shipment_id'], {'postgresql_include': ['amount']}),
+    'ix_shipments_client_id_created_at': ('shipments', ['client_id', 'created_at'], {}),
+    'ix_shipments_supplier_id_created_at': ('shipments', ['supplier_id', 'created_at'], {}),
+    'ix_shipments_rate_id': ('shipments', ['rate_id'], {}),
+    'ix_rates_supplier_id_cargo_type': ('rates', ['supplier_id', 'cargo_type'], {}),
+    'ix_rates_client_id': ('rates', ['client_id'], {'postgresql_where': sa.text('client_id IS NOT NULL')}),
+    'ix_finance_daily_client_id_day': ('finance_daily', ['client_id', 'day'], {}),
+    'ix_finance_daily_supplier_id_day': ('finance_daily', ['supplier_id', 'day'], {}),
+}
+
+# Duplicates of primary keys / unique constraints: name -> (table, columns)
+REDUNDANT_INDEXES = {
+    'ix_suppliers_id': ('suppliers', ['id']),
+    'ix_clients_id': ('clients', ['id']),
+    'ix_clients_client_number': ('clients', ['client_number']),
+    'ix_rates_id': ('rates', ['id']),
+    'ix_shipments_id': ('shipments', ['id']),
+    'ix_shipments_shipment_code': ('shipments', ['shipment_code']),
+    'ix_expenses_id': ('expenses', ['id']),
+    'ix_orders_id': ('orders', ['id']),
+}
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, (table, columns, kwargs) in NEW_INDEXES.items():
+            op.create_index(name, table, columns, postgresql_concurrently=True, **kwargs)
+
+        for name in REDUNDANT_INDEXES:
+            # ix_orders_id only exists where orders was created outside the migrations
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    with op.get_context().autocommit_block():
+        for name, (table, columns) in REDUNDANT_INDEXES.items():
+            if inspector.has_table(table):
+                op.create_index(name, table, columns, postgresql_concurrently=True)
+
+        for name, (table, _, _) in NEW_INDEXES.items():
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
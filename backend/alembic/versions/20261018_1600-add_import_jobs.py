@@ -0,0 +1,50 @@
+"""Add import_jobs table
+
+Revision ID: add_import_jobs
+Revises: index_audit
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_import_jobs'
+down_revision: Union[str, None] = 'index_audit'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'import_jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('entity', sa.Enum('rates', 'shipments', 'expenses', name='importentityenum'), nullable=False),
+        sa.Column('filename', sa.String(255), nullable=False),
+        sa.Column('checksum', sa.String(64), nullable=False),
+        sa.Column(
+            'status',
+            sa.Enum('pending', 'running', 'completed', 'failed', name='importstatusenum'),
+            nullable=False,
+            server_default='pending'
+        ),
+        sa.Column('rows_processed', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('rows_imported', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('rows_failed', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('errors', sa.JSON, nullable=False, server_default='[]'),
+        sa.Column('error', sa.Text, nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index('ix_import_jobs_entity_checksum', 'import_jobs', ['entity', 'checksum'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_import_jobs_entity_checksum', table_name='import_jobs')
+    op.drop_table('import_jobs')
+    op.execute('DROP TYPE importstatusenum')
+    op.execute('DROP TYPE importentityenum')
@@ -0,0 +1,36 @@
+"""Add client_number_seq sequence
+
+Client numbers come from this sequence instead of MAX(client_number) + 1.
+The sequence starts after the highest existing CL-XXXX number.
+
+Revision ID: add_client_number_seq
+Revises: add_import_jobs
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_client_number_seq'
+down_revision: Union[str, None] = 'add_import_jobs'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE SEQUENCE client_number_seq')
+    op.execute("""
+        SELECT setval(
+            'client_number_seq',
+            COALESCE((SELECT MAX(substring(client_number FROM '^CL-([0-9]+)$')::bigint) FROM clients), 0) + 1,
+            false
+        )
+    """)
+
+
+def downgrade() -> None:
+    op.execute('DROP SEQUENCE client_number_seq')
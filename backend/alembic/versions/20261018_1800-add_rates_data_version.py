@@ -0,0 +1,29 @@
+"""Add rates data version
+
+Bumped on every rate change; the in-process rate resolver index is rebuilt
+when it moves.
+
+Revision ID: add_rates_data_version
+Revises: add_client_number_seq
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_rates_data_version'
+down_revision: Union[str, None] = 'add_client_number_seq'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("INSERT INTO data_versions (name, version) VALUES ('rates', 0) ON CONFLICT (name) DO NOTHING")
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM data_versions WHERE name = 'rates'")
@@ -1,8 +1,9 @@
 from sqladmin import ModelView, BaseView, expose
+from sqladmin.pagination import Pagination
 from starlette.requests import Request
 from starlette.responses import Response
-from sqlalchemy.orm import joinedload, selectinload
-from sqlalchemy import select
+from sqlalchemy.orm import joinedload, selectinload, contains_eager
+from sqlalchemy import select, func
 from app.models.supplier import Supplier
 from app.models.client import Client
 from app.models.rate import Rate
@@ -10,6 +11,17 @@ from app.models.shipment import Shipment
 from app.models.expense import Expense
 
 
+def _float_params(request: Request, *names):
+    """Read optional float query parameters (invalid values are ignored)"""
+    values = {}
+    for name in names:
+        try:
+            values[name] = float(request.query_params[name])
+        except (KeyError, ValueError):
+            values[name] = None
+    return values
+
+
 class SupplierAdmin(ModelView, model=Supplier):
     name = "Поставщик"
     name_plural = "Поставщики"
@@ -27,7 +39,8 @@ class SupplierAdmin(ModelView, model=Supplier):
     column_searchable_list = [Supplier.name, Supplier.country, Supplier.city]
     column_sortable_list = [Supplier.name, Supplier.country, Supplier.created_at]
 
-    column_details_exclude_list = [Supplier.id]
+    # Unbounded related lists: shown on the rate and shipment pages instead
+    column_details_exclude_list = [Supplier.id, "rates", "shipments"]
 
     form_columns = [
         Supplier.name,
@@ -67,7 +80,8 @@ class ClientAdmin(ModelView, model=Client):
     column_searchable_list = [Client.client_number, Client.name, Client.company_name]
     column_sortable_list = [Client.client_number, Client.name, Client.company_name, Client.created_at]
 
-    column_details_exclude_list = [Client.id]
+    # Unbounded related lists: shown on the rate and shipment pages instead
+    column_details_exclude_list = [Client.id, "rates", "shipments"]
 
     form_columns = [
         Client.name,
@@ -110,11 +124,12 @@ class RateAdmin(ModelView, model=Rate):
     ]
 
     column_searchable_list = [Rate.cargo_type, Rate.currency, Rate.unit]
-    column_sortable_list = [Rate.cargo_type, Rate.buy_rate, Rate.sell_rate, Rate.created_at]
+    column_sortable_list = [Rate.cargo_type, Rate.buy_rate, Rate.sell_rate, "margin", "margin_percent", Rate.created_at]
 
     column_filters = [Rate.cargo_type, Rate.supplier_id, Rate.client_id, Rate.currency]
 
-    column_details_exclude_list = [Rate.id]
+    # Unbounded related list: shown on the shipment pages instead
+    column_details_exclude_list = [Rate.id, "shipments"]
 
     form_columns = [
         Rate.cargo_type,
@@ -175,10 +190,30 @@ class RateAdmin(ModelView, model=Rate):
     column_formatters = {
         Rate.supplier_id: _safe_supplier_name,
         Rate.client_id: _safe_client_number,
-        "margin": lambda m, a: f"${(m.sell_rate - m.buy_rate):.2f}" if m.sell_rate and m.buy_rate else "—",
-        "margin_percent": lambda m, a: f"{((m.sell_rate - m.buy_rate) / m.buy_rate * 100):.1f}%" if m.sell_rate and m.buy_rate and m.buy_rate > 0 else "—"
+        "margin": lambda m, a: f"${m.margin:.2f}" if m.sell_rate and m.buy_rate else "—",
+        "margin_percent": lambda m, a: f"{m.margin_percent:.1f}%" if m.margin_percent is not None else "—"
     }
 
+    def _margin_filters(self, request: Request):
+        """?min_margin=&max_margin=&min_margin_percent=&max_margin_percent= filters, applied in SQL"""
+        params = _float_params(request, "min_margin", "max_margin", "min_margin_percent", "max_margin_percent")
+        criteria = []
+        if params["min_margin"] is not None:
+            criteria.append(Rate.margin >= params["min_margin"])
+        if params["max_margin"] is not None:
+            criteria.append(Rate.margin <= params["max_margin"])
+        if params["min_margin_percent"] is not None:
+            criteria.append(Rate.margin_percent >= params["min_margin_percent"])
+        if params["max_margin_percent"] is not None:
+            criteria.append(Rate.margin_percent <= params["max_margin_percent"])
+        return criteria
+
+    def list_query(self, request: Request):
+        return select(Rate).where(*self._margin_filters(request))
+
+    def count_query(self, request: Request):
+        return select(func.count(Rate.id)).where(*self._margin_filters(request))
+
     def scaffold_list_query(self):
         """Override to eagerly load relationships"""
         stmt = select(self.model).options(
@@ -212,6 +247,10 @@ class ShipmentAdmin(ModelView, model=Shipment):
     column_sortable_list = [
         Shipment.shipment_code,
         Shipment.quantity,
+        "revenue",
+        "total_expenses",
+        "profit",
+        "margin_percent",
         Shipment.status,
         Shipment.departure_date,
         Shipment.created_at
@@ -221,7 +260,7 @@ class ShipmentAdmin(ModelView, model=Shipment):
 
     column_filters = [Shipment.client_id, Shipment.supplier_id, Shipment.status, Shipment.cargo_type]
 
-    column_details_exclude_list = [Shipment.id]
+    column_details_exclude_list = [Shipment.id, Shipment.finance]
 
     form_columns = [
         Shipment.shipment_code,
@@ -280,24 +319,61 @@ class ShipmentAdmin(ModelView, model=Shipment):
         "updated_at": "Обновлено"
     }
 
+    EMPTY_FINANCE = {
+        "revenue": 0,
+        "cost_of_goods": 0,
+        "total_expenses": 0,
+        "profit": 0,
+        "margin_percent": 0
+    }
+
     def _get_finance_data(self, model):
-        """Helper to get finance data for a shipment"""
-        from app.services.finance import calculate_shipment_finance
-        from app.core.database import SessionLocal
+        """Helper to get finance data for a shipment (prefetched by list())"""
+        return getattr(model, "_finance", None) or ShipmentAdmin.EMPTY_FINANCE
+
+    def _finance_filters(self, request: Request):
+        """?min_profit=&max_profit=&min_margin_percent=&max_margin_percent= filters, applied in SQL"""
+        from app.services.finance import shipment_finance_criteria
+
+        return shipment_finance_criteria(**_float_params(
+            request, "min_profit", "max_profit", "min_margin_percent", "max_margin_percent"
+        ))
+
+    def list_query(self, request: Request):
+        """Join stored finance so finance columns can be sorted and filtered in SQL"""
+        return (
+            select(Shipment)
+            .outerjoin(Shipment.finance)
+            .options(contains_eager(Shipment.finance))
+            .where(*self._finance_filters(request))
+        )
 
-        db = SessionLocal()
-        try:
-            return calculate_shipment_finance(model.id, db)
-        except Exception:
-            return {
-                "revenue": 0,
-                "cost_of_goods": 0,
-                "total_expenses": 0,
-                "profit": 0,
-                "margin_percent": 0
-            }
-        finally:
-            db.close()
+    def count_query(self, request: Request):
+        return (
+            select(func.count(Shipment.id))
+            .outerjoin(Shipment.finance)
+            .where(*self._finance_filters(request))
+        )
+
+    async def list(self, request: Request) -> Pagination:
+        """Share the page's finance with the formatters; rows not stored yet are calculated in one query"""
+        from app.services.finance import get_stored_finance_for_async
+
+        pagination = await super().list(request)
+
+        missing = [row.id for row in pagination.rows if row.finance is None]
+        finance = {}
+        if missing:
+            async with self.session_maker() as session:
+                finance = await get_stored_finance_for_async(missing, session)
+
+        for row in pagination.rows:
+            if row.finance is not None:
+                row._finance = row.finance.as_dict()
+            else:
+                row._finance = finance.get(row.id, ShipmentAdmin.EMPTY_FINANCE)
+
+        return pagination
 
     def _safe_shipment_supplier(model, attr):
         """Safely get supplier name with error handling"""
@@ -421,14 +497,11 @@ class DashboardView(BaseView):
     @expose("/dashboard", methods=["GET"])
     async def dashboard_page(self, request: Request) -> Response:
         """Dashboard with statistics"""
-        from app.api.dashboard import get_dashboard_stats
-        from app.core.database import SessionLocal
+        from app.services.dashboard import get_cached_dashboard_stats
+        from app.core.database import AsyncSessionLocal
 
-        db = SessionLocal()
-        try:
-            stats = get_dashboard_stats(db)
-        finally:
-            db.close()
+        async with AsyncSessionLocal() as db:
+            stats = await get_cached_dashboard_stats(db)
 
         # Generate HTML
         html = f"""
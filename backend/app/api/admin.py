@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, Request, HTTPException, Header
 from fastapi.responses import HTMLResponse, JSONResponse
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_read_db
 from app.core.config import settings
 from app.models.order import Order, OrderStatusEnum
 import base64
@@ -28,7 +29,7 @@ def check_auth(authorization: str = Header(None)):
 
 
 @router.get("/", response_class=HTMLResponse)
-def admin_dashboard(authorization: str = Header(None), db: Session = Depends(get_db)):
+async def admin_dashboard(authorization: str = Header(None), db: AsyncSession = Depends(get_read_db)):
     """Простая админ панель для просмотра заявок"""
 
     # Проверка авторизации
@@ -39,7 +40,7 @@ def admin_dashboard(authorization: str = Header(None), db: Session = Depends(get
             headers={"WWW-Authenticate": "Basic realm=\"Admin Panel\""}
         )
 
-    orders = db.query(Order).order_by(Order.created_at.desc()).all()
+    orders = (await db.scalars(select(Order).order_by(Order.created_at.desc()))).all()
 
     # Генерация HTML
     html = """
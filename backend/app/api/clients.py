@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from uuid import UUID
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.pagination import paginate
 from app.models.client import Client
 from app.schemas.client import ClientCreate, ClientResponse, ClientUpdate
 
@@ -10,30 +12,32 @@ router = APIRouter(prefix="/clients", tags=["clients"])
 
 
 @router.post("/", response_model=ClientResponse, status_code=status.HTTP_201_CREATED)
-def create_client(client: ClientCreate, db: Session = Depends(get_db)):
+async def create_client(client: ClientCreate, db: AsyncSession = Depends(get_db)):
     """Create a new client"""
     db_client = Client(**client.model_dump())
     db.add(db_client)
-    db.commit()
-    db.refresh(db_client)
+    await db.commit()
+    await db.refresh(db_client)
     return db_client
 
 
 @router.get("/", response_model=List[ClientResponse])
-def get_clients(
+async def get_clients(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get all clients"""
-    clients = db.query(Client).offset(skip).limit(limit).all()
+    """Get all clients, oldest first; pass X-Next-Cursor back as cursor for the next page"""
+    clients = await paginate(db, select(Client), Client, response, cursor=cursor, skip=skip, limit=limit)
     return clients
 
 
 @router.get("/{client_id}", response_model=ClientResponse)
-def get_client(client_id: UUID, db: Session = Depends(get_db)):
+async def get_client(client_id: UUID, db: AsyncSession = Depends(get_read_db)):
     """Get client by ID"""
-    client = db.query(Client).filter(Client.id == client_id).first()
+    client = await db.get(Client, client_id)
     if not client:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -43,13 +47,13 @@ def get_client(client_id: UUID, db: Session = Depends(get_db)):
 
 
 @router.patch("/{client_id}", response_model=ClientResponse)
-def update_client(
+async def update_client(
     client_id: UUID,
     client_update: ClientUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update client"""
-    db_client = db.query(Client).filter(Client.id == client_id).first()
+    db_client = await db.get(Client, client_id)
     if not db_client:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -60,21 +64,21 @@ def update_client(
     for field, value in update_data.items():
         setattr(db_client, field, value)
 
-    db.commit()
-    db.refresh(db_client)
+    await db.commit()
+    await db.refresh(db_client)
     return db_client
 
 
 @router.delete("/{client_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_client(client_id: UUID, db: Session = Depends(get_db)):
+async def delete_client(client_id: UUID, db: AsyncSession = Depends(get_db)):
     """Delete client"""
-    db_client = db.query(Client).filter(Client.id == client_id).first()
+    db_client = await db.get(Client, client_id)
     if not db_client:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Client not found"
         )
 
-    db.delete(db_client)
-    db.commit()
+    await db.delete(db_client)
+    await db.commit()
     return None
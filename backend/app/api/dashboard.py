@@ -1,119 +1,19 @@
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import HTMLResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from datetime import date, datetime, timedelta
-from typing import List, Dict
-from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 
-from app.core.database import get_db
-from app.models.client import Client
-from app.models.supplier import Supplier
-from app.models.shipment import Shipment
-from app.models.expense import Expense
-from app.models.rate import Rate
-from app.services.finance import calculate_shipment_finance
+from app.core.database import get_read_db
+from app.services.dashboard import get_cached_dashboard_stats, CLIENT_SORT_FIELDS
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
 
-def get_dashboard_stats(db: Session) -> Dict:
-    """Get overall dashboard statistics"""
-
-    # Общая статистика
-    total_clients = db.query(Client).count()
-    total_suppliers = db.query(Supplier).count()
-    total_shipments = db.query(Shipment).count()
-
-    # Статистика по поставкам
-    delivered_count = db.query(Shipment).filter(Shipment.status == "delivered").count()
-    in_transit_count = db.query(Shipment).filter(Shipment.status == "in_transit").count()
-    planned_count = db.query(Shipment).filter(Shipment.status == "planned").count()
-
-    # Финансовая статистика
-    all_shipments = db.query(Shipment).all()
-
-    total_revenue = 0
-    total_cost = 0
-    total_expenses = 0
-    total_profit = 0
-
-    for shipment in all_shipments:
-        try:
-            finance = calculate_shipment_finance(shipment.id, db)
-            total_revenue += finance["revenue"]
-            total_cost += finance["cost_of_goods"]
-            total_expenses += finance["total_expenses"]
-            total_profit += finance["profit"]
-        except Exception:
-            continue
-
-    avg_margin = (total_profit / total_revenue * 100) if total_revenue > 0 else 0
-
-    # Статистика по клиентам
-    clients_stats = []
-    clients = db.query(Client).all()
-
-    for client in clients:
-        client_shipments = db.query(Shipment).filter(Shipment.client_id == client.id).all()
-
-        if not client_shipments:
-            continue
-
-        client_revenue = 0
-        client_profit = 0
-        client_volume = 0
-
-        for shipment in client_shipments:
-            try:
-                finance = calculate_shipment_finance(shipment.id, db)
-                client_revenue += finance["revenue"]
-                client_profit += finance["profit"]
-                client_volume += shipment.quantity
-            except Exception:
-                continue
-
-        client_margin = (client_profit / client_revenue * 100) if client_revenue > 0 else 0
-
-        clients_stats.append({
-            "client_number": client.client_number,
-            "name": client.name,
-            "company": client.company_name or "—",
-            "shipments_count": len(client_shipments),
-            "volume": client_volume,
-            "revenue": client_revenue,
-            "profit": client_profit,
-            "margin_percent": client_margin
-        })
-
-    # Сортировка клиентов по прибыли
-    clients_stats.sort(key=lambda x: x["profit"], reverse=True)
-
-    return {
-        "overview": {
-            "total_clients": total_clients,
-            "total_suppliers": total_suppliers,
-            "total_shipments": total_shipments,
-            "delivered_count": delivered_count,
-            "in_transit_count": in_transit_count,
-            "planned_count": planned_count
-        },
-        "finance": {
-            "total_revenue": total_revenue,
-            "total_cost": total_cost,
-            "total_expenses": total_expenses,
-            "total_profit": total_profit,
-            "avg_margin": avg_margin
-        },
-        "clients": clients_stats
-    }
-
-
 @router.get("/", response_class=HTMLResponse)
-def dashboard_page(db: Session = Depends(get_db)):
+async def dashboard_page(db: AsyncSession = Depends(get_read_db)):
     """Dashboard HTML page"""
 
-    stats = get_dashboard_stats(db)
+    stats = await get_cached_dashboard_stats(db)
 
     # Генерация HTML
     html = f"""
@@ -427,6 +327,16 @@ def dashboard_page(db: Session = Depends(get_db)):
 
 
 @router.get("/stats")
-def dashboard_stats_api(db: Session = Depends(get_db)):
+async def dashboard_stats_api(
+    sort_by: str = Query("profit", description=f"Sort clients by: {', '.join(CLIENT_SORT_FIELDS)}"),
+    limit: Optional[int] = Query(None, ge=1, description="Return only top-N clients"),
+    db: AsyncSession = Depends(get_read_db)
+):
     """Get dashboard statistics as JSON"""
-    return get_dashboard_stats(db)
+    if sort_by not in CLIENT_SORT_FIELDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"sort_by must be one of: {', '.join(CLIENT_SORT_FIELDS)}"
+        )
+
+    return await get_cached_dashboard_stats(db, sort_by=sort_by, limit=limit)
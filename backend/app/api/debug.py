@@ -0,0 +1,136 @@
+import json
+from html import escape
+from typing import Dict, List
+from fastapi import APIRouter, Header, Request
+from fastapi.responses import HTMLResponse
+from app.api.admin import check_auth
+from app.core.config import settings
+from app.core.slow_queries import SlowQuery, slow_query_log
+
+router = APIRouter(prefix="/debug", tags=["debug"], include_in_schema=False)
+
+
+def is_admin(request: Request, authorization: str) -> bool:
+    """Logged in to SQLAdmin, or admin Basic Auth"""
+    return request.session.get("token") == "admin-authenticated" or check_auth(authorization)
+
+
+def _group(entries: List[SlowQuery]) -> List[Dict]:
+    groups: Dict[str, Dict] = {}
+    for entry in entries:
+        group = groups.setdefault(entry.fingerprint, {
+            "fingerprint": entry.fingerprint, "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+            "routes": set(), "last": entry,
+        })
+        group["count"] += 1
+        group["total_ms"] += entry.duration_ms
+        group["max_ms"] = max(group["max_ms"], entry.duration_ms)
+        group["routes"].add(entry.route or "background")
+    return sorted(groups.values(), key=lambda group: -group["total_ms"])
+
+
+@router.get("/slow-queries", response_class=HTMLResponse)
+async def slow_queries(request: Request, authorization: str = Header(None)):
+    """Медленные SQL-запросы этого воркера с планами EXPLAIN ANALYZE (только для админа)"""
+    if not is_admin(request, authorization):
+        return HTMLResponse(
+            content="",
+            status_code=401,
+            headers={"WWW-Authenticate": "Basic realm=\"Admin Panel\""}
+        )
+
+    entries, plans = slow_query_log.snapshot()
+
+    statements_html = ""
+    for group in _group(entries):
+        plan = plans.get(group["fingerprint"])
+        if plan is None:
+            plan_html = "<p class=\"muted\">План не снят (не SELECT, в очереди или EXPLAIN выключен)</p>"
+        elif plan.error:
+            plan_html = f"<p class=\"error\">EXPLAIN не удался: {escape(plan.error)}</p>"
+        else:
+            plan_html = f"""
+            <details>
+                <summary>План от {plan.at:%Y-%m-%d %H:%M:%S} UTC (запрос шёл {plan.duration_ms:.0f} мс)</summary>
+                <pre>{escape(plan.plan)}</pre>
+            </details>"""
+        last = group["last"]
+        statements_html += f"""
+        <div class="card">
+            <div class="meta">
+                <b>{group["count"]}×</b>, всего {group["total_ms"]:.0f} мс, макс. {group["max_ms"]:.0f} мс,
+                последний {last.at:%H:%M:%S} UTC · {escape(", ".join(sorted(group["routes"])))}
+            </div>
+            <pre>{escape(group["fingerprint"])}</pre>
+            <p class="muted">
+                Драйвер: {escape(last.driver)} · параметры: {escape(json.dumps(last.parameters, ensure_ascii=False))}
+            </p>
+            <pre class="stack">{escape(chr(10).join(last.stack) or "(вне кода app)")}</pre>
+            {plan_html}
+        </div>"""
+
+    if not entries:
+        statements_html = "<div class=\"card\"><p class=\"muted\">Медленных запросов нет</p></div>"
+
+    html = f"""
+    <!DOCTYPE html>
+    <html lang="ru">
+    <head>
+        <meta charset="UTF-8">
+        <title>Медленные запросы - Cargo Logistics</title>
+        <style>
+            body {{
+                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, sans-serif;
+                background: #f5f5f5;
+                padding: 20px;
+                color: #333;
+            }}
+            .container {{
+                max-width: 1400px;
+                margin: 0 auto;
+            }}
+            .card {{
+                background: white;
+                padding: 20px;
+                border-radius: 10px;
+                margin-bottom: 15px;
+                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+            }}
+            pre {{
+                background: #f8f9fa;
+                padding: 10px;
+                border-radius: 6px;
+                overflow-x: auto;
+                white-space: pre-wrap;
+                font-size: 12px;
+            }}
+            .stack {{
+                color: #555;
+            }}
+            .meta {{
+                margin-bottom: 8px;
+            }}
+            .muted {{
+                color: #888;
+                font-size: 13px;
+            }}
+            .error {{
+                color: #c0392b;
+            }}
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <div class="card">
+                <h1>Медленные запросы</h1>
+                <p class="muted">
+                    Запросы дольше {settings.SLOW_QUERY_MS:g} мс, последние {len(entries)}
+                    из {settings.SLOW_QUERY_LOG_SIZE}. Журнал у каждого воркера свой.
+                </p>
+            </div>
+            {statements_html}
+        </div>
+    </body>
+    </html>
+    """
+    return HTMLResponse(content=html)
@@ -1,45 +1,68 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Body, Depends, HTTPException, Response, status
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Optional
 from uuid import UUID
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.pagination import paginate
 from app.models.expense import Expense
+from app.schemas.bulk import BulkCreateResponse
 from app.schemas.expense import ExpenseCreate, ExpenseResponse, ExpenseUpdate
+from app.services.bulk import MAX_BULK_ITEMS, bulk_create_expenses
 
 router = APIRouter(prefix="/expenses", tags=["expenses"])
 
 
 @router.post("/", response_model=ExpenseResponse, status_code=status.HTTP_201_CREATED)
-def create_expense(expense: ExpenseCreate, db: Session = Depends(get_db)):
+async def create_expense(expense: ExpenseCreate, db: AsyncSession = Depends(get_db)):
     """Create a new expense"""
     db_expense = Expense(**expense.model_dump())
     db.add(db_expense)
-    db.commit()
-    db.refresh(db_expense)
+    await db.commit()
+    await db.refresh(db_expense)
     return db_expense
 
 
+@router.post("/bulk", response_model=BulkCreateResponse)
+async def create_expenses_bulk(
+    items: List[Dict[str, Any]] = Body(..., max_length=MAX_BULK_ITEMS),
+    db: AsyncSession = Depends(get_db)
+):
+    """Create many expenses in one INSERT; invalid items are skipped and reported by index"""
+    try:
+        return await bulk_create_expenses(db, items)
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Batch conflicts with concurrent changes, nothing was created"
+        )
+
+
 @router.get("/", response_model=List[ExpenseResponse])
-def get_expenses(
+async def get_expenses(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     shipment_id: UUID = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get all expenses, optionally filtered by shipment_id"""
-    query = db.query(Expense)
+    """Get all expenses, optionally filtered by shipment_id; pass X-Next-Cursor back as cursor for the next page"""
+    stmt = select(Expense)
 
     if shipment_id:
-        query = query.filter(Expense.shipment_id == shipment_id)
+        stmt = stmt.where(Expense.shipment_id == shipment_id)
 
-    expenses = query.offset(skip).limit(limit).all()
+    expenses = await paginate(db, stmt, Expense, response, cursor=cursor, skip=skip, limit=limit)
     return expenses
 
 
 @router.get("/{expense_id}", response_model=ExpenseResponse)
-def get_expense(expense_id: UUID, db: Session = Depends(get_db)):
+async def get_expense(expense_id: UUID, db: AsyncSession = Depends(get_read_db)):
     """Get expense by ID"""
-    expense = db.query(Expense).filter(Expense.id == expense_id).first()
+    expense = await db.get(Expense, expense_id)
     if not expense:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -49,13 +72,13 @@ def get_expense(expense_id: UUID, db: Session = Depends(get_db)):
 
 
 @router.patch("/{expense_id}", response_model=ExpenseResponse)
-def update_expense(
+async def update_expense(
     expense_id: UUID,
     expense_update: ExpenseUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update expense"""
-    db_expense = db.query(Expense).filter(Expense.id == expense_id).first()
+    db_expense = await db.get(Expense, expense_id)
     if not db_expense:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -66,21 +89,21 @@ def update_expense(
     for field, value in update_data.items():
         setattr(db_expense, field, value)
 
-    db.commit()
-    db.refresh(db_expense)
+    await db.commit()
+    await db.refresh(db_expense)
     return db_expense
 
 
 @router.delete("/{expense_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_expense(expense_id: UUID, db: Session = Depends(get_db)):
+async def delete_expense(expense_id: UUID, db: AsyncSession = Depends(get_db)):
     """Delete expense"""
-    db_expense = db.query(Expense).filter(Expense.id == expense_id).first()
+    db_expense = await db.get(Expense, expense_id)
     if not db_expense:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Expense not found"
         )
 
-    db.delete(db_expense)
-    db.commit()
+    await db.delete(db_expense)
+    await db.commit()
     return None
@@ -0,0 +1,71 @@
+from pathlib import Path
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID, uuid4
+from app.core.config import settings
+from app.core.database import get_db
+from app.models.import_job import ImportJob, ImportEntityEnum, ImportStatusEnum
+from app.schemas.import_job import ImportJobResponse
+from app.services.importer import SUPPORTED_EXTENSIONS, claim_job, find_or_create_job, run_import_file, save_upload
+
+router = APIRouter(prefix="/imports", tags=["imports"])
+
+
+@router.post("/{entity}", response_model=ImportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def upload_import(
+    entity: ImportEntityEnum,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    force: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Import rates, shipments or expenses from a CSV / XLSX file in the background.
+
+    Uploading a file that was partly imported resumes it (also a running
+    import that stopped making progress, e.g. after a restart); a completed
+    file is not imported again unless force is set. Poll GET /imports/{job_id}
+    for progress.
+    """
+    extension = Path(file.filename or "").suffix.lower()
+    if extension not in SUPPORTED_EXTENSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File must be one of: {', '.join(SUPPORTED_EXTENSIONS)}"
+        )
+
+    # Copy the upload to disk, hashing it on the way (in a worker thread: large
+    # files would block the event loop)
+    import_dir = Path(settings.IMPORT_DIR)
+    import_dir.mkdir(parents=True, exist_ok=True)
+    path = import_dir / f"{uuid4()}{extension}"
+    checksum = await run_in_threadpool(save_upload, file.file, str(path))
+
+    job = await db.run_sync(find_or_create_job, entity, file.filename, checksum, force=force)
+    claimed = job.status != ImportStatusEnum.COMPLETED and await db.run_sync(claim_job, job)
+    await db.commit()
+
+    if not claimed:
+        path.unlink()
+        if job.status == ImportStatusEnum.RUNNING:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"This file is already being imported (job {job.id})"
+            )
+        return job
+
+    background_tasks.add_task(run_import_file, job.id, str(path))
+    return job
+
+
+@router.get("/{job_id}", response_model=ImportJobResponse)
+async def get_import(job_id: UUID, db: AsyncSession = Depends(get_db)):
+    """Get import job progress (read from the primary to stay current)"""
+    job = await db.get(ImportJob, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import job not found"
+        )
+    return job
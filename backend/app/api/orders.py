@@ -1,38 +1,49 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.core.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.core.database import get_db, get_read_db
+from app.core.pagination import paginate
 from app.models.order import Order
 from app.schemas.order import OrderCreate, OrderResponse, OrderUpdate
+from app.services.quotes import quote_cache
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
 
 @router.post("/", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
-def create_order(order: OrderCreate, db: Session = Depends(get_db)):
-    """Создать новую заявку на грузоперевозку"""
+async def create_order(order: OrderCreate, db: AsyncSession = Depends(get_db)):
+    """Создать новую заявку на грузоперевозку (с расчётной стоимостью, если есть ставки)"""
     db_order = Order(**order.model_dump())
+
+    table = await quote_cache.get()
+    quote = table.quote(order.route, order.cargo_type, order.cargo_weight, order.cargo_volume)
+    if quote is not None:
+        db_order.estimated_price = quote["price"]
+
     db.add(db_order)
-    db.commit()
-    db.refresh(db_order)
+    await db.commit()
+    await db.refresh(db_order)
     return db_order
 
 
 @router.get("/", response_model=List[OrderResponse])
-def get_orders(
+async def get_orders(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Получить список всех заявок"""
-    orders = db.query(Order).offset(skip).limit(limit).all()
+    """Получить список всех заявок (по дате создания); курсор следующей страницы — в заголовке X-Next-Cursor"""
+    orders = await paginate(db, select(Order), Order, response, cursor=cursor, skip=skip, limit=limit)
     return orders
 
 
 @router.get("/{order_id}", response_model=OrderResponse)
-def get_order(order_id: int, db: Session = Depends(get_db)):
+async def get_order(order_id: int, db: AsyncSession = Depends(get_read_db)):
     """Получить заявку по ID"""
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await db.get(Order, order_id)
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -42,13 +53,13 @@ def get_order(order_id: int, db: Session = Depends(get_db)):
 
 
 @router.patch("/{order_id}", response_model=OrderResponse)
-def update_order(
+async def update_order(
     order_id: int,
     order_update: OrderUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Обновить заявку"""
-    db_order = db.query(Order).filter(Order.id == order_id).first()
+    db_order = await db.get(Order, order_id)
     if not db_order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -59,21 +70,21 @@ def update_order(
     for field, value in update_data.items():
         setattr(db_order, field, value)
 
-    db.commit()
-    db.refresh(db_order)
+    await db.commit()
+    await db.refresh(db_order)
     return db_order
 
 
 @router.delete("/{order_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_order(order_id: int, db: Session = Depends(get_db)):
+async def delete_order(order_id: int, db: AsyncSession = Depends(get_db)):
     """Удалить заявку"""
-    db_order = db.query(Order).filter(Order.id == order_id).first()
+    db_order = await db.get(Order, order_id)
     if not db_order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Заявка не найдена"
         )
 
-    db.delete(db_order)
-    db.commit()
+    await db.delete(db_order)
+    await db.commit()
     return None
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, HTTPException, status
+from app.schemas.quote import QuoteRequest, QuoteResponse
+from app.services.quotes import quote_cache
+
+router = APIRouter(prefix="/quotes", tags=["quotes"])
+
+
+@router.post("/", response_model=QuoteResponse)
+async def create_quote(request: QuoteRequest):
+    """Мгновенный расчёт стоимости заявки по текущим ставкам маршрута и типа груза"""
+    table = await quote_cache.get()
+    quote = table.quote(request.route, request.cargo_type, request.cargo_weight, request.cargo_volume)
+    if quote is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Нет ставок для этого маршрута и типа груза, стоимость рассчитает менеджер"
+        )
+    return quote
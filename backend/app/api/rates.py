@@ -1,39 +1,110 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import date
 from uuid import UUID
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.pagination import paginate
 from app.models.rate import Rate
 from app.schemas.rate import RateCreate, RateResponse, RateUpdate
+from app.services.rate_resolver import resolve_rate
 
 router = APIRouter(prefix="/rates", tags=["rates"])
 
+# sort_by values for GET /rates
+SORT_FIELDS = {
+    "created_at": Rate.created_at,
+    "cargo_type": Rate.cargo_type,
+    "buy_rate": Rate.buy_rate,
+    "sell_rate": Rate.sell_rate,
+    "margin": Rate.margin,
+    "margin_percent": Rate.margin_percent,
+}
+
 
 @router.post("/", response_model=RateResponse, status_code=status.HTTP_201_CREATED)
-def create_rate(rate: RateCreate, db: Session = Depends(get_db)):
+async def create_rate(rate: RateCreate, db: AsyncSession = Depends(get_db)):
     """Create a new rate"""
     db_rate = Rate(**rate.model_dump())
     db.add(db_rate)
-    db.commit()
-    db.refresh(db_rate)
+    await db.commit()
+    await db.refresh(db_rate)
     return db_rate
 
 
 @router.get("/", response_model=List[RateResponse])
-def get_rates(
+async def get_rates(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    sort_by: Optional[str] = Query(None, description=f"Sort by: {', '.join(SORT_FIELDS)}"),
+    sort: str = Query("asc", pattern="^(asc|desc)$"),
+    min_margin: Optional[float] = None,
+    max_margin: Optional[float] = None,
+    min_margin_percent: Optional[float] = None,
+    max_margin_percent: Optional[float] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get all rates"""
-    rates = db.query(Rate).offset(skip).limit(limit).all()
+    """Get all rates, optionally sorted and filtered by margin (computed in the database)"""
+    if sort_by is not None and sort_by not in SORT_FIELDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"sort_by must be one of: {', '.join(SORT_FIELDS)}"
+        )
+
+    stmt = select(Rate)
+
+    if min_margin is not None:
+        stmt = stmt.where(Rate.margin >= min_margin)
+    if max_margin is not None:
+        stmt = stmt.where(Rate.margin <= max_margin)
+    if min_margin_percent is not None:
+        stmt = stmt.where(Rate.margin_percent >= min_margin_percent)
+    if max_margin_percent is not None:
+        stmt = stmt.where(Rate.margin_percent <= max_margin_percent)
+
+    if sort_by is None:
+        # Default order is (created_at, id) with keyset pagination
+        return await paginate(db, stmt, Rate, response, cursor=cursor, skip=skip, limit=limit)
+
+    if cursor is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="cursor can't be combined with sort_by"
+        )
+
+    column = SORT_FIELDS[sort_by]
+    stmt = stmt.order_by(column.desc() if sort == "desc" else column.asc(), Rate.id)
+
+    result = await db.scalars(stmt.offset(skip).limit(limit))
+    rates = result.unique().all()
     return rates
 
 
+@router.get("/resolve", response_model=RateResponse)
+async def resolve_shipment_rate(
+    supplier_id: UUID,
+    cargo_type: str,
+    client_id: Optional[UUID] = None,
+    on_date: Optional[date] = Query(None, description="Shipment date (default: today)"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Rate a shipment would be priced with: the client's rate valid on the date, else the base tariff"""
+    rate_id = await resolve_rate(db, supplier_id, client_id, cargo_type, on_date)
+    if rate_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No matching rate"
+        )
+    return await db.get(Rate, rate_id)
+
+
 @router.get("/{rate_id}", response_model=RateResponse)
-def get_rate(rate_id: UUID, db: Session = Depends(get_db)):
+async def get_rate(rate_id: UUID, db: AsyncSession = Depends(get_read_db)):
     """Get rate by ID"""
-    rate = db.query(Rate).filter(Rate.id == rate_id).first()
+    rate = await db.get(Rate, rate_id)
     if not rate:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -43,13 +114,13 @@ def get_rate(rate_id: UUID, db: Session = Depends(get_db)):
 
 
 @router.patch("/{rate_id}", response_model=RateResponse)
-def update_rate(
+async def update_rate(
     rate_id: UUID,
     rate_update: RateUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update rate"""
-    db_rate = db.query(Rate).filter(Rate.id == rate_id).first()
+    db_rate = await db.get(Rate, rate_id)
     if not db_rate:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -60,21 +131,21 @@ def update_rate(
     for field, value in update_data.items():
         setattr(db_rate, field, value)
 
-    db.commit()
-    db.refresh(db_rate)
+    await db.commit()
+    await db.refresh(db_rate)
     return db_rate
 
 
 @router.delete("/{rate_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_rate(rate_id: UUID, db: Session = Depends(get_db)):
+async def delete_rate(rate_id: UUID, db: AsyncSession = Depends(get_db)):
     """Delete rate"""
-    db_rate = db.query(Rate).filter(Rate.id == rate_id).first()
+    db_rate = await db.get(Rate, rate_id)
     if not db_rate:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Rate not found"
         )
 
-    db.delete(db_rate)
-    db.commit()
+    await db.delete(db_rate)
+    await db.commit()
     return None
@@ -1,104 +1,55 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from datetime import date
 from uuid import UUID
-from app.core.database import get_db
-from app.models.shipment import Shipment
-from app.models.expense import Expense
-from app.models.rate import Rate
-from app.services.finance import calculate_shipment_finance
+from app.core.database import get_read_db, reads_on_replica
+from app.models.shipment import ShipmentStatusEnum
+from app.services.export import ExportFormatEnum, MEDIA_TYPES, check_format_available, export_select, stream_export
+from app.services.rollup import summarize_finance_daily
+from app.services.timeseries import finance_timeseries, GranularityEnum, TimeseriesGroupEnum, DateFieldEnum
 
 router = APIRouter(prefix="/reports", tags=["reports"])
 
 
 @router.get("/summary")
-def get_summary_report(
+async def get_summary_report(
     date_from: Optional[date] = Query(None, description="Start date (inclusive)"),
     date_to: Optional[date] = Query(None, description="End date (inclusive)"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get financial summary report for a period.
     Returns: total revenue, total profit, average margin
     """
-    query = db.query(Shipment)
-
-    # Filter by date range if provided
-    if date_from:
-        query = query.filter(Shipment.created_at >= date_from)
-    if date_to:
-        query = query.filter(Shipment.created_at <= date_to)
-
-    shipments = query.all()
-
-    total_revenue = 0.0
-    total_cost = 0.0
-    total_expenses = 0.0
-    total_profit = 0.0
-
-    shipment_count = len(shipments)
-
-    for shipment in shipments:
-        try:
-            finance = calculate_shipment_finance(shipment.id, db)
-            total_revenue += finance["revenue"]
-            total_cost += finance["cost_of_goods"]
-            total_expenses += finance["total_expenses"]
-            total_profit += finance["profit"]
-        except Exception:
-            continue
-
-    avg_margin = (total_profit / total_revenue * 100) if total_revenue > 0 else 0.0
+    finance = await db.run_sync(summarize_finance_daily, date_from=date_from, date_to=date_to)
 
     return {
         "period": {
             "from": date_from.isoformat() if date_from else None,
             "to": date_to.isoformat() if date_to else None
         },
-        "shipments_count": shipment_count,
-        "total_revenue": round(total_revenue, 2),
-        "total_cost_of_goods": round(total_cost, 2),
-        "total_expenses": round(total_expenses, 2),
-        "total_profit": round(total_profit, 2),
-        "average_margin_percent": round(avg_margin, 2)
+        "shipments_count": finance["shipments_count"],
+        "total_revenue": round(finance["revenue"], 2),
+        "total_cost_of_goods": round(finance["cost_of_goods"], 2),
+        "total_expenses": round(finance["total_expenses"], 2),
+        "total_profit": round(finance["profit"], 2),
+        "average_margin_percent": round(finance["margin_percent"], 2)
     }
 
 
 @router.get("/by-client/{client_id}")
-def get_client_report(
+async def get_client_report(
     client_id: UUID,
     date_from: Optional[date] = Query(None, description="Start date (inclusive)"),
     date_to: Optional[date] = Query(None, description="End date (inclusive)"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get report by client: total volume, profit, etc.
     """
-    query = db.query(Shipment).filter(Shipment.client_id == client_id)
-
-    # Filter by date range if provided
-    if date_from:
-        query = query.filter(Shipment.created_at >= date_from)
-    if date_to:
-        query = query.filter(Shipment.created_at <= date_to)
-
-    shipments = query.all()
-
-    total_volume = sum(shipment.quantity for shipment in shipments)
-    total_revenue = 0.0
-    total_profit = 0.0
-
-    for shipment in shipments:
-        try:
-            finance = calculate_shipment_finance(shipment.id, db)
-            total_revenue += finance["revenue"]
-            total_profit += finance["profit"]
-        except Exception:
-            continue
-
-    avg_margin = (total_profit / total_revenue * 100) if total_revenue > 0 else 0.0
+    finance = await db.run_sync(summarize_finance_daily, date_from=date_from, date_to=date_to, client_id=client_id)
 
     return {
         "client_id": str(client_id),
@@ -106,54 +57,102 @@ def get_client_report(
             "from": date_from.isoformat() if date_from else None,
             "to": date_to.isoformat() if date_to else None
         },
-        "shipments_count": len(shipments),
-        "total_volume": round(total_volume, 2),
-        "total_revenue": round(total_revenue, 2),
-        "total_profit": round(total_profit, 2),
-        "average_margin_percent": round(avg_margin, 2)
+        "shipments_count": finance["shipments_count"],
+        "total_volume": round(finance["total_volume"], 2),
+        "total_revenue": round(finance["revenue"], 2),
+        "total_profit": round(finance["profit"], 2),
+        "average_margin_percent": round(finance["margin_percent"], 2)
     }
 
 
 @router.get("/by-supplier/{supplier_id}")
-def get_supplier_report(
+async def get_supplier_report(
     supplier_id: UUID,
     date_from: Optional[date] = Query(None, description="Start date (inclusive)"),
     date_to: Optional[date] = Query(None, description="End date (inclusive)"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get report by supplier: total volume, cost, etc.
     """
-    query = db.query(Shipment).filter(Shipment.supplier_id == supplier_id)
-
-    # Filter by date range if provided
-    if date_from:
-        query = query.filter(Shipment.created_at >= date_from)
-    if date_to:
-        query = query.filter(Shipment.created_at <= date_to)
+    finance = await db.run_sync(summarize_finance_daily, date_from=date_from, date_to=date_to, supplier_id=supplier_id)
 
-    shipments = query.all()
+    return {
+        "supplier_id": str(supplier_id),
+        "period": {
+            "from": date_from.isoformat() if date_from else None,
+            "to": date_to.isoformat() if date_to else None
+        },
+        "shipments_count": finance["shipments_count"],
+        "total_volume": round(finance["total_volume"], 2),
+        "total_cost_of_goods": round(finance["cost_of_goods"], 2),
+        "total_revenue": round(finance["revenue"], 2)
+    }
 
-    total_volume = sum(shipment.quantity for shipment in shipments)
-    total_cost = 0.0
-    total_revenue = 0.0
 
-    for shipment in shipments:
-        try:
-            finance = calculate_shipment_finance(shipment.id, db)
-            total_cost += finance["cost_of_goods"]
-            total_revenue += finance["revenue"]
-        except Exception:
-            continue
+@router.get("/timeseries")
+async def get_timeseries_report(
+    granularity: GranularityEnum = Query(GranularityEnum.MONTH, description="Bucket size: day, week or month"),
+    group_by: Optional[TimeseriesGroupEnum] = Query(None, description="Split series by client, supplier or cargo_type"),
+    date_field: DateFieldEnum = Query(DateFieldEnum.CREATED_AT, description="Date the buckets and filters apply to"),
+    date_from: Optional[date] = Query(None, description="Start date (inclusive)"),
+    date_to: Optional[date] = Query(None, description="End date (inclusive)"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get revenue / profit time series: all buckets in one response.
+    """
+    series = await db.run_sync(
+        finance_timeseries,
+        granularity=granularity,
+        group_by=group_by,
+        date_field=date_field,
+        date_from=date_from,
+        date_to=date_to
+    )
 
     return {
-        "supplier_id": str(supplier_id),
         "period": {
             "from": date_from.isoformat() if date_from else None,
             "to": date_to.isoformat() if date_to else None
         },
-        "shipments_count": len(shipments),
-        "total_volume": round(total_volume, 2),
-        "total_cost_of_goods": round(total_cost, 2),
-        "total_revenue": round(total_revenue, 2)
+        "granularity": granularity.value,
+        "group_by": group_by.value if group_by else None,
+        "date_field": date_field.value,
+        "series": series
     }
+
+
+@router.get("/export")
+async def export_shipments(
+    export_format: ExportFormatEnum = Query(ExportFormatEnum.CSV, alias="format", description="csv, ndjson or parquet"),
+    date_field: DateFieldEnum = Query(DateFieldEnum.CREATED_AT, description="Date the period applies to"),
+    date_from: Optional[date] = Query(None, description="Start date (inclusive)"),
+    date_to: Optional[date] = Query(None, description="End date (inclusive)"),
+    client_id: Optional[UUID] = None,
+    supplier_id: Optional[UUID] = None,
+    shipment_status: Optional[ShipmentStatusEnum] = Query(None, alias="status"),
+):
+    """
+    Export shipment lines with finance for a period, streamed as it is read.
+    """
+    try:
+        check_format_available(export_format)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(exc))
+
+    stmt = export_select(
+        date_field=date_field,
+        date_from=date_from,
+        date_to=date_to,
+        client_id=client_id,
+        supplier_id=supplier_id,
+        status=shipment_status
+    )
+    period = "_".join(day.isoformat() for day in (date_from, date_to) if day) or "all"
+
+    return StreamingResponse(
+        stream_export(stmt, export_format, replica=reads_on_replica.get()),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="shipments_{period}.{export_format.value}"'}
+    )
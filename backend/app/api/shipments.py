@@ -1,48 +1,128 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager
+from typing import Any, Dict, List, Optional
 from uuid import UUID
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.pagination import paginate
 from app.models.shipment import Shipment
+from app.schemas.bulk import BulkCreateResponse
 from app.schemas.shipment import ShipmentCreate, ShipmentResponse, ShipmentUpdate, ShipmentWithFinance
-from app.services.finance import calculate_shipment_with_finance
+from app.services.finance import calculate_shipment_with_finance_async, shipment_finance_criteria
+from app.services.bulk import MAX_BULK_ITEMS, bulk_create_shipments
+from app.services.rate_resolver import resolve_rate
 
 router = APIRouter(prefix="/shipments", tags=["shipments"])
 
+# sort_by values for GET /shipments
+SORT_FIELDS = {
+    "created_at": Shipment.created_at,
+    "shipment_code": Shipment.shipment_code,
+    "quantity": Shipment.quantity,
+    "departure_date": Shipment.departure_date,
+    "revenue": Shipment.revenue,
+    "total_expenses": Shipment.total_expenses,
+    "profit": Shipment.profit,
+    "margin_percent": Shipment.margin_percent,
+}
+
 
 @router.post("/", response_model=ShipmentResponse, status_code=status.HTTP_201_CREATED)
-def create_shipment(shipment: ShipmentCreate, db: Session = Depends(get_db)):
-    """Create a new shipment"""
+async def create_shipment(shipment: ShipmentCreate, db: AsyncSession = Depends(get_db)):
+    """Create a new shipment; rate_id is resolved when omitted"""
     # Check if shipment_code already exists
-    existing = db.query(Shipment).filter(Shipment.shipment_code == shipment.shipment_code).first()
+    existing = await db.scalar(select(Shipment.id).where(Shipment.shipment_code == shipment.shipment_code))
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Shipment code '{shipment.shipment_code}' already exists"
         )
 
+    if shipment.rate_id is None:
+        shipment.rate_id = await resolve_rate(
+            db, shipment.supplier_id, shipment.client_id, shipment.cargo_type, shipment.departure_date
+        )
+        if shipment.rate_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"No rate of this supplier for cargo type '{shipment.cargo_type}' on the departure date"
+            )
+
     db_shipment = Shipment(**shipment.model_dump())
     db.add(db_shipment)
-    db.commit()
-    db.refresh(db_shipment)
+    await db.commit()
+    await db.refresh(db_shipment)
     return db_shipment
 
 
+@router.post("/bulk", response_model=BulkCreateResponse)
+async def create_shipments_bulk(
+    items: List[Dict[str, Any]] = Body(..., max_length=MAX_BULK_ITEMS),
+    db: AsyncSession = Depends(get_db)
+):
+    """Create many shipments in one INSERT; invalid items are skipped and reported by index"""
+    try:
+        return await bulk_create_shipments(db, items)
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Batch conflicts with concurrent changes, nothing was created"
+        )
+
+
 @router.get("/", response_model=List[ShipmentResponse])
-def get_shipments(
+async def get_shipments(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    sort_by: Optional[str] = Query(None, description=f"Sort by: {', '.join(SORT_FIELDS)}"),
+    sort: str = Query("asc", pattern="^(asc|desc)$"),
+    min_profit: Optional[float] = None,
+    max_profit: Optional[float] = None,
+    min_margin_percent: Optional[float] = None,
+    max_margin_percent: Optional[float] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get all shipments"""
-    shipments = db.query(Shipment).offset(skip).limit(limit).all()
+    """Get all shipments, optionally sorted and filtered by finance (computed in the database)"""
+    if sort_by is not None and sort_by not in SORT_FIELDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"sort_by must be one of: {', '.join(SORT_FIELDS)}"
+        )
+
+    stmt = (
+        select(Shipment)
+        .outerjoin(Shipment.finance)
+        .options(contains_eager(Shipment.finance))
+        .where(*shipment_finance_criteria(min_profit, max_profit, min_margin_percent, max_margin_percent))
+    )
+
+    if sort_by is None:
+        # Default order is (created_at, id) with keyset pagination
+        return await paginate(db, stmt, Shipment, response, cursor=cursor, skip=skip, limit=limit)
+
+    if cursor is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="cursor can't be combined with sort_by"
+        )
+
+    column = SORT_FIELDS[sort_by]
+    stmt = stmt.order_by(column.desc() if sort == "desc" else column.asc(), Shipment.id)
+
+    result = await db.scalars(stmt.offset(skip).limit(limit))
+    shipments = result.unique().all()
     return shipments
 
 
 @router.get("/{shipment_id}", response_model=ShipmentResponse)
-def get_shipment(shipment_id: UUID, db: Session = Depends(get_db)):
+async def get_shipment(shipment_id: UUID, db: AsyncSession = Depends(get_read_db)):
     """Get shipment by ID"""
-    shipment = db.query(Shipment).filter(Shipment.id == shipment_id).first()
+    shipment = await db.get(Shipment, shipment_id)
     if not shipment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -52,26 +132,26 @@ def get_shipment(shipment_id: UUID, db: Session = Depends(get_db)):
 
 
 @router.get("/{shipment_id}/finance", response_model=ShipmentWithFinance)
-def get_shipment_finance(shipment_id: UUID, db: Session = Depends(get_db)):
+async def get_shipment_finance(shipment_id: UUID, db: AsyncSession = Depends(get_read_db)):
     """Get shipment with financial calculations"""
-    shipment = db.query(Shipment).filter(Shipment.id == shipment_id).first()
+    shipment = await db.get(Shipment, shipment_id)
     if not shipment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Shipment not found"
         )
 
-    return calculate_shipment_with_finance(shipment, db)
+    return await calculate_shipment_with_finance_async(shipment, db)
 
 
 @router.patch("/{shipment_id}", response_model=ShipmentResponse)
-def update_shipment(
+async def update_shipment(
     shipment_id: UUID,
     shipment_update: ShipmentUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update shipment"""
-    db_shipment = db.query(Shipment).filter(Shipment.id == shipment_id).first()
+    db_shipment = await db.get(Shipment, shipment_id)
     if not db_shipment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -82,10 +162,10 @@ def update_shipment(
 
     # Check if shipment_code is being changed and if it already exists
     if "shipment_code" in update_data:
-        existing = db.query(Shipment).filter(
+        existing = await db.scalar(select(Shipment.id).where(
             Shipment.shipment_code == update_data["shipment_code"],
             Shipment.id != shipment_id
-        ).first()
+        ))
         if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -95,21 +175,21 @@ def update_shipment(
     for field, value in update_data.items():
         setattr(db_shipment, field, value)
 
-    db.commit()
-    db.refresh(db_shipment)
+    await db.commit()
+    await db.refresh(db_shipment)
     return db_shipment
 
 
 @router.delete("/{shipment_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_shipment(shipment_id: UUID, db: Session = Depends(get_db)):
+async def delete_shipment(shipment_id: UUID, db: AsyncSession = Depends(get_db)):
     """Delete shipment"""
-    db_shipment = db.query(Shipment).filter(Shipment.id == shipment_id).first()
+    db_shipment = await db.get(Shipment, shipment_id)
     if not db_shipment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Shipment not found"
         )
 
-    db.delete(db_shipment)
-    db.commit()
+    await db.delete(db_shipment)
+    await db.commit()
     return None
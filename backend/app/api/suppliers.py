@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from uuid import UUID
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.pagination import paginate
 from app.models.supplier import Supplier
 from app.schemas.supplier import SupplierCreate, SupplierResponse, SupplierUpdate
 
@@ -10,30 +12,32 @@ router = APIRouter(prefix="/suppliers", tags=["suppliers"])
 
 
 @router.post("/", response_model=SupplierResponse, status_code=status.HTTP_201_CREATED)
-def create_supplier(supplier: SupplierCreate, db: Session = Depends(get_db)):
+async def create_supplier(supplier: SupplierCreate, db: AsyncSession = Depends(get_db)):
     """Create a new supplier"""
     db_supplier = Supplier(**supplier.model_dump())
     db.add(db_supplier)
-    db.commit()
-    db.refresh(db_supplier)
+    await db.commit()
+    await db.refresh(db_supplier)
     return db_supplier
 
 
 @router.get("/", response_model=List[SupplierResponse])
-def get_suppliers(
+async def get_suppliers(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get all suppliers"""
-    suppliers = db.query(Supplier).offset(skip).limit(limit).all()
+    """Get all suppliers, oldest first; pass X-Next-Cursor back as cursor for the next page"""
+    suppliers = await paginate(db, select(Supplier), Supplier, response, cursor=cursor, skip=skip, limit=limit)
     return suppliers
 
 
 @router.get("/{supplier_id}", response_model=SupplierResponse)
-def get_supplier(supplier_id: UUID, db: Session = Depends(get_db)):
+async def get_supplier(supplier_id: UUID, db: AsyncSession = Depends(get_read_db)):
     """Get supplier by ID"""
-    supplier = db.query(Supplier).filter(Supplier.id == supplier_id).first()
+    supplier = await db.get(Supplier, supplier_id)
     if not supplier:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -43,13 +47,13 @@ def get_supplier(supplier_id: UUID, db: Session = Depends(get_db)):
 
 
 @router.patch("/{supplier_id}", response_model=SupplierResponse)
-def update_supplier(
+async def update_supplier(
     supplier_id: UUID,
     supplier_update: SupplierUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update supplier"""
-    db_supplier = db.query(Supplier).filter(Supplier.id == supplier_id).first()
+    db_supplier = await db.get(Supplier, supplier_id)
     if not db_supplier:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -60,21 +64,21 @@ def update_supplier(
     for field, value in update_data.items():
         setattr(db_supplier, field, value)
 
-    db.commit()
-    db.refresh(db_supplier)
+    await db.commit()
+    await db.refresh(db_supplier)
     return db_supplier
 
 
 @router.delete("/{supplier_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_supplier(supplier_id: UUID, db: Session = Depends(get_db)):
+async def delete_supplier(supplier_id: UUID, db: AsyncSession = Depends(get_db)):
     """Delete supplier"""
-    db_supplier = db.query(Supplier).filter(Supplier.id == supplier_id).first()
+    db_supplier = await db.get(Supplier, supplier_id)
     if not db_supplier:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Supplier not found"
         )
 
-    db.delete(db_supplier)
-    db.commit()
+    await db.delete(db_supplier)
+    await db.commit()
     return None
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.core.config import settings
+from app.core.database import get_db
+from app.schemas.tracking import TrackingResponse
+from app.services.tracking import get_tracking
+
+router = APIRouter(prefix="/track", tags=["tracking"])
+
+CACHE_CONTROL = f"public, max-age={settings.TRACKING_CACHE_TTL}"
+# A code that doesn't exist yet may be created any moment
+NOT_FOUND_CACHE_CONTROL = "no-store"
+
+
+@router.get("/{shipment_code}", response_model=TrackingResponse)
+async def track_shipment(
+    shipment_code: str,
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """Публичное отслеживание груза: статус и даты отправки/прибытия, без финансов"""
+    info = await get_tracking(db, shipment_code)
+    if info is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Груз не найден",
+            headers={"Cache-Control": NOT_FOUND_CACHE_CONTROL}
+        )
+
+    headers = {"ETag": info.etag, "Last-Modified": info.last_modified_header, "Cache-Control": CACHE_CONTROL}
+    if info.not_modified(if_none_match, if_modified_since):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=info.body, media_type="application/json", headers=headers)
@@ -0,0 +1,155 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# Loader returns (data version the value was computed at, value)
+Loader = Callable[[], Tuple[int, Any]]
+
+
+@dataclass
+class _Entry:
+    version: int
+    value: Any
+    loaded_at: float
+
+
+class VersionedCache:
+    """
+    In-process result cache validated against a shared data version.
+
+    Each uvicorn worker keeps its own entries; the data version lives in
+    Postgres (data_versions table), so a write in any worker invalidates
+    the entries of all workers.
+
+    - fresh (same version, younger than ttl): returned as is
+    - stale (version changed or older than ttl, within stale_ttl): returned
+      immediately while one background thread reloads it
+    - missing or expired: loaded synchronously; concurrent callers wait for
+      the same load instead of running their own
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float, max_entries: int = 128):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._loading: Dict[Hashable, threading.Event] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, version: int, load: Loader) -> Any:
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            age = time.monotonic() - entry.loaded_at
+
+            if entry.version == version and age < self.ttl:
+                self.hits += 1
+                return entry.value
+
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._load_in_background(key, load)
+                return entry.value
+
+        self.misses += 1
+        return self._load_and_wait(key, load)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _claim(self, key: Hashable):
+        """Mark key as loading; returns (event, owner)"""
+        with self._lock:
+            event = self._loading.get(key)
+            if event is not None:
+                return event, False
+            event = self._loading[key] = threading.Event()
+            return event, True
+
+    def _load(self, key: Hashable, load: Loader, event: threading.Event) -> None:
+        try:
+            version, value = load()
+            with self._lock:
+                self._entries.pop(key, None)
+                self._entries[key] = _Entry(version, value, time.monotonic())
+                while len(self._entries) > self.max_entries:
+                    self._entries.pop(next(iter(self._entries)))
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+            event.set()
+
+    def _load_in_background(self, key: Hashable, load: Loader) -> None:
+        event, owner = self._claim(key)
+        if owner:
+            threading.Thread(target=self._load, args=(key, load, event), daemon=True).start()
+
+    def _load_and_wait(self, key: Hashable, load: Loader) -> Any:
+        event, owner = self._claim(key)
+
+        if owner:
+            self._load(key, load, event)
+        else:
+            event.wait()
+
+        entry = self._entries.get(key)
+        if entry is None:
+            # The shared load failed - load ourselves so the error surfaces here
+            version, value = load()
+            return value
+        return entry.value
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU cache with a time to live.
+
+    Each uvicorn worker keeps its own entries: writes in another worker are
+    seen after at most ttl seconds.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        # key -> (expires at, value)
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Cached value (may be None); raises KeyError if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() >= entry[0]:
+                self.misses += 1
+                raise KeyError(key)
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Cache value for ttl seconds (the cache's ttl by default)"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -10,10 +10,58 @@ class Settings(BaseSettings):
     # Database - required from .env
     DATABASE_URL: str
 
+    # Connection pool (per engine, per worker process)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Connect through pgbouncer in transaction pooling mode
+    DB_PGBOUNCER: bool = False
+
+    # Read replica for GET routes, reports, dashboard and admin lists (optional).
+    # Reads fall back to the primary while replica lag exceeds REPLICA_MAX_LAG
+    # seconds and for REPLICA_MAX_LAG seconds after a client's own write.
+    REPLICA_DATABASE_URL: Optional[str] = None
+    REPLICA_MAX_LAG: float = 5.0
+    REPLICA_LAG_CHECK_INTERVAL: float = 1.0
+
     # Security - required from .env (no defaults for security!)
     SECRET_KEY: str
     ADMIN_PASSWORD: str
 
+    # Dashboard cache (seconds)
+    DASHBOARD_CACHE_TTL: int = 30
+    DASHBOARD_CACHE_STALE_TTL: int = 300
+
+    # Public shipment tracking: per-worker cache (seconds / entries), also the client max-age
+    TRACKING_CACHE_TTL: int = 30
+    TRACKING_CACHE_SIZE: int = 10000
+    # Unknown codes: cached shorter (and never by clients), so a new shipment shows up quickly
+    TRACKING_NOT_FOUND_TTL: int = 5
+
+    # Public quotes: seconds between checks for rate changes; only rates in
+    # QUOTE_CURRENCY are quoted (orders store estimated_price in it)
+    QUOTE_CHECK_INTERVAL: float = 5.0
+    QUOTE_CURRENCY: str = "USD"
+
+    # Uploaded import files are kept here until their import finishes
+    IMPORT_DIR: str = "/tmp/cargo-imports"
+    # A running import whose progress hasn't moved for this long (seconds) is
+    # presumed dead (worker restart, deploy) and resumed by the next upload
+    IMPORT_STALE_AFTER: int = 600
+
+    # Per-request SQL stats (Server-Timing header, logs); warn when one
+    # statement runs more than SQL_REPEAT_THRESHOLD times in a request
+    SQL_STATS_ENABLED: bool = True
+    SQL_REPEAT_THRESHOLD: int = 10
+
+    # Slow-query log at /debug/slow-queries (per worker): statements slower than
+    # SLOW_QUERY_MS (0 turns it off); new or regressed ones get an EXPLAIN ANALYZE
+    SLOW_QUERY_MS: float = 200
+    SLOW_QUERY_LOG_SIZE: int = 200
+    SLOW_QUERY_EXPLAIN: bool = True
+
     # CORS
     BACKEND_CORS_ORIGINS: list = ["http://localhost:3000", "http://localhost:8000"]
 
@@ -1,17 +1,92 @@
-from sqlalchemy import create_engine
+from contextvars import ContextVar
+from sqlalchemy import create_engine, Select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import settings
+from app.core.pool import engine_options
 
-engine = create_engine(settings.DATABASE_URL)
+# Sync driver -> async driver for the same database
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    """DATABASE_URL rewritten for the async driver (unchanged if it already is one)"""
+    url = make_url(url)
+    drivername = ASYNC_DRIVERS.get(url.drivername, url.drivername)
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+# Sync engine: alembic, scripts and background cache loaders
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine: API routers and SQLAdmin
+ASYNC_DATABASE_URL = async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, is_async=True))
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+# Read replica (falls back to the primary engines when not configured)
+if settings.REPLICA_DATABASE_URL:
+    replica_engine = create_engine(settings.REPLICA_DATABASE_URL, **engine_options(settings.REPLICA_DATABASE_URL))
+    ASYNC_REPLICA_DATABASE_URL = async_database_url(settings.REPLICA_DATABASE_URL)
+    async_replica_engine = create_async_engine(
+        ASYNC_REPLICA_DATABASE_URL,
+        **engine_options(ASYNC_REPLICA_DATABASE_URL, is_async=True)
+    )
+else:
+    replica_engine = None
+    async_replica_engine = None
+
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine or engine)
+AsyncReadSessionLocal = async_sessionmaker(
+    async_replica_engine or async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+# Set per request by ReplicaRoutingMiddleware: may this request read from the replica?
+reads_on_replica: ContextVar[bool] = ContextVar("reads_on_replica", default=False)
+
+
+class RoutingSession(Session):
+    """SELECTs go to the replica when the request allows it, everything else to the primary"""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if (
+            async_replica_engine is not None
+            and reads_on_replica.get()
+            and not self._flushing
+            and isinstance(clause, Select)
+        ):
+            return async_replica_engine.sync_engine
+        return async_engine.sync_engine
+
+
+# SQLAdmin: list and detail pages read from the replica, forms write to the primary
+AdminSessionLocal = sessionmaker(class_=AsyncSession, sync_session_class=RoutingSession)
+
 Base = declarative_base()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_read_db():
+    """Session for read-only routes: the replica unless this request must see the primary"""
+    session_maker = AsyncReadSessionLocal if reads_on_replica.get() else AsyncSessionLocal
+    async with session_maker() as db:
         yield db
-    finally:
-        db.close()
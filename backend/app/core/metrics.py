@@ -0,0 +1,165 @@
+import os
+import threading
+import time
+from typing import Dict, Tuple
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+from app.core.pool import pool_stats
+from app.core.query_stats import current_query_stats
+
+# Set (and emptied) by entrypoint.sh before the uvicorn workers start: each
+# worker writes its samples there and any worker can serve the whole container
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+# Seconds between copies of pool and cache counters into the metrics
+REFRESH_INTERVAL = 1.0
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests", ["method", "route", "status"]
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route"], buckets=LATENCY_BUCKETS
+)
+IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests being handled", ["method"], multiprocess_mode="livesum"
+)
+DB_QUERIES = Histogram(
+    "http_request_db_queries", "SQL statements run per HTTP request", ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+)
+DB_DURATION = Histogram(
+    "http_request_db_duration_seconds", "Time spent in SQL per HTTP request", ["route"], buckets=LATENCY_BUCKETS
+)
+
+POOL_CONNECTIONS = Gauge(
+    "db_pool_connections", "Pool connections by state", ["engine", "state"], multiprocess_mode="livesum"
+)
+POOL_CHECKOUTS = Counter("db_pool_checkouts_total", "Pool checkouts", ["engine"])
+POOL_TIMEOUTS = Counter("db_pool_timeouts_total", "Pool checkouts that timed out", ["engine"])
+POOL_WAIT = Counter("db_pool_wait_seconds_total", "Time spent waiting for a pool connection", ["engine"])
+
+CACHE_LOOKUPS = Counter("cache_lookups_total", "In-process cache lookups by result", ["cache", "result"])
+
+# Hit ratio: sum by (cache) (rate(cache_lookups_total{result="hit"}[5m]))
+#   / sum by (cache) (rate(cache_lookups_total[5m]))
+CACHE_RESULTS = {"hits": "hit", "stale_hits": "stale", "misses": "miss"}
+
+_engines: Dict[str, object] = {}
+_caches: Dict[str, object] = {}
+_last: Dict[Tuple, float] = {}
+_refreshed_at = 0.0
+_refresh_lock = threading.Lock()
+
+
+def watch_engine(name: str, engine) -> None:
+    """Export the pool stats of an engine created with engine_options()"""
+    _engines[name] = engine
+
+
+def watch_cache(name: str, cache) -> None:
+    """Export the hits / stale_hits / misses counters of an in-process cache"""
+    _caches[name] = cache
+
+
+def _inc_by_delta(counter: Counter, key: Tuple, labels: Tuple, value: float) -> None:
+    # Process-local totals -> counter increments, so samples of exited workers still add up
+    delta = value - _last.get(key, 0.0)
+    if delta > 0:
+        counter.labels(*labels).inc(delta)
+    _last[key] = value
+
+
+def refresh() -> None:
+    """Copy pool and cache counters of this worker into the metrics (at most every REFRESH_INTERVAL)"""
+    global _refreshed_at
+    if time.monotonic() - _refreshed_at < REFRESH_INTERVAL or not _refresh_lock.acquire(blocking=False):
+        return
+    try:
+        _refreshed_at = time.monotonic()
+
+        for name, engine in _engines.items():
+            stats = pool_stats(engine)
+            if not stats:
+                continue
+            for state in ("checked_out", "checked_in", "overflow"):
+                POOL_CONNECTIONS.labels(name, state).set(stats[state])
+            _inc_by_delta(POOL_CHECKOUTS, ("checkouts", name), (name,), stats["checkouts"])
+            _inc_by_delta(POOL_TIMEOUTS, ("timeouts", name), (name,), stats["timeouts"])
+            _inc_by_delta(POOL_WAIT, ("wait", name), (name,), stats["wait_total_ms"] / 1000)
+
+        for name, cache in _caches.items():
+            for attr, result in CACHE_RESULTS.items():
+                if hasattr(cache, attr):
+                    _inc_by_delta(CACHE_LOOKUPS, (attr, name), (name, result), getattr(cache, attr))
+    finally:
+        _refresh_lock.release()
+
+
+def render() -> Tuple[bytes, str]:
+    """Metrics of the whole container (all workers when multiprocess) and their content type"""
+    refresh()
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """Drop the live gauges of this worker (call on shutdown)"""
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def _route_label(scope) -> str:
+    # Route templates only: unmatched paths (404s from bots) share one label
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    if "endpoint" in scope:
+        # Mounted apps (admin, statics) by mount path
+        return scope.get("root_path", "") + "/*"
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """Request count, latency, in-flight requests and SQL per request, by route"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = IN_PROGRESS.labels(method)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            route = _route_label(scope)
+            REQUESTS.labels(method, route, str(status_code)).inc()
+            REQUEST_LATENCY.labels(method, route).observe(time.perf_counter() - started)
+
+            stats = current_query_stats.get()
+            if stats is not None:
+                DB_QUERIES.labels(route).observe(stats.count)
+                DB_DURATION.labels(route).observe(stats.duration)
+
+            refresh()
@@ -0,0 +1,80 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, id: Any) -> str:
+    """Opaque token pointing just after the row with the given (created_at, id)"""
+    payload = json.dumps([created_at.isoformat(), str(id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, model) -> Tuple[datetime, Any]:
+    """Decode a token produced by encode_cursor() for rows of the given model"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), model.id.type.python_type(id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def keyset_select(
+    stmt: Select,
+    model,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100
+) -> Select:
+    """
+    Restrict stmt to one page ordered by (created_at, id).
+
+    With a cursor the page starts right after the cursor row (keyset
+    pagination: cost does not grow with depth, uses ix_<table>_created_at_id);
+    without one, skip is applied as a plain offset for old clients.
+    """
+    stmt = stmt.order_by(model.created_at, model.id)
+
+    if cursor is not None:
+        created_at, id = decode_cursor(cursor, model)
+        stmt = stmt.where(tuple_(model.created_at, model.id) > tuple_(created_at, id))
+    elif skip:
+        stmt = stmt.offset(skip)
+
+    return stmt.limit(limit)
+
+
+async def paginate(
+    db: AsyncSession,
+    stmt: Select,
+    model,
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100
+) -> List:
+    """
+    Return one page of stmt (see keyset_select).
+
+    If the page is full, the cursor of the next page is sent in the
+    X-Next-Cursor response header.
+    """
+    result = await db.scalars(keyset_select(stmt, model, cursor=cursor, skip=skip, limit=limit))
+    rows = result.unique().all()
+
+    if rows and len(rows) == limit:
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
+
+    return rows
@@ -0,0 +1,98 @@
+import threading
+import time
+from typing import Dict, Type
+from uuid import uuid4
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from app.core.config import settings
+
+
+class PoolStats:
+    """Checkout counters of one engine's pool (shared by its recreated pools)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self, pool) -> Dict:
+        """Live pool state plus cumulative checkout stats"""
+        with self._lock:
+            return {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+                "wait_total_ms": round(self.wait_total * 1000, 3),
+            }
+
+
+class _TimedPoolMixin:
+    """Measures how long each checkout waited for a free connection"""
+    stats: PoolStats
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record_timeout()
+            raise
+        self.stats.record_wait(time.perf_counter() - started)
+        return connection
+
+
+def timed_pool_class(base: Type[QueuePool]) -> Type[QueuePool]:
+    """Pool class with its own PoolStats (kept when the pool is recreated)"""
+    return type(f"Timed{base.__name__}", (_TimedPoolMixin, base), {"stats": PoolStats()})
+
+
+def engine_options(url: str, is_async: bool = False) -> Dict:
+    """create_engine() / create_async_engine() keyword arguments from Settings"""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+
+    options = {
+        "poolclass": timed_pool_class(AsyncAdaptedQueuePool if is_async else QueuePool),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+    if settings.DB_PGBOUNCER and is_async:
+        # pgbouncer in transaction mode hands each transaction a different
+        # server connection: named prepared statements must not be reused
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+
+    return options
+
+
+def pool_stats(engine) -> Dict:
+    """Stats of an engine created with engine_options() (empty for other pools)"""
+    pool = engine.pool
+    if not isinstance(pool, _TimedPoolMixin):
+        return {}
+    return pool.stats.snapshot(pool)
@@ -0,0 +1,136 @@
+import logging
+import re
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<!:):\w+|\?")
+_PARAM_LIST = re.compile(r"\(\s*\?(?:::\w+)?(?:\s*,\s*\?(?:::\w+)?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """Statement with literals, bound parameters and IN lists replaced by ?"""
+    statement = _LITERAL.sub("?", _PARAM.sub("?", statement))
+    return _SPACE.sub(" ", _PARAM_LIST.sub("(?)", statement)).strip()
+
+
+class QueryStats:
+    """SQL run while handling one request"""
+
+    def __init__(self, scope=None):
+        self.scope = scope
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Dict[str, int] = {}
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.duration += seconds
+        key = fingerprint(statement)
+        self.statements[key] = self.statements.get(key, 0) + 1
+
+    @property
+    def route(self) -> Optional[str]:
+        return _route_name(self.scope) if self.scope is not None else None
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Fingerprints run more than threshold times, most frequent first"""
+        return sorted(
+            ((statement, count) for statement, count in self.statements.items() if count > threshold),
+            key=lambda item: -item[1]
+        )
+
+
+# Stats of the request being handled (None outside QueryStatsMiddleware)
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+# Start times live on the per-statement execution context: after_cursor_execute
+# doesn't fire for failed statements, so nothing is left behind on the connection
+
+@event.listens_for(Engine, "before_cursor_execute")
+def receive_before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and current_query_stats.get() is not None:
+        context._query_started_at = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def receive_after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_query_stats.get()
+    started = getattr(context, "_query_started_at", None)
+    if stats is not None and started is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+def _route_name(scope) -> str:
+    route = scope.get("route")
+    return f"{scope['method']} {getattr(route, 'path', scope['path'])}"
+
+
+class QueryStatsMiddleware:
+    """
+    Counts and times the SQL each request runs (all engines, async sessions
+    and run_sync included).
+
+    Adds a Server-Timing header (db time and query count, total time), logs
+    per-request totals and warns when one statement fingerprint runs more
+    than SQL_REPEAT_THRESHOLD times: usually an N+1 loop.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.SQL_STATS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(scope)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "server-timing",
+                    f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries", '
+                    f"total;dur={(time.perf_counter() - started) * 1000:.1f}"
+                )
+            await send(message)
+
+        token = current_query_stats.set(stats)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_query_stats.reset(token)
+            self._report(scope, stats, time.perf_counter() - started)
+
+    @staticmethod
+    def _report(scope, stats: QueryStats, seconds: float) -> None:
+        route = _route_name(scope)
+        logger.info(
+            "%s: %d queries, %.1f ms in db, %.1f ms total",
+            route, stats.count, stats.duration * 1000, seconds * 1000,
+            extra={
+                "route": route,
+                "queries": stats.count,
+                "db_ms": round(stats.duration * 1000, 1),
+                "total_ms": round(seconds * 1000, 1),
+            }
+        )
+        for statement, count in stats.repeated(settings.SQL_REPEAT_THRESHOLD):
+            logger.warning(
+                "Possible N+1 in %s: statement ran %d times: %s",
+                route, count, statement[:500],
+                extra={"route": route, "repeats": count, "statement": statement}
+            )
@@ -0,0 +1,109 @@
+import logging
+import time
+from typing import Optional
+from sqlalchemy import text
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from app.core.config import settings
+from app.core.database import async_replica_engine, reads_on_replica
+
+logger = logging.getLogger(__name__)
+
+# Cookie with the time of the client's last successful write
+LAST_WRITE_COOKIE = "last_write_at"
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+# Seconds the replica is behind the primary (0 when it is not a standby,
+# e.g. a second connection to the primary for local testing)
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReplicaLagMonitor:
+    """Replica lag, measured at most once per REPLICA_LAG_CHECK_INTERVAL per worker"""
+
+    def __init__(self, engine, interval: float):
+        self.engine = engine
+        self.interval = interval
+        self.lag: Optional[float] = None
+        self.checked_at = 0.0
+
+    async def get(self) -> Optional[float]:
+        """Lag in seconds, None if the replica is unreachable"""
+        if time.monotonic() - self.checked_at >= self.interval:
+            self.checked_at = time.monotonic()
+            try:
+                async with self.engine.connect() as connection:
+                    self.lag = float(await connection.scalar(REPLICA_LAG_SQL))
+            except Exception:
+                logger.warning("Replica lag check failed, reading from the primary", exc_info=True)
+                self.lag = None
+        return self.lag
+
+
+replica_lag = ReplicaLagMonitor(async_replica_engine, settings.REPLICA_LAG_CHECK_INTERVAL) if async_replica_engine else None
+
+
+def _last_write_at(connection: HTTPConnection) -> Optional[float]:
+    try:
+        return float(connection.cookies[LAST_WRITE_COOKIE])
+    except (KeyError, ValueError):
+        return None
+
+
+async def replica_allowed(last_write_at: Optional[float]) -> bool:
+    """May a client whose last write was at last_write_at read from the replica?"""
+    if replica_lag is None:
+        return False
+
+    lag = await replica_lag.get()
+    if lag is None or lag > settings.REPLICA_MAX_LAG:
+        return False
+
+    # Read-your-writes: the client's own write may not have reached the replica yet
+    if last_write_at is not None and time.time() - last_write_at < settings.REPLICA_MAX_LAG:
+        return False
+
+    return True
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Decides per request whether reads may go to the replica (see
+    get_read_db and RoutingSession) and marks clients after successful
+    writes so their next reads see the primary.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or replica_lag is None:
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] not in WRITE_METHODS:
+            allowed = await replica_allowed(_last_write_at(HTTPConnection(scope)))
+            token = reads_on_replica.set(allowed)
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                reads_on_replica.reset(token)
+            return
+
+        async def send_with_write_mark(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "set-cookie",
+                    f"{LAST_WRITE_COOKIE}={time.time():.3f}; Max-Age={int(settings.REPLICA_MAX_LAG) + 1}; Path=/; HttpOnly; SameSite=Lax"
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_write_mark)
@@ -0,0 +1,269 @@
+import logging
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+from greenlet import getcurrent
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import NullPool
+from app.core.config import settings
+from app.core.query_stats import current_query_stats, fingerprint
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STACK_DEPTH = 5
+
+# A statement is explained again when it got this many times slower than at
+# its last EXPLAIN, at most once per EXPLAIN_INTERVAL seconds
+EXPLAIN_REGRESSION = 2.0
+EXPLAIN_INTERVAL = 300.0
+EXPLAIN_TIMEOUT_MS = 30000
+EXPLAIN_QUEUE_SIZE = 20
+MAX_PLANS = 500
+
+# EXPLAIN ANALYZE runs the statement: plain reads only (and always rolled back)
+_READ = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+_WRITE_OR_LOCK = re.compile(r"\b(INSERT|UPDATE|DELETE|FOR\s+(NO\s+KEY\s+)?UPDATE|FOR\s+(KEY\s+)?SHARE)\b", re.IGNORECASE)
+_DOLLAR_PARAM = re.compile(r"\$(\d+)")
+
+
+@dataclass
+class SlowQuery:
+    at: datetime
+    duration_ms: float
+    statement: str
+    fingerprint: str
+    parameters: Any
+    driver: str  # psycopg2 (sync sessions, scripts) or asyncpg (API, admin)
+    route: Optional[str]
+    stack: List[str]
+
+
+@dataclass
+class QueryPlan:
+    at: datetime
+    duration_ms: float
+    plan: Optional[str] = None
+    error: Optional[str] = None
+
+
+def _kind(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def redact(parameters, executemany: bool = False):
+    """Bound parameters with the values replaced by their types"""
+    if executemany:
+        return f"{len(parameters)} parameter sets"
+    if isinstance(parameters, dict):
+        return {name: _kind(value) for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_kind(value) for value in parameters]
+    return None
+
+
+def _caller_stack() -> List[str]:
+    # Async sessions run the ORM in a greenlet: the calling coroutines are on its parent's stack
+    stack = []
+    frame = sys._getframe(1)
+    glet = getcurrent()
+    while len(stack) < STACK_DEPTH:
+        if frame is None:
+            glet = glet.parent
+            if glet is None or glet.gr_frame is None:
+                break
+            frame = glet.gr_frame
+            continue
+        filename = frame.f_code.co_filename
+        # ASGI middlewares (__call__) say nothing about where the statement came from
+        if filename.startswith(APP_DIR) and filename != __file__ and frame.f_code.co_name != "__call__":
+            stack.append(f"{os.path.relpath(filename, os.path.dirname(APP_DIR))}:{frame.f_lineno} in {frame.f_code.co_name}")
+        frame = frame.f_back
+    return stack
+
+
+def to_pyformat(statement: str, parameters, paramstyle: str):
+    """
+    Statement and parameters in the form psycopg2 takes them.
+
+    asyncpg statements use $1::TYPE placeholders (numeric_dollar) with
+    positional parameters: those become %s with the values in placeholder
+    order, and literal % signs are escaped (without parameters psycopg2
+    doesn't format the statement at all). Other statements are unchanged.
+    """
+    if paramstyle != "numeric_dollar":
+        return statement, parameters
+    if not _DOLLAR_PARAM.search(statement):
+        return statement, None
+    values = []
+
+    def placeholder(match):
+        values.append(parameters[int(match.group(1)) - 1])
+        return "%s"
+
+    return _DOLLAR_PARAM.sub(placeholder, statement.replace("%", "%%")), tuple(values)
+
+
+def _plain(value):
+    # asyncpg takes UUID objects, psycopg2 does not adapt them
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return type(value)(_plain(item) for item in value)
+    if isinstance(value, dict):
+        return {name: _plain(item) for name, item in value.items()}
+    return value
+
+
+class SlowQueryLog:
+    """
+    Statements slower than SLOW_QUERY_MS in a ring buffer of the last
+    SLOW_QUERY_LOG_SIZE, plus EXPLAIN (ANALYZE, BUFFERS) plans by fingerprint.
+
+    Plans are taken on a background thread over a separate connection (not
+    from the app pools) the first time a statement is slow and again when it
+    regresses. Each worker keeps its own log.
+    """
+
+    def __init__(self, size: int):
+        self.entries: deque = deque(maxlen=size)
+        self.plans: "OrderedDict[str, QueryPlan]" = OrderedDict()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue(maxsize=EXPLAIN_QUEUE_SIZE)
+        self._worker: Optional[threading.Thread] = None
+        self._engine: Optional[Engine] = None
+        self.explain_enabled = (
+            settings.SLOW_QUERY_EXPLAIN and make_url(settings.DATABASE_URL).get_backend_name() == "postgresql"
+        )
+
+    def record(self, conn, statement: str, parameters, executemany: bool, duration_ms: float) -> None:
+        if conn.engine is self._engine:
+            return
+        stats = current_query_stats.get()
+        entry = SlowQuery(
+            at=datetime.now(timezone.utc),
+            duration_ms=duration_ms,
+            statement=statement,
+            fingerprint=fingerprint(statement),
+            parameters=redact(parameters, executemany),
+            driver=conn.dialect.driver,
+            route=stats.route if stats is not None else None,
+            stack=_caller_stack(),
+        )
+        logger.warning(
+            "Slow query (%.0f ms) in %s: %s",
+            duration_ms, entry.route or "background", entry.fingerprint[:500],
+            extra={"route": entry.route, "duration_ms": round(duration_ms, 1), "statement": entry.fingerprint}
+        )
+        with self._lock:
+            self.entries.append(entry)
+            explain = not executemany and self._wants_plan(entry.fingerprint, duration_ms)
+            if explain:
+                self._pending.add(entry.fingerprint)
+        if explain:
+            self._request_plan(entry.fingerprint, statement, parameters, conn.dialect.paramstyle, duration_ms)
+
+    def _wants_plan(self, key: str, duration_ms: float) -> bool:
+        if not self.explain_enabled or key in self._pending:
+            return False
+        if not _READ.match(key) or _WRITE_OR_LOCK.search(key):
+            return False
+        plan = self.plans.get(key)
+        if plan is None:
+            return True
+        return (
+            duration_ms >= plan.duration_ms * EXPLAIN_REGRESSION
+            and (datetime.now(timezone.utc) - plan.at).total_seconds() >= EXPLAIN_INTERVAL
+        )
+
+    def _request_plan(self, key: str, statement: str, parameters, paramstyle: str, duration_ms: float) -> None:
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._explain_loop, name="slow-query-explain", daemon=True)
+                self._worker.start()
+        try:
+            self._queue.put_nowait((key, statement, parameters, paramstyle, duration_ms))
+        except queue.Full:
+            with self._lock:
+                self._pending.discard(key)
+
+    def _explain_loop(self) -> None:
+        while True:
+            key, statement, parameters, paramstyle, duration_ms = self._queue.get()
+            plan = QueryPlan(at=datetime.now(timezone.utc), duration_ms=duration_ms)
+            try:
+                plan.plan = self.explain(statement, parameters, paramstyle)
+            except Exception as e:
+                logger.warning("EXPLAIN of a slow query failed: %s", e)
+                plan.error = str(e)
+            with self._lock:
+                self._pending.discard(key)
+                self.plans[key] = plan
+                self.plans.move_to_end(key)
+                while len(self.plans) > MAX_PLANS:
+                    self.plans.popitem(last=False)
+
+    def explain(self, statement: str, parameters, paramstyle: str) -> str:
+        """
+        EXPLAIN (ANALYZE, BUFFERS) of a statement as its driver ran it (blocking).
+
+        Runs on psycopg2 over a connection of its own, in a transaction that is
+        always rolled back.
+        """
+        statement, parameters = to_pyformat(statement, _plain(parameters), paramstyle)
+        if self._engine is None:
+            self._engine = create_engine(settings.DATABASE_URL, poolclass=NullPool)
+        with self._engine.connect() as conn:
+            transaction = conn.begin()
+            try:
+                conn.exec_driver_sql(f"SET LOCAL statement_timeout = {EXPLAIN_TIMEOUT_MS}")
+                # The raw cursor: placeholders and % escaping exactly as rendered
+                cursor = conn.connection.cursor()
+                cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+                return "\n".join(row[0] for row in cursor.fetchall())
+            finally:
+                transaction.rollback()
+
+    def snapshot(self) -> Tuple[List[SlowQuery], Dict[str, QueryPlan]]:
+        """Entries (newest first) and plans by fingerprint"""
+        with self._lock:
+            return list(reversed(self.entries)), dict(self.plans)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.entries.clear()
+            self.plans.clear()
+
+
+slow_query_log = SlowQueryLog(settings.SLOW_QUERY_LOG_SIZE)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def receive_before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # On the execution context, like query_stats: failed statements leave nothing behind
+    if context is not None and settings.SLOW_QUERY_MS > 0:
+        context._slow_query_started_at = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def receive_after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_slow_query_started_at", None)
+    if started is None:
+        return
+    duration_ms = (time.perf_counter() - started) * 1000
+    if duration_ms >= settings.SLOW_QUERY_MS:
+        slow_query_log.record(conn, statement, parameters, executemany, duration_ms)
@@ -1,4 +1,4 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
@@ -7,7 +7,12 @@ from sqladmin.authentication import AuthenticationBackend
 from starlette.requests import Request
 
 from app.core.config import settings
-from app.core.database import engine
+from app.core.database import engine, async_engine, replica_engine, async_replica_engine, AdminSessionLocal
+from app.core.metrics import MetricsMiddleware, mark_process_dead, render as render_metrics, watch_cache, watch_engine
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.pool import pool_stats
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.replica import ReplicaRoutingMiddleware
 
 # Import API routers
 from app.api.orders import router as orders_router
@@ -18,6 +23,13 @@ from app.api.shipments import router as shipments_router
 from app.api.expenses import router as expenses_router
 from app.api.reports import router as reports_router
 from app.api.dashboard import router as dashboard_router
+from app.api.imports import router as imports_router
+from app.api.quotes import router as quotes_router
+from app.api.tracking import router as tracking_router
+from app.api.debug import router as debug_router
+from app.services.dashboard import dashboard_cache
+from app.services.quotes import quote_cache
+from app.services.tracking import tracking_cache
 
 # Import SQLAdmin views
 from app.admin.views import (
@@ -48,11 +60,30 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Session middleware for SQLAdmin authentication
 app.add_middleware(SessionMiddleware, secret_key=settings.SECRET_KEY)
 
+# Read replica routing (no-op unless REPLICA_DATABASE_URL is set)
+app.add_middleware(ReplicaRoutingMiddleware)
+
+# Prometheus request metrics (reads the SQL stats, so added before them)
+app.add_middleware(MetricsMiddleware)
+
+# SQL count / time per request (Server-Timing header, N+1 warnings)
+app.add_middleware(QueryStatsMiddleware)
+
+watch_engine("sync", engine)
+watch_engine("async", async_engine.sync_engine)
+if replica_engine is not None:
+    watch_engine("replica_sync", replica_engine)
+    watch_engine("replica_async", async_replica_engine.sync_engine)
+watch_cache("dashboard", dashboard_cache)
+watch_cache("quotes", quote_cache)
+watch_cache("tracking", tracking_cache)
+
 
 # SQLAdmin Authentication Backend
 class AdminAuth(AuthenticationBackend):
@@ -79,7 +110,8 @@ class AdminAuth(AuthenticationBackend):
 authentication_backend = AdminAuth(secret_key=settings.SECRET_KEY)
 admin = Admin(
     app,
-    engine,
+    async_engine,
+    session_maker=AdminSessionLocal,
     title="Панель управления грузоперевозками",
     authentication_backend=authentication_backend
 )
@@ -102,6 +134,12 @@ app.include_router(shipments_router, prefix=settings.API_V1_STR)
 app.include_router(expenses_router, prefix=settings.API_V1_STR)
 app.include_router(reports_router, prefix=settings.API_V1_STR)
 app.include_router(dashboard_router, prefix=settings.API_V1_STR)
+app.include_router(imports_router, prefix=settings.API_V1_STR)
+app.include_router(quotes_router, prefix=settings.API_V1_STR)
+app.include_router(tracking_router, prefix=settings.API_V1_STR)
+
+# Slow-query log for admins (not under the API prefix)
+app.include_router(debug_router)
 
 
 @app.get("/")
@@ -117,3 +155,28 @@ def root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics of all workers (not proxied by nginx: scraped on the internal network)"""
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
+
+
+@app.on_event("shutdown")
+def drop_worker_metrics():
+    mark_process_dead()
+
+
+@app.get("/health/pool")
+def pool_health():
+    """Connection pool usage of this worker: checkouts, overflow and wait time"""
+    pools = {
+        "sync": pool_stats(engine),
+        "async": pool_stats(async_engine.sync_engine)
+    }
+    if replica_engine is not None:
+        pools["replica_sync"] = pool_stats(replica_engine)
+        pools["replica_async"] = pool_stats(async_replica_engine.sync_engine)
+    return pools
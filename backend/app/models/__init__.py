@@ -4,9 +4,14 @@ from app.models.client import Client
 from app.models.rate import Rate
 from app.models.shipment import Shipment, ShipmentStatusEnum
 from app.models.expense import Expense, ExpenseTypeEnum
+from app.models.shipment_finance import ShipmentFinance
+from app.models.data_version import DataVersion
+from app.models.finance_daily import FinanceDaily
+from app.models.import_job import ImportJob, ImportEntityEnum, ImportStatusEnum
 
 __all__ = [
     "Order", "RouteEnum", "OrderStatusEnum",
     "Supplier", "Client", "Rate", "Shipment", "Expense",
-    "ShipmentStatusEnum", "ExpenseTypeEnum"
+    "ShipmentFinance", "DataVersion", "FinanceDaily", "ImportJob",
+    "ShipmentStatusEnum", "ExpenseTypeEnum", "ImportEntityEnum", "ImportStatusEnum"
 ]
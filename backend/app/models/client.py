@@ -1,17 +1,24 @@
-from sqlalchemy import Column, String, Text, DateTime, event
+from sqlalchemy import Column, String, Text, DateTime, Sequence, event, select, text, Index
+from sqlalchemy.engine import Connection
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import Session
 from app.core.database import Base
 import uuid
+from typing import List
+
+# Source of client numbers (synced to existing numbers by the add_client_number_seq migration)
+client_number_seq = Sequence("client_number_seq", metadata=Base.metadata)
 
 
 class Client(Base):
     """Clients - клиенты"""
     __tablename__ = "clients"
+    # Keyset pagination order: (created_at, id)
+    __table_args__ = (Index("ix_clients_created_at_id", "created_at", "id"),)
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    client_number = Column(String(20), unique=True, nullable=False, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    client_number = Column(String(20), unique=True, nullable=False)
     name = Column(String(255), nullable=False)
     company_name = Column(String(255), nullable=True)
     contact_person = Column(String(255), nullable=True)
@@ -25,29 +32,59 @@ class Client(Base):
         return f"{self.client_number} - {self.name}"
 
 
-def generate_next_client_number(session: Session) -> str:
-    """Generate next client number in format CL-0001"""
-    # Get the last client by client_number
-    last_client = session.query(Client).order_by(Client.client_number.desc()).first()
-
-    if not last_client or not last_client.client_number:
-        return "CL-0001"
-
-    # Extract number from CL-XXXX format
-    try:
-        last_number = int(last_client.client_number.split("-")[1])
-        next_number = last_number + 1
-        return f"CL-{next_number:04d}"
-    except (IndexError, ValueError):
-        # If parsing fails, start from 0001
-        return "CL-0001"
-
-
-@event.listens_for(Client, "before_insert")
-def receive_before_insert(mapper, connection, target):
-    """Auto-generate client_number before insert if not set"""
-    if not target.client_number:
-        # Create a session from the connection
-        session = Session(bind=connection)
-        target.client_number = generate_next_client_number(session)
-        session.close()
+def format_client_number(number: int) -> str:
+    return f"CL-{number:04d}"
+
+
+def allocate_client_numbers(connection: Connection, count: int) -> List[str]:
+    """
+    Reserve count client numbers (CL-0001 format) in one query.
+
+    Numbers come from client_number_seq, so concurrent writers never get the
+    same one; bulk loaders reserve a block up front instead of a query per
+    row. Numbers of rolled back transactions are skipped, not reused.
+    """
+    if count <= 0:
+        return []
+
+    if connection.dialect.supports_sequences:
+        numbers = connection.execute(
+            select(client_number_seq.next_value()).select_from(func.generate_series(1, count))
+        ).scalars()
+    else:
+        # No sequences (SQLite in development): continue after the highest number
+        last = connection.execute(
+            select(Client.client_number)
+            .order_by(func.length(Client.client_number).desc(), Client.client_number.desc())
+            .limit(1)
+        ).scalar()
+        start = int(last.split("-")[1]) + 1 if last else 1
+        numbers = range(start, start + count)
+
+    return [format_client_number(number) for number in numbers]
+
+
+def sync_client_number_seq(connection: Connection) -> None:
+    """Continue client_number_seq after the highest existing number (after inserting explicit numbers)"""
+    if not connection.dialect.supports_sequences:
+        return
+
+    connection.execute(text("""
+        SELECT setval(
+            'client_number_seq',
+            COALESCE((SELECT MAX(substring(client_number FROM '^CL-([0-9]+)$')::bigint) FROM clients), 0) + 1,
+            false
+        )
+    """))
+
+
+@event.listens_for(Session, "before_flush")
+def receive_before_flush(session, flush_context, instances):
+    """Assign client numbers to all new clients of the flush at once"""
+    clients = [obj for obj in session.new if isinstance(obj, Client) and not obj.client_number]
+    if not clients:
+        return
+
+    numbers = allocate_client_numbers(session.connection(), len(clients))
+    for client, number in zip(clients, numbers):
+        client.client_number = number
@@ -0,0 +1,72 @@
+from sqlalchemy import Column, String, BigInteger, DateTime, event, update
+from sqlalchemy.sql import func
+from sqlalchemy.orm import Session
+from app.core.database import Base
+from app.models.supplier import Supplier
+from app.models.client import Client
+from app.models.rate import Rate
+from app.models.shipment import Shipment
+from app.models.expense import Expense
+
+DASHBOARD_DATA = "dashboard"
+RATES_DATA = "rates"
+
+# Data version name -> models whose writes bump it
+DATA_VERSION_SOURCES = {
+    DASHBOARD_DATA: (Shipment, Expense, Rate, Client, Supplier),
+    RATES_DATA: (Rate,),
+}
+
+
+class DataVersion(Base):
+    """Data versions - счётчики изменений данных для инвалидации кэшей"""
+    __tablename__ = "data_versions"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+def get_data_version(session: Session, name: str) -> int:
+    """Current version of the named data set (0 if not tracked yet)"""
+    version = session.query(DataVersion.version).filter(DataVersion.name == name).scalar()
+    return version or 0
+
+
+def bump_data_version(session: Session, name: str) -> None:
+    """Bump the named data version when the session's transaction commits.
+
+    The bump is the last statement of the same transaction, so readers never
+    see the new version before the data it describes is committed, and the
+    data_versions row lock is only held from the bump to the commit.
+    """
+    session.info.setdefault("pending_data_versions", set()).add(name)
+
+
+@event.listens_for(Session, "after_flush")
+def receive_after_flush(session, flush_context):
+    """Bump data versions touched by this flush"""
+    changed = session.new | session.dirty | session.deleted
+
+    for name, models in DATA_VERSION_SOURCES.items():
+        if any(isinstance(obj, models) for obj in changed):
+            bump_data_version(session, name)
+
+
+@event.listens_for(Session, "before_commit")
+def receive_before_commit(session):
+    # Flush first: this event runs before the commit's own flush
+    session.flush()
+    names = session.info.pop("pending_data_versions", None)
+    if not names:
+        return
+    session.connection().execute(
+        update(DataVersion)
+        .where(DataVersion.name.in_(sorted(names)))
+        .values(version=DataVersion.version + 1, updated_at=func.now())
+    )
+
+
+@event.listens_for(Session, "after_rollback")
+def receive_after_rollback(session):
+    session.info.pop("pending_data_versions", None)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Date, Enum, Text
+from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Date, Enum, Text, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -17,8 +17,14 @@ class ExpenseTypeEnum(str, enum.Enum):
 class Expense(Base):
     """Expenses - расходы по поставке"""
     __tablename__ = "expenses"
-
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    __table_args__ = (
+        # Keyset pagination order: (created_at, id)
+        Index("ix_expenses_created_at_id", "created_at", "id"),
+        # Finance SUM(amount) per shipment straight from the index
+        Index("ix_expenses_shipment_id", "shipment_id", postgresql_include=["amount"]),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
 
     # Foreign Key
     shipment_id = Column(UUID(as_uuid=True), ForeignKey("shipments.id", ondelete="CASCADE"), nullable=False)
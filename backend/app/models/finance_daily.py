@@ -0,0 +1,28 @@
+from sqlalchemy import Column, String, Float, Integer, Date, Enum, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+from app.models.shipment import ShipmentStatusEnum
+
+
+class FinanceDaily(Base):
+    """Finance daily - дневные финансовые итоги по клиенту, поставщику, типу груза и статусу"""
+    __tablename__ = "finance_daily"
+    # Per-client / per-supplier reports; the primary key covers day-only ranges
+    __table_args__ = (
+        Index("ix_finance_daily_client_id_day", "client_id", "day"),
+        Index("ix_finance_daily_supplier_id_day", "supplier_id", "day"),
+    )
+
+    # Day of shipment creation
+    day = Column(Date, primary_key=True)
+    client_id = Column(UUID(as_uuid=True), ForeignKey("clients.id", ondelete="CASCADE"), primary_key=True)
+    supplier_id = Column(UUID(as_uuid=True), ForeignKey("suppliers.id", ondelete="CASCADE"), primary_key=True)
+    cargo_type = Column(String(255), primary_key=True)
+    status = Column(Enum(ShipmentStatusEnum, values_callable=lambda x: [e.value for e in x]), primary_key=True)
+
+    shipment_count = Column(Integer, nullable=False, default=0)
+    quantity = Column(Float, nullable=False, default=0.0)
+    revenue = Column(Float, nullable=False, default=0.0)
+    cost_of_goods = Column(Float, nullable=False, default=0.0)
+    total_expenses = Column(Float, nullable=False, default=0.0)
+    profit = Column(Float, nullable=False, default=0.0)
@@ -0,0 +1,54 @@
+from sqlalchemy import Column, String, Integer, Text, DateTime, Enum, JSON, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from app.core.database import Base
+import uuid
+import enum
+
+
+class ImportEntityEnum(str, enum.Enum):
+    RATES = "rates"
+    SHIPMENTS = "shipments"
+    EXPENSES = "expenses"
+
+
+class ImportStatusEnum(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ImportJob(Base):
+    """Import jobs - загрузка ставок, поставок и расходов из CSV / XLSX"""
+    __tablename__ = "import_jobs"
+    # Resume lookup: the latest job of the same file
+    __table_args__ = (Index("ix_import_jobs_entity_checksum", "entity", "checksum"),)
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    entity = Column(Enum(ImportEntityEnum, values_callable=lambda x: [e.value for e in x]), nullable=False)
+    filename = Column(String(255), nullable=False)
+    checksum = Column(String(64), nullable=False)  # sha256 of the file
+    status = Column(
+        Enum(ImportStatusEnum, values_callable=lambda x: [e.value for e in x]),
+        nullable=False,
+        default=ImportStatusEnum.PENDING
+    )
+
+    # Progress, committed together with every chunk - an interrupted import
+    # resumes after the last committed data row
+    rows_processed = Column(Integer, nullable=False, default=0)
+    rows_imported = Column(Integer, nullable=False, default=0)
+    rows_failed = Column(Integer, nullable=False, default=0)
+
+    # First rejected rows: [{"line": 12, "errors": ["..."]}]
+    errors = Column(JSON, nullable=False, default=list)
+    # Reason the import stopped (status failed)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    def __repr__(self):
+        return f"{self.entity.value}: {self.filename} ({self.status.value})"
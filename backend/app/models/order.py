@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum, Text, Float
+from sqlalchemy import Column, Integer, String, DateTime, Enum, Text, Float, Index
 from sqlalchemy.sql import func
 from app.core.database import Base
 import enum
@@ -18,8 +18,10 @@ class OrderStatusEnum(str, enum.Enum):
 
 class Order(Base):
     __tablename__ = "orders"
+    # Keyset pagination order: (created_at, id)
+    __table_args__ = (Index("ix_orders_created_at_id", "created_at", "id"),)
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
 
     # Клиентская информация
     client_name = Column(String(255), nullable=False)
@@ -40,7 +42,7 @@ class Order(Base):
 
     # Статус и дополнительно
     status = Column(Enum(OrderStatusEnum), default=OrderStatusEnum.NEW)
-    estimated_price = Column(Float, nullable=True)
+    estimated_price = Column(Float, nullable=True)  # In QUOTE_CURRENCY
     notes = Column(Text, nullable=True)
 
     # Временные метки
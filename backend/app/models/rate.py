@@ -1,7 +1,8 @@
-from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Date
+from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Date, case, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
+from sqlalchemy.ext.hybrid import hybrid_property
 from app.core.database import Base
 import uuid
 
@@ -9,8 +10,16 @@ import uuid
 class Rate(Base):
     """Rates - ставки закупки и продажи"""
     __tablename__ = "rates"
+    __table_args__ = (
+        # Keyset pagination order: (created_at, id)
+        Index("ix_rates_created_at_id", "created_at", "id"),
+        # Rate lookup by supplier and cargo type
+        Index("ix_rates_supplier_id_cargo_type", "supplier_id", "cargo_type"),
+        # Most rates are not client-specific
+        Index("ix_rates_client_id", "client_id", postgresql_where=text("client_id IS NOT NULL")),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
 
     cargo_type = Column(String(255), nullable=False)  # например "perfumes"
 
@@ -35,6 +44,22 @@ class Rate(Base):
     supplier = relationship("Supplier", backref="rates", lazy="joined")
     client = relationship("Client", backref="rates", lazy="joined")
 
+    # Margin as SQL-computable attributes (sortable / filterable in the database)
+    @hybrid_property
+    def margin(self):
+        return self.sell_rate - self.buy_rate
+
+    @hybrid_property
+    def margin_percent(self):
+        return (self.sell_rate - self.buy_rate) / self.buy_rate * 100 if self.buy_rate else None
+
+    @margin_percent.expression
+    def margin_percent(cls):
+        return case(
+            (cls.buy_rate > 0, (cls.sell_rate - cls.buy_rate) / cls.buy_rate * 100),
+            else_=None
+        )
+
     def __repr__(self):
         supplier_name = self.supplier.name if self.supplier else "N/A"
         client_info = f" → {self.client.client_number}" if self.client else ""
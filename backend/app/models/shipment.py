@@ -1,7 +1,8 @@
-from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Date, Enum
+from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Date, Enum, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
+from sqlalchemy.ext.hybrid import hybrid_property
 from app.core.database import Base
 import uuid
 import enum
@@ -16,9 +17,18 @@ class ShipmentStatusEnum(str, enum.Enum):
 class Shipment(Base):
     """Shipments - поставки / фуры"""
     __tablename__ = "shipments"
+    __table_args__ = (
+        # Keyset pagination order: (created_at, id)
+        Index("ix_shipments_created_at_id", "created_at", "id"),
+        # Per-client / per-supplier shipment lists and reports
+        Index("ix_shipments_client_id_created_at", "client_id", "created_at"),
+        Index("ix_shipments_supplier_id_created_at", "supplier_id", "created_at"),
+        # Finance refresh after a rate change
+        Index("ix_shipments_rate_id", "rate_id"),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    shipment_code = Column(String(100), unique=True, nullable=False, index=True)  # CN-RU-001
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    shipment_code = Column(String(100), unique=True, nullable=False)  # CN-RU-001
 
     # Foreign Keys
     supplier_id = Column(UUID(as_uuid=True), ForeignKey("suppliers.id"), nullable=False)
@@ -44,6 +54,45 @@ class Shipment(Base):
     client = relationship("Client", backref="shipments", lazy="joined")
     rate = relationship("Rate", backref="shipments", lazy="joined")
     expenses = relationship("Expense", back_populates="shipment", cascade="all, delete-orphan")
+    # Stored finance row; SQL expressions below need it joined: .outerjoin(Shipment.finance)
+    finance = relationship("ShipmentFinance", uselist=False, viewonly=True)
+
+    # Finance as SQL-computable attributes (sortable / filterable in the database)
+    @hybrid_property
+    def revenue(self):
+        return self.finance.revenue if self.finance else None
+
+    @revenue.expression
+    def revenue(cls):
+        from app.models.shipment_finance import ShipmentFinance
+        return ShipmentFinance.revenue
+
+    @hybrid_property
+    def total_expenses(self):
+        return self.finance.total_expenses if self.finance else None
+
+    @total_expenses.expression
+    def total_expenses(cls):
+        from app.models.shipment_finance import ShipmentFinance
+        return ShipmentFinance.total_expenses
+
+    @hybrid_property
+    def profit(self):
+        return self.finance.profit if self.finance else None
+
+    @profit.expression
+    def profit(cls):
+        from app.models.shipment_finance import ShipmentFinance
+        return ShipmentFinance.profit
+
+    @hybrid_property
+    def margin_percent(self):
+        return self.finance.margin_percent if self.finance else None
+
+    @margin_percent.expression
+    def margin_percent(cls):
+        from app.models.shipment_finance import ShipmentFinance
+        return ShipmentFinance.margin_percent
 
     def __repr__(self):
         return f"{self.shipment_code} - {self.cargo_type}"
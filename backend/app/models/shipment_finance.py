@@ -0,0 +1,116 @@
+from sqlalchemy import Column, Float, Integer, DateTime, ForeignKey, event, inspect
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from sqlalchemy.orm import Session
+from app.core.database import Base
+from app.models.shipment import Shipment
+from app.models.expense import Expense
+from app.models.rate import Rate
+
+
+class ShipmentFinance(Base):
+    """Shipment finance - сохранённые финансовые показатели поставки"""
+    __tablename__ = "shipment_finance"
+
+    shipment_id = Column(UUID(as_uuid=True), ForeignKey("shipments.id", ondelete="CASCADE"), primary_key=True)
+
+    revenue = Column(Float, nullable=False, default=0.0)
+    cost_of_goods = Column(Float, nullable=False, default=0.0)
+    total_expenses = Column(Float, nullable=False, default=0.0)
+    # Indexed for sorting / filtering shipment lists by profit and margin
+    profit = Column(Float, nullable=False, default=0.0, index=True)
+    margin_percent = Column(Float, nullable=False, default=0.0, index=True)
+
+    # Incremented on every recalculation
+    version = Column(Integer, nullable=False, default=1)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def as_dict(self):
+        return {
+            "revenue": round(self.revenue, 2),
+            "cost_of_goods": round(self.cost_of_goods, 2),
+            "total_expenses": round(self.total_expenses, 2),
+            "profit": round(self.profit, 2),
+            "margin_percent": round(self.margin_percent, 2)
+        }
+
+
+# Shipment attributes that define its finance_daily rollup row
+ROLLUP_KEY_ATTRS = ("client_id", "supplier_id", "cargo_type", "status")
+
+
+def _changed(obj, *attrs) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[attr].history.has_changes() for attr in attrs)
+
+
+def _previous_bucket(obj):
+    """Rollup key of a shipment as it was before this flush (None if unknown)"""
+    state = inspect(obj)
+    created_at = state.dict.get("created_at")
+    if created_at is None:
+        return None
+
+    values = []
+    for attr in ROLLUP_KEY_ATTRS:
+        history = state.attrs[attr].history
+        if history.deleted:
+            values.append(history.deleted[0])
+        elif history.unchanged:
+            values.append(history.unchanged[0])
+        else:
+            values.append(state.dict.get(attr))
+
+    return (created_at.date(), *values)
+
+
+@event.listens_for(Session, "after_flush")
+def receive_after_flush(session, flush_context):
+    """Recalculate stored finance and daily rollup for shipments affected by this flush"""
+    shipment_ids = set()
+    rate_ids = set()
+    rollup_shipment_ids = set()
+    old_buckets = set()
+
+    for obj in session.new:
+        if isinstance(obj, Shipment):
+            shipment_ids.add(obj.id)
+        elif isinstance(obj, Expense):
+            shipment_ids.add(obj.shipment_id)
+
+    for obj in session.dirty:
+        if isinstance(obj, Shipment):
+            if _changed(obj, "quantity", "rate_id"):
+                shipment_ids.add(obj.id)
+            if _changed(obj, *ROLLUP_KEY_ATTRS):
+                rollup_shipment_ids.add(obj.id)
+                old_buckets.add(_previous_bucket(obj))
+        elif isinstance(obj, Rate) and _changed(obj, "buy_rate", "sell_rate"):
+            rate_ids.add(obj.id)
+        elif isinstance(obj, Expense) and _changed(obj, "amount", "shipment_id"):
+            shipment_ids.add(obj.shipment_id)
+            # Expense moved to another shipment - the old one changes too
+            shipment_ids.update(inspect(obj).attrs.shipment_id.history.deleted or ())
+
+    for obj in session.deleted:
+        if isinstance(obj, Expense):
+            shipment_ids.add(obj.shipment_id)
+        elif isinstance(obj, Shipment):
+            old_buckets.add(_previous_bucket(obj))
+
+    shipment_ids.discard(None)
+    old_buckets.discard(None)
+
+    if shipment_ids or rate_ids:
+        from app.services.finance import refresh_stored_finance
+        refresh_stored_finance(session.connection(), shipment_ids=shipment_ids, rate_ids=rate_ids)
+
+    if shipment_ids or rate_ids or rollup_shipment_ids or old_buckets:
+        from app.services.rollup import refresh_finance_daily
+        refresh_finance_daily(
+            session.connection(),
+            shipment_ids=shipment_ids | rollup_shipment_ids,
+            rate_ids=rate_ids,
+            old_buckets=old_buckets
+        )
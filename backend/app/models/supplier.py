@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime
+from sqlalchemy import Column, String, Text, DateTime, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -8,8 +8,10 @@ import uuid
 class Supplier(Base):
     """Suppliers / Origin - откуда груз (Китай, завод, агент)"""
     __tablename__ = "suppliers"
+    # Keyset pagination order: (created_at, id)
+    __table_args__ = (Index("ix_suppliers_created_at_id", "created_at", "id"),)
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(255), nullable=False)
     country = Column(String(100), nullable=True)
     city = Column(String(100), nullable=True)
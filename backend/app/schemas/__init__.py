@@ -4,6 +4,10 @@ from app.schemas.client import ClientCreate, ClientUpdate, ClientResponse
 from app.schemas.rate import RateCreate, RateUpdate, RateResponse
 from app.schemas.shipment import ShipmentCreate, ShipmentUpdate, ShipmentResponse, ShipmentWithFinance
 from app.schemas.expense import ExpenseCreate, ExpenseUpdate, ExpenseResponse
+from app.schemas.bulk import BulkCreatedItem, BulkItemError, BulkCreateResponse
+from app.schemas.import_job import ImportJobResponse
+from app.schemas.quote import QuoteRequest, QuoteResponse
+from app.schemas.tracking import TrackingResponse
 
 __all__ = [
     "OrderCreate", "OrderResponse", "OrderUpdate",
@@ -12,4 +16,8 @@ __all__ = [
     "RateCreate", "RateUpdate", "RateResponse",
     "ShipmentCreate", "ShipmentUpdate", "ShipmentResponse", "ShipmentWithFinance",
     "ExpenseCreate", "ExpenseUpdate", "ExpenseResponse",
+    "BulkCreatedItem", "BulkItemError", "BulkCreateResponse",
+    "ImportJobResponse",
+    "QuoteRequest", "QuoteResponse",
+    "TrackingResponse",
 ]
@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import List
+from uuid import UUID
+
+
+class BulkCreatedItem(BaseModel):
+    index: int
+    id: UUID
+
+
+class BulkItemError(BaseModel):
+    index: int
+    errors: List[str]
+
+
+class BulkCreateResponse(BaseModel):
+    """Result of a bulk create: created items and rejected items, by position in the request"""
+    created: List[BulkCreatedItem]
+    errors: List[BulkItemError]
@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+from datetime import datetime
+from uuid import UUID
+from app.models.import_job import ImportEntityEnum, ImportStatusEnum
+
+
+class ImportJobResponse(BaseModel):
+    id: UUID
+    entity: ImportEntityEnum
+    filename: str
+    status: ImportStatusEnum
+    rows_processed: int
+    rows_imported: int
+    rows_failed: int
+    errors: List[Dict]
+    error: Optional[str]
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
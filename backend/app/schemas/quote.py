@@ -0,0 +1,21 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import date
+from app.models.order import RouteEnum
+
+
+class QuoteRequest(BaseModel):
+    route: RouteEnum
+    cargo_type: str = Field(..., max_length=255)
+    cargo_weight: Optional[float] = Field(None, gt=0)
+    cargo_volume: Optional[float] = Field(None, gt=0)
+
+
+class QuoteResponse(BaseModel):
+    route: RouteEnum
+    cargo_type: str
+    price: float
+    currency: str
+    unit: str  # kg / cbm the price is charged by
+    unit_price: float
+    valid_on: date
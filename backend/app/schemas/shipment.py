@@ -18,7 +18,8 @@ class ShipmentBase(BaseModel):
 
 
 class ShipmentCreate(ShipmentBase):
-    pass
+    # Resolved from supplier, client, cargo type and departure date when omitted
+    rate_id: Optional[UUID] = None
 
 
 class ShipmentUpdate(BaseModel):
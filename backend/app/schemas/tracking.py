@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date, datetime
+from app.models.shipment import ShipmentStatusEnum
+
+
+class TrackingResponse(BaseModel):
+    shipment_code: str
+    status: ShipmentStatusEnum
+    departure_date: Optional[date] = None
+    arrival_date: Optional[date] = None
+    updated_at: datetime
@@ -0,0 +1,159 @@
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from pydantic import BaseModel, ValidationError
+from typing import Any, Dict, Iterable, List, Sequence, Set, Tuple, Type
+from uuid import UUID
+from app.models.supplier import Supplier
+from app.models.client import Client
+from app.models.rate import Rate
+from app.models.shipment import Shipment
+from app.models.expense import Expense
+from app.models.data_version import DASHBOARD_DATA, bump_data_version
+from app.schemas.shipment import ShipmentCreate
+from app.schemas.expense import ExpenseCreate
+from app.services.finance import refresh_stored_finance
+from app.services.rollup import refresh_finance_daily
+from app.services.rate_resolver import get_rate_index_async
+
+# Max items per bulk request
+MAX_BULK_ITEMS = 20000
+
+# Max values per IN (...) list (asyncpg allows 32767 parameters per statement)
+_CHUNK_SIZE = 5000
+
+
+def _chunks(values: Sequence, size: int = _CHUNK_SIZE) -> Iterable[Sequence]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _error(index: int, *messages: str) -> Dict:
+    return {"index": index, "errors": list(messages)}
+
+
+def _validate(schema: Type[BaseModel], items: List[Dict[str, Any]]) -> Tuple[List[Tuple[int, BaseModel]], List[Dict]]:
+    """Validate every item; returns (index, model) of valid items and errors of the rest"""
+    valid, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, schema.model_validate(item)))
+        except ValidationError as exc:
+            errors.append(_error(index, *(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                for error in exc.errors()
+            )))
+    return valid, errors
+
+
+async def _existing(db: AsyncSession, column, values: Iterable) -> Set:
+    """Subset of values present in the column"""
+    values = list(set(values))
+    found = set()
+    for chunk in _chunks(values):
+        found.update(await db.scalars(select(column).where(column.in_(chunk))))
+    return found
+
+
+async def _insert(db: AsyncSession, model, rows: List[Dict]) -> List[UUID]:
+    """
+    Insert rows with multi-row INSERT ... RETURNING id (batched by the driver);
+    ids come back in the order of rows.
+    """
+    if not rows:
+        return []
+    result = await db.execute(insert(model).returning(model.id, sort_by_parameter_order=True), rows)
+    return list(result.scalars())
+
+
+def _refresh_after_insert(session: Session, shipment_ids: List[UUID]) -> None:
+    """
+    Bulk inserts skip the flush listeners - refresh stored finance, the daily
+    rollup and the dashboard data version the way they would have.
+    """
+    connection = session.connection()
+    for chunk in _chunks(shipment_ids):
+        refresh_stored_finance(connection, shipment_ids=chunk)
+        refresh_finance_daily(connection, shipment_ids=chunk)
+    bump_data_version(session, DASHBOARD_DATA)
+
+
+def _result(accepted: List[Tuple[int, Dict]], ids: List[UUID], errors: List[Dict]) -> Dict:
+    return {
+        "created": [{"index": index, "id": id} for (index, _), id in zip(accepted, ids)],
+        "errors": sorted(errors, key=lambda error: error["index"])
+    }
+
+
+async def bulk_create_shipments(db: AsyncSession, items: List[Dict[str, Any]]) -> Dict:
+    """
+    Create shipments in one multi-row INSERT.
+
+    Missing rate_id is resolved like in create_shipment. Items failing
+    validation, referencing missing suppliers / clients / rates or reusing
+    a shipment code are reported by index and skipped; the rest are created.
+    """
+    valid, errors = _validate(ShipmentCreate, items)
+
+    suppliers = await _existing(db, Supplier.id, (item.supplier_id for _, item in valid))
+    clients = await _existing(db, Client.id, (item.client_id for _, item in valid))
+    rates = await _existing(db, Rate.id, (item.rate_id for _, item in valid if item.rate_id))
+    rate_index = await get_rate_index_async(db)
+    taken_codes = await _existing(db, Shipment.shipment_code, (item.shipment_code for _, item in valid))
+
+    accepted = []
+    for index, item in valid:
+        problems = []
+        if item.supplier_id not in suppliers:
+            problems.append(f"supplier_id: Supplier {item.supplier_id} not found")
+        if item.client_id not in clients:
+            problems.append(f"client_id: Client {item.client_id} not found")
+        if item.rate_id is None:
+            item.rate_id = rate_index.resolve(item.supplier_id, item.client_id, item.cargo_type, item.departure_date)
+            if item.rate_id is None:
+                problems.append(f"rate_id: No rate of this supplier for cargo type '{item.cargo_type}' on the departure date")
+        elif item.rate_id not in rates:
+            problems.append(f"rate_id: Rate {item.rate_id} not found")
+        if item.shipment_code in taken_codes:
+            problems.append(f"shipment_code: Shipment code '{item.shipment_code}' already exists")
+
+        if problems:
+            errors.append(_error(index, *problems))
+            continue
+
+        # Later duplicates within the batch are rejected
+        taken_codes.add(item.shipment_code)
+        accepted.append((index, item.model_dump()))
+
+    ids = await _insert(db, Shipment, [row for _, row in accepted])
+    if ids:
+        await db.run_sync(_refresh_after_insert, ids)
+    await db.commit()
+
+    return _result(accepted, ids, errors)
+
+
+async def bulk_create_expenses(db: AsyncSession, items: List[Dict[str, Any]]) -> Dict:
+    """
+    Create expenses in one multi-row INSERT.
+
+    Items failing validation or referencing missing shipments are reported by
+    index and skipped; the rest are created.
+    """
+    valid, errors = _validate(ExpenseCreate, items)
+
+    shipments = await _existing(db, Shipment.id, (item.shipment_id for _, item in valid))
+
+    accepted = []
+    for index, item in valid:
+        if item.shipment_id not in shipments:
+            errors.append(_error(index, f"shipment_id: Shipment {item.shipment_id} not found"))
+            continue
+        accepted.append((index, item.model_dump()))
+
+    ids = await _insert(db, Expense, [row for _, row in accepted])
+    if ids:
+        await db.run_sync(_refresh_after_insert, list({row["shipment_id"] for _, row in accepted}))
+    await db.commit()
+
+    return _result(accepted, ids, errors)
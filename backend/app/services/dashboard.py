@@ -0,0 +1,152 @@
+from functools import partial
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select, case
+from typing import Dict, List, Optional, Tuple
+import anyio
+from app.core.cache import VersionedCache
+from app.core.config import settings
+from app.core.database import SessionLocal, ReadSessionLocal, reads_on_replica
+from app.models.client import Client
+from app.models.supplier import Supplier
+from app.models.shipment import Shipment, ShipmentStatusEnum
+from app.models.data_version import DASHBOARD_DATA, get_data_version
+from app.services.finance import stored_finance_subquery
+
+# Columns the per-client table can be sorted by
+CLIENT_SORT_FIELDS = ("profit", "revenue", "volume", "shipments_count", "margin_percent")
+
+dashboard_cache = VersionedCache(
+    ttl=settings.DASHBOARD_CACHE_TTL,
+    stale_ttl=settings.DASHBOARD_CACHE_STALE_TTL
+)
+
+
+def _margin_expr(profit, revenue):
+    return case((revenue > 0, profit / revenue * 100), else_=0.0)
+
+
+def get_overview_stats(db: Session) -> Dict:
+    """Entity counts and shipment counts by status in one query"""
+    row = db.execute(
+        select(
+            select(func.count(Client.id)).scalar_subquery().label("total_clients"),
+            select(func.count(Supplier.id)).scalar_subquery().label("total_suppliers"),
+            func.count(Shipment.id).label("total_shipments"),
+            func.count(Shipment.id).filter(Shipment.status == ShipmentStatusEnum.DELIVERED).label("delivered_count"),
+            func.count(Shipment.id).filter(Shipment.status == ShipmentStatusEnum.IN_TRANSIT).label("in_transit_count"),
+            func.count(Shipment.id).filter(Shipment.status == ShipmentStatusEnum.PLANNED).label("planned_count"),
+        ).select_from(Shipment)
+    ).one()
+
+    return dict(row._mapping)
+
+
+def get_finance_totals(db: Session) -> Dict:
+    """Global finance totals in one query"""
+    finance = stored_finance_subquery()
+    total_revenue = func.coalesce(func.sum(finance.c.revenue), 0.0)
+    total_profit = func.coalesce(func.sum(finance.c.profit), 0.0)
+
+    row = db.execute(
+        select(
+            total_revenue.label("total_revenue"),
+            func.coalesce(func.sum(finance.c.cost_of_goods), 0.0).label("total_cost"),
+            func.coalesce(func.sum(finance.c.total_expenses), 0.0).label("total_expenses"),
+            total_profit.label("total_profit"),
+            _margin_expr(total_profit, total_revenue).label("avg_margin"),
+        )
+    ).one()
+
+    return dict(row._mapping)
+
+
+def get_clients_stats(
+    db: Session,
+    sort_by: str = "profit",
+    limit: Optional[int] = None
+) -> List[Dict]:
+    """
+    Per-client shipments, volume, revenue, profit and margin in one query.
+
+    Clients without shipments are skipped. Sorting and top-N are done in SQL.
+    """
+    if sort_by not in CLIENT_SORT_FIELDS:
+        raise ValueError(f"Unknown sort field '{sort_by}'")
+
+    finance = stored_finance_subquery()
+    revenue = func.sum(finance.c.revenue)
+    profit = func.sum(finance.c.profit)
+
+    columns = {
+        "shipments_count": func.count(finance.c.shipment_id),
+        "volume": func.sum(finance.c.quantity),
+        "revenue": revenue,
+        "profit": profit,
+        "margin_percent": _margin_expr(profit, revenue),
+    }
+
+    stmt = (
+        select(
+            Client.client_number,
+            Client.name,
+            func.coalesce(Client.company_name, "—").label("company"),
+            *(column.label(name) for name, column in columns.items())
+        )
+        .join(finance, finance.c.client_id == Client.id)
+        .group_by(Client.id)
+        .order_by(columns[sort_by].desc(), Client.client_number)
+    )
+
+    if limit is not None:
+        stmt = stmt.limit(limit)
+
+    return [dict(row._mapping) for row in db.execute(stmt)]
+
+
+def get_dashboard_stats(
+    db: Session,
+    sort_by: str = "profit",
+    limit: Optional[int] = None
+) -> Dict:
+    """Get overall dashboard statistics"""
+    return {
+        "overview": get_overview_stats(db),
+        "finance": get_finance_totals(db),
+        "clients": get_clients_stats(db, sort_by=sort_by, limit=limit)
+    }
+
+
+def _load_dashboard_stats(sort_by: str, limit: Optional[int], replica: bool = False) -> Tuple[int, Dict]:
+    """Compute dashboard stats in a dedicated session (may run in a background thread)"""
+    db = ReadSessionLocal() if replica else SessionLocal()
+    try:
+        version = get_data_version(db, DASHBOARD_DATA)
+        return version, get_dashboard_stats(db, sort_by=sort_by, limit=limit)
+    finally:
+        db.close()
+
+
+async def get_cached_dashboard_stats(
+    db: AsyncSession,
+    sort_by: str = "profit",
+    limit: Optional[int] = None
+) -> Dict:
+    """
+    Dashboard statistics served from dashboard_cache.
+
+    Costs one primary-key lookup of the data version while the cache is warm.
+    Cache misses load synchronously (and may wait for another loader), so the
+    cache is consulted in a worker thread to keep the event loop free.
+    The returned dict is shared between requests and must not be modified.
+    """
+    if sort_by not in CLIENT_SORT_FIELDS:
+        raise ValueError(f"Unknown sort field '{sort_by}'")
+
+    version = await db.run_sync(get_data_version, DASHBOARD_DATA)
+    return await anyio.to_thread.run_sync(
+        dashboard_cache.get,
+        (sort_by, limit),
+        version,
+        partial(_load_dashboard_stats, sort_by, limit, replica=reads_on_replica.get())
+    )
@@ -0,0 +1,205 @@
+import csv
+import enum
+import io
+import json
+from datetime import date, datetime, timedelta
+from sqlalchemy import Select, select
+from typing import AsyncIterator, Iterable, List, Optional
+from uuid import UUID
+from app.core.database import AsyncSessionLocal, AsyncReadSessionLocal
+from app.models.client import Client
+from app.models.supplier import Supplier
+from app.models.rate import Rate
+from app.models.shipment import Shipment, ShipmentStatusEnum
+from app.models.shipment_finance import ShipmentFinance
+from app.services.timeseries import DateFieldEnum
+
+
+class ExportFormatEnum(str, enum.Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+    PARQUET = "parquet"
+
+
+MEDIA_TYPES = {
+    ExportFormatEnum.CSV: "text/csv",
+    ExportFormatEnum.NDJSON: "application/x-ndjson",
+    ExportFormatEnum.PARQUET: "application/vnd.apache.parquet",
+}
+
+# Rows fetched from the server-side cursor (and written) at a time
+EXPORT_BATCH_SIZE = 5000
+
+# Exported column -> (SQL expression, parquet type name)
+EXPORT_COLUMNS = {
+    "shipment_id": (Shipment.id, "string"),
+    "shipment_code": (Shipment.shipment_code, "string"),
+    "created_at": (Shipment.created_at, "timestamp"),
+    "departure_date": (Shipment.departure_date, "date"),
+    "arrival_date": (Shipment.arrival_date, "date"),
+    "status": (Shipment.status, "string"),
+    "client_number": (Client.client_number, "string"),
+    "client_name": (Client.name, "string"),
+    "supplier_name": (Supplier.name, "string"),
+    "cargo_type": (Shipment.cargo_type, "string"),
+    "quantity": (Shipment.quantity, "float"),
+    "unit": (Rate.unit, "string"),
+    "currency": (Rate.currency, "string"),
+    "buy_rate": (Rate.buy_rate, "float"),
+    "sell_rate": (Rate.sell_rate, "float"),
+    "revenue": (ShipmentFinance.revenue, "float"),
+    "cost_of_goods": (ShipmentFinance.cost_of_goods, "float"),
+    "total_expenses": (ShipmentFinance.total_expenses, "float"),
+    "profit": (ShipmentFinance.profit, "float"),
+    "margin_percent": (ShipmentFinance.margin_percent, "float"),
+}
+
+
+def export_select(
+    date_field: DateFieldEnum = DateFieldEnum.CREATED_AT,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    client_id: Optional[UUID] = None,
+    supplier_id: Optional[UUID] = None,
+    status: Optional[ShipmentStatusEnum] = None
+) -> Select:
+    """
+    Shipment lines with stored finance, ordered by the date field.
+
+    Plain joins with no aggregation, so rows stream from the first one;
+    created_at periods are range scans on (created_at, id).
+    """
+    stmt = (
+        select(*(column.label(name) for name, (column, _) in EXPORT_COLUMNS.items()))
+        .join(ShipmentFinance, ShipmentFinance.shipment_id == Shipment.id)
+        .join(Client, Client.id == Shipment.client_id)
+        .join(Supplier, Supplier.id == Shipment.supplier_id)
+        .join(Rate, Rate.id == Shipment.rate_id)
+    )
+
+    day = getattr(Shipment, date_field.value)
+    if date_field == DateFieldEnum.CREATED_AT:
+        # Compare the timestamp itself so the index is used
+        if date_from:
+            stmt = stmt.where(day >= date_from)
+        if date_to:
+            stmt = stmt.where(day < date_to + timedelta(days=1))
+    else:
+        if date_from:
+            stmt = stmt.where(day >= date_from)
+        if date_to:
+            stmt = stmt.where(day <= date_to)
+
+    if client_id:
+        stmt = stmt.where(Shipment.client_id == client_id)
+    if supplier_id:
+        stmt = stmt.where(Shipment.supplier_id == supplier_id)
+    if status:
+        stmt = stmt.where(Shipment.status == status)
+
+    return stmt.order_by(day, Shipment.id)
+
+
+def _plain(value):
+    """JSON / CSV friendly value"""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _csv_lines(rows: Iterable) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([_plain(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+def _ndjson_lines(rows: Iterable) -> str:
+    names = list(EXPORT_COLUMNS)
+    return "".join(
+        json.dumps(dict(zip(names, map(_plain, row))), ensure_ascii=False) + "\n"
+        for row in rows
+    )
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file collecting what the parquet writer produced since the last take()"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def take(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+def _parquet_schema():
+    import pyarrow as pa
+
+    types = {"string": pa.string(), "timestamp": pa.timestamp("us", tz="UTC"), "date": pa.date32(), "float": pa.float64()}
+    return pa.schema([(name, types[type_name]) for name, (_, type_name) in EXPORT_COLUMNS.items()])
+
+
+def check_format_available(export_format: ExportFormatEnum) -> None:
+    """Raise RuntimeError if the format needs a library that isn't installed"""
+    if export_format == ExportFormatEnum.PARQUET:
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            raise RuntimeError("Parquet export needs pyarrow: pip install pyarrow")
+
+
+async def stream_export(stmt: Select, export_format: ExportFormatEnum, replica: bool = False) -> AsyncIterator:
+    """
+    Export rows in the given format, EXPORT_BATCH_SIZE rows at a time.
+
+    Rows come from a server-side cursor (yield_per), so memory stays flat
+    whatever the period. The header (parquet magic) is sent before the query
+    runs. Uses its own session: the response outlives the request's one.
+    """
+    names = list(EXPORT_COLUMNS)
+    writer = sink = None
+
+    if export_format == ExportFormatEnum.CSV:
+        yield _csv_lines([names])
+    elif export_format == ExportFormatEnum.PARQUET:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = _parquet_schema()
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+        if header := sink.take():
+            yield header
+
+    session_maker = AsyncReadSessionLocal if replica else AsyncSessionLocal
+    async with session_maker() as db:
+        result = await db.stream(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            if export_format == ExportFormatEnum.CSV:
+                yield _csv_lines(rows)
+            elif export_format == ExportFormatEnum.NDJSON:
+                yield _ndjson_lines(rows)
+            else:
+                # One row group per batch
+                columns = list(zip(*rows))
+                writer.write_table(pa.table({
+                    name: [_plain(value) if isinstance(value, (enum.Enum, UUID)) else value for value in column]
+                    for name, column in zip(names, columns)
+                }, schema=schema))
+                yield sink.take()
+
+    if writer is not None:
+        writer.close()
+        yield sink.take()
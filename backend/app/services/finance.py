@@ -1,11 +1,220 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.orm import Session, Query
+from sqlalchemy import func, select, Select, case, literal, or_, true
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.shipment import Shipment
 from app.models.expense import Expense
 from app.models.rate import Rate
-from typing import Dict
+from app.models.shipment_finance import ShipmentFinance
+from typing import Dict, Iterable, List, Optional, Union
 from uuid import UUID
 
+# A set of shipments: ORM query, select() statement, iterable of ids or None (all shipments)
+ShipmentSet = Optional[Union[Query, Select, Iterable[UUID]]]
+
+
+def _shipment_ids_filter(shipments: ShipmentSet):
+    """Build a WHERE clause restricting Shipment.id to the given set"""
+    if shipments is None:
+        return None
+
+    if isinstance(shipments, Query):
+        return Shipment.id.in_(shipments.with_entities(Shipment.id).scalar_subquery())
+
+    if isinstance(shipments, Select):
+        return Shipment.id.in_(shipments.with_only_columns(Shipment.id).scalar_subquery())
+
+    return Shipment.id.in_(list(shipments))
+
+
+def finance_subquery(shipments: ShipmentSet = None):
+    """
+    Per-shipment finance as a subquery (one row per shipment).
+
+    Columns: shipment_id, client_id, supplier_id, cargo_type, status, created_at,
+    departure_date, arrival_date, quantity, revenue, cost_of_goods, total_expenses, profit
+    """
+    revenue = Shipment.quantity * Rate.sell_rate
+    cost_of_goods = Shipment.quantity * Rate.buy_rate
+    total_expenses = func.coalesce(func.sum(Expense.amount), 0.0)
+
+    stmt = (
+        select(
+            Shipment.id.label("shipment_id"),
+            Shipment.client_id,
+            Shipment.supplier_id,
+            Shipment.cargo_type,
+            Shipment.status,
+            Shipment.created_at,
+            Shipment.departure_date,
+            Shipment.arrival_date,
+            Shipment.quantity,
+            revenue.label("revenue"),
+            cost_of_goods.label("cost_of_goods"),
+            total_expenses.label("total_expenses"),
+            (revenue - cost_of_goods - total_expenses).label("profit"),
+        )
+        .join(Rate, Rate.id == Shipment.rate_id)
+        .outerjoin(Expense, Expense.shipment_id == Shipment.id)
+        .group_by(Shipment.id, Rate.id)
+    )
+
+    ids_filter = _shipment_ids_filter(shipments)
+    if ids_filter is not None:
+        stmt = stmt.where(ids_filter)
+
+    return stmt.subquery("live_finance")
+
+
+def stored_finance_subquery(shipments: ShipmentSet = None):
+    """
+    Per-shipment finance read from the shipment_finance table.
+
+    Same columns as finance_subquery().
+    """
+    stmt = (
+        select(
+            Shipment.id.label("shipment_id"),
+            Shipment.client_id,
+            Shipment.supplier_id,
+            Shipment.cargo_type,
+            Shipment.status,
+            Shipment.created_at,
+            Shipment.departure_date,
+            Shipment.arrival_date,
+            Shipment.quantity,
+            ShipmentFinance.revenue,
+            ShipmentFinance.cost_of_goods,
+            ShipmentFinance.total_expenses,
+            ShipmentFinance.profit,
+        )
+        .join(ShipmentFinance, ShipmentFinance.shipment_id == Shipment.id)
+    )
+
+    ids_filter = _shipment_ids_filter(shipments)
+    if ids_filter is not None:
+        stmt = stmt.where(ids_filter)
+
+    return stmt.subquery("stored_shipment_finance")
+
+
+def shipment_finance_criteria(
+    min_profit: Optional[float] = None,
+    max_profit: Optional[float] = None,
+    min_margin_percent: Optional[float] = None,
+    max_margin_percent: Optional[float] = None
+) -> List:
+    """WHERE criteria on stored finance; the query must join Shipment.finance"""
+    criteria = []
+    if min_profit is not None:
+        criteria.append(Shipment.profit >= min_profit)
+    if max_profit is not None:
+        criteria.append(Shipment.profit <= max_profit)
+    if min_margin_percent is not None:
+        criteria.append(Shipment.margin_percent >= min_margin_percent)
+    if max_margin_percent is not None:
+        criteria.append(Shipment.margin_percent <= max_margin_percent)
+    return criteria
+
+
+def _margin(profit: float, revenue: float) -> float:
+    return (profit / revenue * 100) if revenue > 0 else 0.0
+
+
+def _finance_select(shipments: ShipmentSet) -> Select:
+    finance = finance_subquery(shipments)
+    return select(
+        finance.c.shipment_id,
+        finance.c.revenue,
+        finance.c.cost_of_goods,
+        finance.c.total_expenses,
+        finance.c.profit,
+    )
+
+
+def _finance_by_shipment(rows) -> Dict[UUID, Dict[str, float]]:
+    return {
+        row.shipment_id: {
+            "revenue": round(row.revenue, 2),
+            "cost_of_goods": round(row.cost_of_goods, 2),
+            "total_expenses": round(row.total_expenses, 2),
+            "profit": round(row.profit, 2),
+            "margin_percent": round(_margin(row.profit, row.revenue), 2)
+        }
+        for row in rows
+    }
+
+
+def calculate_finance_for(shipments: ShipmentSet, db: Session) -> Dict[UUID, Dict[str, float]]:
+    """
+    Calculate financial metrics for a set of shipments in one query.
+
+    Args:
+        shipments: ORM query / select() of shipments, iterable of shipment ids or None for all
+        db: Database session
+
+    Returns:
+        dict shipment_id -> dict with keys: revenue, cost_of_goods, total_expenses, profit, margin_percent
+    """
+    return _finance_by_shipment(db.execute(_finance_select(shipments)).all())
+
+
+async def calculate_finance_for_async(shipments: ShipmentSet, db: AsyncSession) -> Dict[UUID, Dict[str, float]]:
+    """Async version of calculate_finance_for()"""
+    result = await db.execute(_finance_select(shipments))
+    return _finance_by_shipment(result.all())
+
+
+def _summary_select(shipments: ShipmentSet, stored: bool) -> Select:
+    finance = stored_finance_subquery(shipments) if stored else finance_subquery(shipments)
+    return select(
+        func.count(finance.c.shipment_id).label("shipments_count"),
+        func.coalesce(func.sum(finance.c.quantity), 0.0).label("total_volume"),
+        func.coalesce(func.sum(finance.c.revenue), 0.0).label("revenue"),
+        func.coalesce(func.sum(finance.c.cost_of_goods), 0.0).label("cost_of_goods"),
+        func.coalesce(func.sum(finance.c.total_expenses), 0.0).label("total_expenses"),
+        func.coalesce(func.sum(finance.c.profit), 0.0).label("profit"),
+    )
+
+
+def _summary(row) -> Dict[str, float]:
+    return {
+        "shipments_count": row.shipments_count,
+        "total_volume": row.total_volume,
+        "revenue": row.revenue,
+        "cost_of_goods": row.cost_of_goods,
+        "total_expenses": row.total_expenses,
+        "profit": row.profit,
+        "margin_percent": _margin(row.profit, row.revenue)
+    }
+
+
+def summarize_finance(shipments: ShipmentSet, db: Session, stored: bool = True) -> Dict[str, float]:
+    """
+    Aggregate financial metrics over a set of shipments in one query.
+
+    By default reads the shipment_finance table; pass stored=False to compute live.
+
+    Returns:
+        dict with keys: shipments_count, total_volume, revenue, cost_of_goods,
+        total_expenses, profit, margin_percent
+    """
+    return _summary(db.execute(_summary_select(shipments, stored)).one())
+
+
+async def summarize_finance_async(shipments: ShipmentSet, db: AsyncSession, stored: bool = True) -> Dict[str, float]:
+    """Async version of summarize_finance()"""
+    result = await db.execute(_summary_select(shipments, stored))
+    return _summary(result.one())
+
+
+def _single_shipment(shipment_id: UUID, finance: Dict[UUID, Dict[str, float]]) -> Dict[str, float]:
+    if shipment_id not in finance:
+        raise ValueError(f"Shipment {shipment_id} not found")
+
+    return finance[shipment_id]
+
 
 def calculate_shipment_finance(shipment_id: UUID, db: Session) -> Dict[str, float]:
     """
@@ -14,44 +223,170 @@ def calculate_shipment_finance(shipment_id: UUID, db: Session) -> Dict[str, floa
     Returns:
         dict with keys: revenue, cost_of_goods, total_expenses, profit, margin_percent
     """
-    # Get shipment with rate
-    shipment = db.query(Shipment).filter(Shipment.id == shipment_id).first()
+    return _single_shipment(shipment_id, calculate_finance_for([shipment_id], db))
 
-    if not shipment:
-        raise ValueError(f"Shipment {shipment_id} not found")
 
-    # Get rate
-    rate = db.query(Rate).filter(Rate.id == shipment.rate_id).first()
+async def calculate_shipment_finance_async(shipment_id: UUID, db: AsyncSession) -> Dict[str, float]:
+    """Async version of calculate_shipment_finance()"""
+    return _single_shipment(shipment_id, await calculate_finance_for_async([shipment_id], db))
 
-    if not rate:
-        raise ValueError(f"Rate {shipment.rate_id} not found")
 
-    # Calculate revenue = quantity × sell_rate
-    revenue = shipment.quantity * rate.sell_rate
+def get_stored_finance(shipment_id: UUID, db: Session) -> Dict[str, float]:
+    """
+    Read financial metrics of a shipment from the shipment_finance table.
 
-    # Calculate cost of goods = quantity × buy_rate
-    cost_of_goods = shipment.quantity * rate.buy_rate
+    Falls back to live calculation if the row has not been built yet.
+    """
+    stored = db.get(ShipmentFinance, shipment_id)
 
-    # Calculate total expenses
-    total_expenses_result = db.query(func.sum(Expense.amount))\
-        .filter(Expense.shipment_id == shipment_id)\
-        .scalar()
+    if stored is None:
+        return calculate_shipment_finance(shipment_id, db)
 
-    total_expenses = total_expenses_result if total_expenses_result else 0.0
+    return stored.as_dict()
 
-    # Calculate profit = revenue - cost_of_goods - total_expenses
-    profit = revenue - cost_of_goods - total_expenses
 
-    # Calculate margin % = (profit / revenue) × 100
-    margin_percent = (profit / revenue * 100) if revenue > 0 else 0.0
+async def get_stored_finance_async(shipment_id: UUID, db: AsyncSession) -> Dict[str, float]:
+    """Async version of get_stored_finance()"""
+    stored = await db.get(ShipmentFinance, shipment_id)
 
-    return {
-        "revenue": round(revenue, 2),
-        "cost_of_goods": round(cost_of_goods, 2),
-        "total_expenses": round(total_expenses, 2),
-        "profit": round(profit, 2),
-        "margin_percent": round(margin_percent, 2)
-    }
+    if stored is None:
+        return await calculate_shipment_finance_async(shipment_id, db)
+
+    return stored.as_dict()
+
+
+def _stored_finance_select(shipment_ids: List[UUID]) -> Select:
+    return select(ShipmentFinance).where(ShipmentFinance.shipment_id.in_(shipment_ids))
+
+
+def get_stored_finance_for(shipment_ids: Iterable[UUID], db: Session) -> Dict[UUID, Dict[str, float]]:
+    """
+    Read financial metrics of many shipments from the shipment_finance table.
+
+    Shipments without a stored row are calculated live, in one extra query.
+    """
+    shipment_ids = list(shipment_ids)
+    if not shipment_ids:
+        return {}
+
+    finance = {row.shipment_id: row.as_dict() for row in db.scalars(_stored_finance_select(shipment_ids))}
+
+    missing = [shipment_id for shipment_id in shipment_ids if shipment_id not in finance]
+    if missing:
+        finance.update(calculate_finance_for(missing, db))
+
+    return finance
+
+
+async def get_stored_finance_for_async(shipment_ids: Iterable[UUID], db: AsyncSession) -> Dict[UUID, Dict[str, float]]:
+    """Async version of get_stored_finance_for()"""
+    shipment_ids = list(shipment_ids)
+    if not shipment_ids:
+        return {}
+
+    result = await db.scalars(_stored_finance_select(shipment_ids))
+    finance = {row.shipment_id: row.as_dict() for row in result}
+
+    missing = [shipment_id for shipment_id in shipment_ids if shipment_id not in finance]
+    if missing:
+        finance.update(await calculate_finance_for_async(missing, db))
+
+    return finance
+
+
+def _upsert_stored_finance(shipments: ShipmentSet):
+    """Build INSERT ... ON CONFLICT statement recalculating shipment_finance rows"""
+    finance = finance_subquery(shipments)
+    margin_percent = case(
+        (finance.c.revenue > 0, finance.c.profit / finance.c.revenue * 100),
+        else_=0.0
+    )
+
+    stmt = insert(ShipmentFinance).from_select(
+        ["shipment_id", "revenue", "cost_of_goods", "total_expenses", "profit", "margin_percent", "version"],
+        select(
+            finance.c.shipment_id,
+            finance.c.revenue,
+            finance.c.cost_of_goods,
+            finance.c.total_expenses,
+            finance.c.profit,
+            margin_percent,
+            literal(1),
+        ).where(true())  # keeps INSERT ... SELECT ... ON CONFLICT unambiguous for SQLite
+    )
+
+    return stmt.on_conflict_do_update(
+        index_elements=[ShipmentFinance.shipment_id],
+        set_={
+            "revenue": stmt.excluded.revenue,
+            "cost_of_goods": stmt.excluded.cost_of_goods,
+            "total_expenses": stmt.excluded.total_expenses,
+            "profit": stmt.excluded.profit,
+            "margin_percent": stmt.excluded.margin_percent,
+            "version": ShipmentFinance.version + 1,
+            "updated_at": func.now(),
+        }
+    )
+
+
+def refresh_stored_finance(
+    connection: Connection,
+    shipment_ids: Iterable[UUID] = (),
+    rate_ids: Iterable[UUID] = ()
+) -> None:
+    """
+    Recalculate shipment_finance rows for the given shipments and for all
+    shipments priced by the given rates, in one statement.
+    """
+    shipment_ids = list(shipment_ids)
+    rate_ids = list(rate_ids)
+
+    criteria = []
+    if shipment_ids:
+        criteria.append(Shipment.id.in_(shipment_ids))
+    if rate_ids:
+        criteria.append(Shipment.rate_id.in_(rate_ids))
+
+    if not criteria:
+        return
+
+    connection.execute(_upsert_stored_finance(select(Shipment).where(or_(*criteria))))
+
+
+def rebuild_stored_finance(db: Session) -> None:
+    """Recalculate shipment_finance rows for all shipments"""
+    db.execute(_upsert_stored_finance(None))
+    db.commit()
+
+
+def verify_stored_finance(db: Session, tolerance: float = 0.01) -> List[Dict]:
+    """
+    Compare shipment_finance rows with the live calculation.
+
+    Returns:
+        list of mismatches: dicts with shipment_id, field, stored, live
+    """
+    live = calculate_finance_for(None, db)
+    stored = {row.shipment_id: row.as_dict() for row in db.query(ShipmentFinance).all()}
+
+    mismatches = []
+    for shipment_id, live_finance in live.items():
+        stored_finance = stored.get(shipment_id)
+
+        if stored_finance is None:
+            mismatches.append({"shipment_id": shipment_id, "field": None, "stored": None, "live": live_finance})
+            continue
+
+        for field, value in live_finance.items():
+            if abs(stored_finance[field] - value) > tolerance:
+                mismatches.append({
+                    "shipment_id": shipment_id,
+                    "field": field,
+                    "stored": stored_finance[field],
+                    "live": value
+                })
+
+    return mismatches
 
 
 def calculate_shipment_with_finance(shipment: Shipment, db: Session) -> Dict:
@@ -65,8 +400,15 @@ def calculate_shipment_with_finance(shipment: Shipment, db: Session) -> Dict:
     Returns:
         dict with shipment data and financial metrics
     """
-    finance = calculate_shipment_finance(shipment.id, db)
+    return _shipment_with_finance(shipment, get_stored_finance(shipment.id, db))
+
+
+async def calculate_shipment_with_finance_async(shipment: Shipment, db: AsyncSession) -> Dict:
+    """Async version of calculate_shipment_with_finance()"""
+    return _shipment_with_finance(shipment, await get_stored_finance_async(shipment.id, db))
+
 
+def _shipment_with_finance(shipment: Shipment, finance: Dict[str, float]) -> Dict:
     return {
         "id": shipment.id,
         "shipment_code": shipment.shipment_code,
@@ -0,0 +1,500 @@
+import csv
+import enum
+import hashlib
+import io
+import itertools
+import logging
+import os
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from sqlalchemy import Column, MetaData, Table, Text, Enum, and_, cast, func, insert, or_, select, true, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from pydantic import BaseModel, ValidationError
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple, Type
+from uuid import UUID, uuid4
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.supplier import Supplier
+from app.models.client import Client
+from app.models.rate import Rate
+from app.models.shipment import Shipment
+from app.models.expense import Expense
+from app.models.data_version import DASHBOARD_DATA, RATES_DATA, bump_data_version
+from app.models.import_job import ImportJob, ImportEntityEnum, ImportStatusEnum
+from app.schemas.rate import RateCreate
+from app.schemas.shipment import ShipmentCreate
+from app.schemas.expense import ExpenseCreate
+from app.services.finance import refresh_stored_finance
+from app.services.rollup import refresh_finance_daily
+from app.services.rate_resolver import get_rate_index
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = (".csv", ".xlsx")
+
+# Rows per COPY + merge transaction; progress is committed after each chunk
+CHUNK_SIZE = 5000
+
+# Rejected rows kept on the job
+MAX_STORED_ERRORS = 100
+
+# First data line of a file (line 1 is the header)
+_FIRST_LINE = 2
+
+# (line, row) where row maps header -> cell value
+Line = Tuple[int, Dict[str, Any]]
+
+
+class RowError(ValueError):
+    """A file row that can't be imported"""
+
+
+def save_upload(source: BinaryIO, path: str) -> str:
+    """Copy an uploaded file to path and return its sha256 (blocking: run in a worker thread)"""
+    digest = hashlib.sha256()
+    with open(path, "wb") as target:
+        for block in iter(lambda: source.read(1 << 20), b""):
+            digest.update(block)
+            target.write(block)
+    return digest.hexdigest()
+
+
+def file_checksum(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _cell(value: Any) -> Optional[str]:
+    """Normalize a CSV / XLSX cell to the string form the schemas parse (None if blank)"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    value = str(value).strip()
+    return value or None
+
+
+def read_rows(path: str) -> Iterator[Dict[str, Optional[str]]]:
+    """Stream data rows of a CSV or XLSX file (first sheet) as header -> value dicts"""
+    extension = Path(path).suffix.lower()
+
+    if extension == ".csv":
+        with open(path, newline="", encoding="utf-8-sig") as file:
+            reader = csv.reader(file)
+            header = [_cell(name) for name in next(reader, [])]
+            for values in reader:
+                yield dict(zip(header, map(_cell, values)))
+
+    elif extension == ".xlsx":
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise RuntimeError("XLSX import needs openpyxl: pip install openpyxl")
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = [_cell(name) for name in next(rows, ())]
+            for values in rows:
+                yield dict(zip(header, map(_cell, values)))
+        finally:
+            workbook.close()
+
+    else:
+        raise ValueError(f"Unsupported file type '{extension}', expected one of: {', '.join(SUPPORTED_EXTENSIONS)}")
+
+
+class ReferenceLookup:
+    """Supplier, client and rate references, loaded once per import"""
+
+    def __init__(self, db: Session):
+        # Supplier name (case-insensitive) -> id; None when the name is not unique
+        self.suppliers: Dict[str, Optional[UUID]] = {}
+        self.supplier_ids = set()
+        for supplier_id, name in db.execute(select(Supplier.id, Supplier.name)):
+            key = name.strip().casefold()
+            self.suppliers[key] = None if key in self.suppliers else supplier_id
+            self.supplier_ids.add(supplier_id)
+
+        self.clients: Dict[str, UUID] = dict(db.execute(select(Client.client_number, Client.id)).all())
+        self.client_ids = set(self.clients.values())
+
+        self.rates = get_rate_index(db)
+        self.rate_ids = set(db.scalars(select(Rate.id)))
+
+    @staticmethod
+    def _by_id(value: str, known, label: str) -> UUID:
+        try:
+            ref = UUID(value)
+        except ValueError:
+            raise RowError(f"{label.lower()}_id: Invalid id '{value}'")
+        if ref not in known:
+            raise RowError(f"{label.lower()}_id: {label} {ref} not found")
+        return ref
+
+    def supplier(self, row: Dict) -> UUID:
+        """Supplier by supplier_id or by supplier (name)"""
+        if row.get("supplier_id"):
+            return self._by_id(row["supplier_id"], self.supplier_ids, "Supplier")
+
+        name = row.get("supplier")
+        if not name:
+            raise RowError("supplier: Field required")
+        key = name.casefold()
+        if key not in self.suppliers:
+            raise RowError(f"supplier: Supplier '{name}' not found")
+        if self.suppliers[key] is None:
+            raise RowError(f"supplier: Several suppliers are named '{name}', use supplier_id")
+        return self.suppliers[key]
+
+    def client(self, row: Dict, required: bool = True) -> Optional[UUID]:
+        """Client by client_id or by client (client number)"""
+        if row.get("client_id"):
+            return self._by_id(row["client_id"], self.client_ids, "Client")
+
+        number = row.get("client")
+        if not number:
+            if required:
+                raise RowError("client: Field required")
+            return None
+        if number not in self.clients:
+            raise RowError(f"client: Client '{number}' not found")
+        return self.clients[number]
+
+    def rate(self, row: Dict, supplier_id: UUID, client_id: UUID) -> UUID:
+        """Rate by rate_id, else resolved for the cargo type and departure date"""
+        if row.get("rate_id"):
+            return self._by_id(row["rate_id"], self.rate_ids, "Rate")
+
+        try:
+            on_date = date.fromisoformat(row["departure_date"]) if row.get("departure_date") else None
+        except ValueError:
+            raise RowError(f"departure_date: Invalid date '{row['departure_date']}'")
+
+        rate_id = self.rates.resolve(supplier_id, client_id, row.get("cargo_type") or "", on_date)
+        if rate_id is None:
+            raise RowError(f"rate_id: No rate for supplier, client and cargo type '{row.get('cargo_type')}'")
+        return rate_id
+
+
+def _validate(schema: Type[BaseModel], data: Dict) -> Dict:
+    """Validated insert values of one row (enums as their database values)"""
+    # Blank cells fall back to schema defaults
+    values = schema.model_validate({key: value for key, value in data.items() if value is not None}).model_dump()
+    values = {key: value.value if isinstance(value, enum.Enum) else value for key, value in values.items()}
+    values["id"] = uuid4()
+    return values
+
+
+def _messages(exc: ValueError) -> List[str]:
+    if not isinstance(exc, ValidationError):
+        return [str(exc)]
+    return [f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()]
+
+
+def _prepare(lines: List[Line], build: Callable[[Dict], Dict]) -> Tuple[List[Dict], List[Dict]]:
+    """Build insert values of every line; returns (values, errors of rejected lines)"""
+    accepted, errors = [], []
+    for line, row in lines:
+        try:
+            accepted.append(build(row))
+        except ValueError as exc:
+            errors.append({"line": line, "errors": _messages(exc)})
+    return accepted, errors
+
+
+def _prepare_rates(db: Session, lookup: ReferenceLookup, lines: List[Line]) -> Tuple[List[Dict], List[Dict]]:
+    def build(row):
+        return _validate(RateCreate, {
+            **row,
+            "supplier_id": lookup.supplier(row),
+            "client_id": lookup.client(row, required=False),
+        })
+
+    return _prepare(lines, build)
+
+
+def _prepare_shipments(db: Session, lookup: ReferenceLookup, lines: List[Line]) -> Tuple[List[Dict], List[Dict]]:
+    codes = {row.get("shipment_code") for _, row in lines} - {None}
+    taken = set(db.scalars(select(Shipment.shipment_code).where(Shipment.shipment_code.in_(codes))))
+
+    def build(row):
+        supplier_id = lookup.supplier(row)
+        client_id = lookup.client(row)
+        values = _validate(ShipmentCreate, {
+            **row,
+            "supplier_id": supplier_id,
+            "client_id": client_id,
+            "rate_id": lookup.rate(row, supplier_id, client_id),
+        })
+        if values["shipment_code"] in taken:
+            raise RowError(f"shipment_code: Shipment code '{values['shipment_code']}' already exists")
+        taken.add(values["shipment_code"])
+        return values
+
+    return _prepare(lines, build)
+
+
+def _prepare_expenses(db: Session, lookup: ReferenceLookup, lines: List[Line]) -> Tuple[List[Dict], List[Dict]]:
+    # Shipments are too many to keep in memory - resolve codes per chunk
+    codes = {row.get("shipment_code") for _, row in lines} - {None}
+    shipments = dict(db.execute(
+        select(Shipment.shipment_code, Shipment.id).where(Shipment.shipment_code.in_(codes))
+    ).all())
+    shipment_ids = set(db.scalars(select(Shipment.id).where(Shipment.id.in_(
+        {UUID(row["shipment_id"]) for _, row in lines if _is_uuid(row.get("shipment_id"))}
+    ))))
+
+    def build(row):
+        if row.get("shipment_id"):
+            shipment_id = ReferenceLookup._by_id(row["shipment_id"], shipment_ids, "Shipment")
+        elif row.get("shipment_code"):
+            shipment_id = shipments.get(row["shipment_code"])
+            if shipment_id is None:
+                raise RowError(f"shipment_code: Shipment '{row['shipment_code']}' not found")
+        else:
+            raise RowError("shipment_code: Field required")
+        return _validate(ExpenseCreate, {**row, "shipment_id": shipment_id})
+
+    return _prepare(lines, build)
+
+
+def _is_uuid(value: Optional[str]) -> bool:
+    try:
+        UUID(value)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+# entity -> (model, row preparation)
+_ENTITIES = {
+    ImportEntityEnum.RATES: (Rate, _prepare_rates),
+    ImportEntityEnum.SHIPMENTS: (Shipment, _prepare_shipments),
+    ImportEntityEnum.EXPENSES: (Expense, _prepare_expenses),
+}
+
+
+def _copy_value(value: Any) -> Any:
+    return value if value is None else str(value)
+
+
+def _copy(connection: Connection, staging: Table, rows: List[Dict]) -> None:
+    """Load rows into the staging table with COPY (plain INSERT on other drivers)"""
+    if connection.dialect.driver != "psycopg2":
+        connection.execute(insert(staging), rows)
+        return
+
+    columns = [column.name for column in staging.columns]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_copy_value(row[name]) for name in columns])
+    buffer.seek(0)
+
+    # Unquoted empty fields are NULL in CSV format
+    with connection.connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY {staging.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def _merge(connection: Connection, model, rows: List[Dict]) -> List:
+    """
+    COPY rows into a temporary staging table, then insert them into the
+    model's table with one INSERT ... SELECT.
+
+    Returns ids of the inserted rows (shipment ids for expenses).
+    """
+    table = model.__table__
+    columns = list(rows[0])
+
+    # Enums are staged as text: creating the temp table must not try to create their types
+    staging = Table(
+        f"import_staging_{table.name}", MetaData(),
+        *(Column(name, Text if isinstance(table.c[name].type, Enum) else table.c[name].type) for name in columns),
+        prefixes=["TEMPORARY"]
+    )
+    staging.create(connection)
+    _copy(connection, staging, rows)
+
+    source = select(*(
+        cast(staging.c[name], table.c[name].type) if isinstance(table.c[name].type, Enum) else staging.c[name]
+        for name in columns
+    )).where(true())  # SQLite needs a WHERE to parse INSERT ... SELECT ... ON CONFLICT
+    stmt = pg_insert(table).from_select(columns, source)
+    if model is Shipment:
+        # Codes are checked beforehand; skip ones taken by a concurrent writer
+        stmt = stmt.on_conflict_do_nothing(index_elements=["shipment_code"]).returning(table.c.id)
+    elif model is Expense:
+        stmt = stmt.returning(table.c.shipment_id)
+    else:
+        stmt = stmt.returning(table.c.id)
+
+    inserted = connection.execute(stmt).scalars().all()
+    staging.drop(connection)
+    return inserted
+
+
+def _refresh_finance(session: Session, shipment_ids: List[UUID]) -> None:
+    """The merge bypasses the flush listeners - refresh stored finance and the daily rollup"""
+    connection = session.connection()
+    for start in range(0, len(shipment_ids), CHUNK_SIZE):
+        chunk = shipment_ids[start:start + CHUNK_SIZE]
+        refresh_stored_finance(connection, shipment_ids=chunk)
+        refresh_finance_daily(connection, shipment_ids=chunk)
+
+
+def find_or_create_job(
+    db: Session,
+    entity: ImportEntityEnum,
+    filename: str,
+    checksum: str,
+    force: bool = False
+) -> ImportJob:
+    """
+    The latest job of this file (to resume or report), or a new pending job.
+
+    force always starts a new job, e.g. to import the same file again.
+    The caller commits.
+    """
+    if not force:
+        job = db.scalars(
+            select(ImportJob)
+            .where(ImportJob.entity == entity, ImportJob.checksum == checksum)
+            .order_by(ImportJob.created_at.desc())
+            .limit(1)
+        ).first()
+        if job is not None:
+            return job
+
+    job = ImportJob(entity=entity, filename=filename[:255], checksum=checksum, errors=[])
+    db.add(job)
+    db.flush()
+    return job
+
+
+def claim_job(db: Session, job: ImportJob) -> bool:
+    """
+    Mark the job running for this caller (conditional UPDATE).
+
+    Pending and failed jobs can be claimed, and so can a running job whose
+    progress hasn't moved for IMPORT_STALE_AFTER seconds: its worker died
+    mid-import and the claimer resumes it after the last committed chunk.
+    False if another import holds the job. The caller commits.
+    """
+    stale_before = datetime.now(timezone.utc) - timedelta(seconds=settings.IMPORT_STALE_AFTER)
+    result = db.execute(
+        update(ImportJob)
+        .where(
+            ImportJob.id == job.id,
+            or_(
+                ImportJob.status.in_([ImportStatusEnum.PENDING, ImportStatusEnum.FAILED]),
+                and_(
+                    ImportJob.status == ImportStatusEnum.RUNNING,
+                    func.coalesce(ImportJob.updated_at, ImportJob.created_at) < stale_before
+                )
+            )
+        )
+        .values(status=ImportStatusEnum.RUNNING, error=None, updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        return False
+    db.refresh(job)
+    return True
+
+
+def _holds_job(db: Session, job_id: UUID, rows_processed: int) -> bool:
+    # Locks the job row until the chunk commits: a runner presumed dead whose
+    # job was claimed and resumed elsewhere sees the progress moved on
+    current = db.scalar(select(ImportJob.rows_processed).where(ImportJob.id == job_id).with_for_update())
+    return current == rows_processed
+
+
+def run_import(
+    db: Session,
+    job: ImportJob,
+    path: str,
+    on_progress: Optional[Callable[[ImportJob], None]] = None
+) -> ImportJob:
+    """
+    Stream the file into the job's table in chunks of CHUNK_SIZE rows.
+
+    Each chunk is validated against references loaded once per import,
+    COPYed into a staging table and merged in one transaction together with
+    the job progress, so memory stays bounded and an interrupted import
+    resumes after the last committed chunk. Rejected rows are counted and the
+    first MAX_STORED_ERRORS of them kept on the job.
+
+    The job must be claimed with claim_job() first. Every chunk commit moves
+    its updated_at, which tells a live import from a dead one.
+    """
+    model, prepare = _ENTITIES[job.entity]
+    position = job.rows_processed
+
+    try:
+        lookup = ReferenceLookup(db)
+        rows = read_rows(path)
+        # Skip rows committed by a previous run
+        for _ in itertools.islice(rows, job.rows_processed):
+            pass
+
+        lines = enumerate(rows, start=_FIRST_LINE + job.rows_processed)
+        while chunk := list(itertools.islice(lines, CHUNK_SIZE)):
+            if not _holds_job(db, job.id, position):
+                db.rollback()
+                logger.warning("Import job %s was resumed by another worker, stopping", job.id)
+                return job
+
+            accepted, errors = prepare(db, lookup, chunk)
+
+            inserted = _merge(db.connection(), model, accepted) if accepted else []
+            if inserted:
+                if model is Rate:
+                    bump_data_version(db, RATES_DATA)
+                else:
+                    _refresh_finance(db, list(set(inserted)))
+                bump_data_version(db, DASHBOARD_DATA)
+
+            position += len(chunk)
+            job.rows_processed = position
+            job.rows_imported += len(inserted)
+            job.rows_failed += len(accepted) - len(inserted) + len(errors)
+            room = MAX_STORED_ERRORS - len(job.errors)
+            if errors and room > 0:
+                job.errors = job.errors + errors[:room]
+            db.commit()
+
+            if on_progress:
+                on_progress(job)
+
+        job.status = ImportStatusEnum.COMPLETED
+        db.commit()
+    except Exception as exc:
+        db.rollback()
+        job.status = ImportStatusEnum.FAILED
+        job.error = str(exc)
+        db.commit()
+        raise
+
+    return job
+
+
+def run_import_file(job_id: UUID, path: str) -> None:
+    """Run an import job in its own session and delete the file afterwards (background task)"""
+    db = SessionLocal()
+    try:
+        run_import(db, db.get(ImportJob, job_id), path)
+    except Exception:
+        logger.exception("Import job %s failed", job_id)
+    finally:
+        db.close()
+        os.remove(path)
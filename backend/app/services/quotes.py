@@ -0,0 +1,155 @@
+import asyncio
+import time
+from datetime import date
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+from typing import Dict, Optional, Tuple
+from app.core.config import settings
+from app.core.database import AsyncReadSessionLocal
+from app.models.order import RouteEnum
+from app.models.rate import Rate
+from app.models.supplier import Supplier
+from app.models.data_version import RATES_DATA, get_data_version
+
+# Supplier countries (lowercase) each public route ships from
+ROUTE_COUNTRIES = {
+    RouteEnum.UAE_TO_RF: ("uae", "united arab emirates", "оаэ"),
+    RouteEnum.TURKEY_TO_RF: ("turkey", "türkiye", "турция"),
+}
+
+# Order measure -> rate unit it is priced in
+MEASURE_UNITS = {"cargo_weight": "kg", "cargo_volume": "cbm"}
+
+
+def _cargo_key(cargo_type: str) -> str:
+    return cargo_type.strip().casefold()
+
+
+def _currency_key(currency: Optional[str]) -> str:
+    return (currency or "").strip().upper()
+
+
+class QuoteTable:
+    """
+    Cheapest base sell rate per (route, cargo type, unit, currency), valid on
+    the day it was built. Rates in different currencies are never compared.
+    """
+
+    def __init__(self, version: int, day: date, rows):
+        self.version = version
+        self.day = day
+
+        # (route, cargo type) -> (unit, currency) -> unit price
+        self.prices: Dict[Tuple[RouteEnum, str], Dict[Tuple[str, str], float]] = {}
+        routes = {country: route for route, countries in ROUTE_COUNTRIES.items() for country in countries}
+        for country, cargo_type, unit, sell_rate, currency in rows:
+            route = routes.get((country or "").strip().casefold())
+            if route is None:
+                continue
+            units = self.prices.setdefault((route, _cargo_key(cargo_type)), {})
+            key = (unit, _currency_key(currency))
+            if key not in units or sell_rate < units[key]:
+                units[key] = sell_rate
+
+    def quote(
+        self,
+        route: RouteEnum,
+        cargo_type: str,
+        cargo_weight: Optional[float] = None,
+        cargo_volume: Optional[float] = None,
+        currency: str = settings.QUOTE_CURRENCY
+    ) -> Optional[Dict]:
+        """
+        Price of a prospective order in currency, None if there is no rate in
+        it for the route, cargo type and given measures.
+
+        With both weight and volume the larger of the two prices is charged.
+        """
+        currency = _currency_key(currency)
+        units = self.prices.get((route, _cargo_key(cargo_type)))
+        if not units:
+            return None
+
+        best = None
+        for measure, amount in (("cargo_weight", cargo_weight), ("cargo_volume", cargo_volume)):
+            unit = MEASURE_UNITS[measure]
+            if not amount or (unit, currency) not in units:
+                continue
+            unit_price = units[unit, currency]
+            price = amount * unit_price
+            if best is None or price > best["price"]:
+                best = {"price": round(price, 2), "unit": unit, "unit_price": unit_price, "currency": currency}
+
+        if best is None:
+            return None
+        return {"route": route, "cargo_type": cargo_type, "valid_on": self.day, **best}
+
+
+def _load_quote_table(db: Session) -> QuoteTable:
+    # Version first: a rate change racing the load leaves the table older, never newer
+    version = get_data_version(db, RATES_DATA)
+    today = date.today()
+    rows = db.execute(
+        select(Supplier.country, Rate.cargo_type, Rate.unit, Rate.sell_rate, Rate.currency)
+        .join(Supplier, Supplier.id == Rate.supplier_id)
+        .where(
+            Rate.client_id.is_(None),
+            or_(Rate.valid_from.is_(None), Rate.valid_from <= today),
+            or_(Rate.valid_to.is_(None), Rate.valid_to >= today)
+        )
+    ).all()
+    return QuoteTable(version, today, rows)
+
+
+class QuoteCache:
+    """
+    Quote table of this worker process.
+
+    The rates data version is checked at most every QUOTE_CHECK_INTERVAL
+    seconds (on the replica when configured), so bursts of quotes are served
+    from memory; the table is rebuilt when rates change or the day turns.
+    """
+
+    def __init__(self, check_interval: float):
+        self.check_interval = check_interval
+        self._table: Optional[QuoteTable] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def _fresh(self) -> bool:
+        return (
+            self._table is not None
+            and self._table.day == date.today()
+            and time.monotonic() - self._checked_at < self.check_interval
+        )
+
+    async def get(self) -> QuoteTable:
+        if self._fresh():
+            self.hits += 1
+            return self._table
+
+        async with self._lock:
+            # Another request may have refreshed it while we waited
+            if self._fresh():
+                self.hits += 1
+                return self._table
+
+            async with AsyncReadSessionLocal() as db:
+                version = await db.run_sync(get_data_version, RATES_DATA)
+                table = self._table
+                if table is None or table.version != version or table.day != date.today():
+                    self.misses += 1
+                    self._table = await db.run_sync(_load_quote_table)
+                else:
+                    self.hits += 1
+            self._checked_at = time.monotonic()
+            return self._table
+
+    def clear(self) -> None:
+        self._table = None
+
+
+quote_cache = QuoteCache(check_interval=settings.QUOTE_CHECK_INTERVAL)
@@ -0,0 +1,130 @@
+from bisect import bisect_right
+from datetime import date
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+from app.models.rate import Rate
+from app.models.data_version import RATES_DATA, get_data_version
+
+
+def _cargo_key(cargo_type: str) -> str:
+    return cargo_type.strip().casefold()
+
+
+class _Windows:
+    """Validity windows of one (supplier, cargo type, client or base) rate list"""
+
+    def __init__(self, rates: List[Tuple[date, date, float, UUID]]):
+        # (valid_from, valid_to, created_at, rate_id) ordered by valid_from, then creation
+        rates.sort(key=lambda rate: (rate[0], rate[2]))
+        self.starts = [rate[0] for rate in rates]
+        self.rates = rates
+
+    def find(self, on_date: date) -> Optional[UUID]:
+        """Latest-starting window covering the date (the newest rate on ties)"""
+        for position in range(bisect_right(self.starts, on_date) - 1, -1, -1):
+            valid_from, valid_to, _, rate_id = self.rates[position]
+            if valid_to >= on_date:
+                return rate_id
+        return None
+
+
+class RateIndex:
+    """In-memory interval index of rates per (supplier, cargo type), built at a rates data version"""
+
+    def __init__(self, version: int, rows):
+        self.version = version
+
+        grouped: Dict[Tuple[UUID, str], Dict[Optional[UUID], list]] = {}
+        for rate_id, supplier_id, client_id, cargo_type, valid_from, valid_to, created_at in rows:
+            by_client = grouped.setdefault((supplier_id, _cargo_key(cargo_type)), {})
+            by_client.setdefault(client_id, []).append((
+                valid_from or date.min,
+                valid_to or date.max,
+                created_at.timestamp() if created_at else 0.0,
+                rate_id
+            ))
+
+        self._windows: Dict[Tuple[UUID, str], Dict[Optional[UUID], _Windows]] = {
+            key: {client_id: _Windows(rates) for client_id, rates in by_client.items()}
+            for key, by_client in grouped.items()
+        }
+
+    def resolve(
+        self,
+        supplier_id: UUID,
+        client_id: Optional[UUID],
+        cargo_type: str,
+        on_date: Optional[date] = None
+    ) -> Optional[UUID]:
+        """
+        Rate for a shipment: the client's own rate valid on the date, else the
+        base tariff (client_id NULL) valid on the date. None if neither exists.
+        """
+        by_client = self._windows.get((supplier_id, _cargo_key(cargo_type)))
+        if not by_client:
+            return None
+
+        on_date = on_date or date.today()
+        for owner in (client_id, None) if client_id else (None,):
+            windows = by_client.get(owner)
+            rate_id = windows.find(on_date) if windows else None
+            if rate_id is not None:
+                return rate_id
+        return None
+
+
+# Index of this worker process, replaced when the rates data version moves
+_current: Optional[RateIndex] = None
+
+
+def _load_rate_index(db: Session) -> RateIndex:
+    # Version first: a rate change racing the load leaves the index older, never newer
+    version = get_data_version(db, RATES_DATA)
+    rows = db.execute(select(
+        Rate.id, Rate.supplier_id, Rate.client_id, Rate.cargo_type,
+        Rate.valid_from, Rate.valid_to, Rate.created_at
+    )).all()
+    return RateIndex(version, rows)
+
+
+def _keep(index: RateIndex) -> RateIndex:
+    global _current
+    if _current is None or index.version >= _current.version:
+        _current = index
+    return index
+
+
+def get_rate_index(db: Session) -> RateIndex:
+    """Rate index at the current rates data version (rebuilt after rate changes)"""
+    index = _current
+    if index is not None and index.version >= get_data_version(db, RATES_DATA):
+        return index
+    return _keep(_load_rate_index(db))
+
+
+async def get_rate_index_async(db: AsyncSession) -> RateIndex:
+    """get_rate_index() for async sessions"""
+    index = _current
+    if index is not None and index.version >= await db.run_sync(get_data_version, RATES_DATA):
+        return index
+    return _keep(await db.run_sync(_load_rate_index))
+
+
+async def resolve_rate(
+    db: AsyncSession,
+    supplier_id: UUID,
+    client_id: Optional[UUID],
+    cargo_type: str,
+    on_date: Optional[date] = None
+) -> Optional[UUID]:
+    """
+    Id of the rate to price a shipment with (see RateIndex.resolve).
+
+    Costs one primary-key lookup of the rates data version; the index itself
+    is only rebuilt after rates change.
+    """
+    index = await get_rate_index_async(db)
+    return index.resolve(supplier_id, client_id, cargo_type, on_date)
@@ -0,0 +1,196 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select, delete, tuple_, or_, true, Date
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Connection
+from app.models.shipment import Shipment
+from app.models.finance_daily import FinanceDaily
+from app.services.finance import stored_finance_subquery
+from datetime import date
+from typing import Dict, Iterable, Optional, Tuple
+from uuid import UUID
+
+# Rollup key: (day, client_id, supplier_id, cargo_type, status)
+Bucket = Tuple
+
+BUCKET_COLUMNS = ["day", "client_id", "supplier_id", "cargo_type", "status"]
+MEASURE_COLUMNS = ["shipment_count", "quantity", "revenue", "cost_of_goods", "total_expenses", "profit"]
+
+# Max buckets per IN (...) list
+_CHUNK_SIZE = 500
+
+
+def shipment_day(created_at):
+    """Rollup day of a shipment"""
+    return func.date(created_at, type_=Date)
+
+
+def shipment_bucket(shipment: Shipment) -> Bucket:
+    return (
+        shipment.created_at.date() if shipment.created_at else None,
+        shipment.client_id,
+        shipment.supplier_id,
+        shipment.cargo_type,
+        shipment.status
+    )
+
+
+def _rollup_select(where=None):
+    """Aggregate stored shipment finance into rollup rows"""
+    finance = stored_finance_subquery()
+    day = shipment_day(finance.c.created_at)
+    key = (day, finance.c.client_id, finance.c.supplier_id, finance.c.cargo_type, finance.c.status)
+
+    stmt = (
+        select(
+            *key,
+            func.count(finance.c.shipment_id),
+            func.sum(finance.c.quantity),
+            func.sum(finance.c.revenue),
+            func.sum(finance.c.cost_of_goods),
+            func.sum(finance.c.total_expenses),
+            func.sum(finance.c.profit),
+        )
+        .where(where(tuple_(*key), day) if where is not None else true())
+        .group_by(*key)
+    )
+    return stmt, key
+
+
+def _upsert_buckets(connection: Connection, buckets: list) -> None:
+    """Recalculate the given rollup rows; rows left without shipments are removed"""
+    key = tuple_(*(getattr(FinanceDaily, column) for column in BUCKET_COLUMNS))
+
+    rollup, _ = _rollup_select(lambda bucket, day: bucket.in_(buckets))
+    stmt = insert(FinanceDaily).from_select(BUCKET_COLUMNS + MEASURE_COLUMNS, rollup)
+    connection.execute(stmt.on_conflict_do_update(
+        index_elements=BUCKET_COLUMNS,
+        set_={column: getattr(stmt.excluded, column) for column in MEASURE_COLUMNS}
+    ))
+
+    existing, existing_key = _rollup_select(lambda bucket, day: bucket.in_(buckets))
+    connection.execute(
+        delete(FinanceDaily)
+        .where(key.in_(buckets))
+        .where(key.not_in(existing.with_only_columns(*existing_key)))
+    )
+
+
+def refresh_finance_daily(
+    connection: Connection,
+    shipment_ids: Iterable[UUID] = (),
+    rate_ids: Iterable[UUID] = (),
+    old_buckets: Iterable[Bucket] = ()
+) -> None:
+    """
+    Recalculate rollup rows of the given shipments (current and previous keys)
+    and of all shipments priced by the given rates.
+
+    Only the touched buckets are recalculated, so the cost does not depend on
+    the total number of shipments. Concurrent writers to the same bucket may
+    leave it slightly off; the nightly compaction (rebuild_finance_daily)
+    brings it back in line.
+    """
+    shipment_ids = list(shipment_ids)
+    rate_ids = list(rate_ids)
+    buckets = {bucket for bucket in old_buckets if bucket[0] is not None}
+
+    criteria = []
+    if shipment_ids:
+        criteria.append(Shipment.id.in_(shipment_ids))
+    if rate_ids:
+        criteria.append(Shipment.rate_id.in_(rate_ids))
+
+    if criteria:
+        current = connection.execute(
+            select(
+                shipment_day(Shipment.created_at),
+                Shipment.client_id,
+                Shipment.supplier_id,
+                Shipment.cargo_type,
+                Shipment.status
+            )
+            .where(or_(*criteria))
+            .distinct()
+        )
+        buckets.update(tuple(row) for row in current)
+
+    buckets = list(buckets)
+    for start in range(0, len(buckets), _CHUNK_SIZE):
+        _upsert_buckets(connection, buckets[start:start + _CHUNK_SIZE])
+
+
+def rebuild_finance_daily(
+    db: Session,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+) -> None:
+    """
+    Rebuild rollup rows for a day range (all days by default) from shipment_finance.
+
+    Used as the nightly compaction job to fix drift left by concurrent or
+    bulk writes that bypass the ORM.
+    """
+    def in_range(bucket, day):
+        criteria = true()
+        if date_from:
+            criteria = criteria & (day >= date_from)
+        if date_to:
+            criteria = criteria & (day <= date_to)
+        return criteria
+
+    stale = delete(FinanceDaily)
+    if date_from:
+        stale = stale.where(FinanceDaily.day >= date_from)
+    if date_to:
+        stale = stale.where(FinanceDaily.day <= date_to)
+
+    rollup, _ = _rollup_select(in_range)
+
+    db.execute(stale)
+    db.execute(insert(FinanceDaily).from_select(BUCKET_COLUMNS + MEASURE_COLUMNS, rollup))
+    db.commit()
+
+
+def summarize_finance_daily(
+    db: Session,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    client_id: Optional[UUID] = None,
+    supplier_id: Optional[UUID] = None
+) -> Dict[str, float]:
+    """
+    Aggregate financial metrics for a day range (inclusive) from the rollup.
+
+    Returns:
+        dict with keys: shipments_count, total_volume, revenue, cost_of_goods,
+        total_expenses, profit, margin_percent
+    """
+    stmt = select(
+        func.coalesce(func.sum(FinanceDaily.shipment_count), 0).label("shipments_count"),
+        func.coalesce(func.sum(FinanceDaily.quantity), 0.0).label("total_volume"),
+        func.coalesce(func.sum(FinanceDaily.revenue), 0.0).label("revenue"),
+        func.coalesce(func.sum(FinanceDaily.cost_of_goods), 0.0).label("cost_of_goods"),
+        func.coalesce(func.sum(FinanceDaily.total_expenses), 0.0).label("total_expenses"),
+        func.coalesce(func.sum(FinanceDaily.profit), 0.0).label("profit"),
+    )
+
+    if date_from:
+        stmt = stmt.where(FinanceDaily.day >= date_from)
+    if date_to:
+        stmt = stmt.where(FinanceDaily.day <= date_to)
+    if client_id:
+        stmt = stmt.where(FinanceDaily.client_id == client_id)
+    if supplier_id:
+        stmt = stmt.where(FinanceDaily.supplier_id == supplier_id)
+
+    row = db.execute(stmt).one()
+
+    return {
+        "shipments_count": row.shipments_count,
+        "total_volume": row.total_volume,
+        "revenue": row.revenue,
+        "cost_of_goods": row.cost_of_goods,
+        "total_expenses": row.total_expenses,
+        "profit": row.profit,
+        "margin_percent": (row.profit / row.revenue * 100) if row.revenue > 0 else 0.0
+    }
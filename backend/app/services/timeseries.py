@@ -0,0 +1,164 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select, cast, literal_column, Date
+from datetime import date
+from typing import Dict, List, Optional
+from app.models.client import Client
+from app.models.supplier import Supplier
+from app.models.finance_daily import FinanceDaily
+from app.services.finance import stored_finance_subquery
+import enum
+
+
+class GranularityEnum(str, enum.Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+class TimeseriesGroupEnum(str, enum.Enum):
+    CLIENT = "client"
+    SUPPLIER = "supplier"
+    CARGO_TYPE = "cargo_type"
+
+
+class DateFieldEnum(str, enum.Enum):
+    CREATED_AT = "created_at"
+    DEPARTURE_DATE = "departure_date"
+    ARRIVAL_DATE = "arrival_date"
+
+
+GROUP_COLUMNS = {
+    TimeseriesGroupEnum.CLIENT: "client_id",
+    TimeseriesGroupEnum.SUPPLIER: "supplier_id",
+    TimeseriesGroupEnum.CARGO_TYPE: "cargo_type",
+}
+
+
+def _bucket(day, granularity: GranularityEnum):
+    if granularity == GranularityEnum.DAY:
+        return day
+    # Inline the unit: a bound parameter would differ between SELECT and GROUP BY
+    return cast(func.date_trunc(literal_column(f"'{granularity.value}'"), day), Date)
+
+
+def _source(date_field: DateFieldEnum):
+    """
+    Rows to aggregate: (day, group columns, measures).
+
+    created_at is served from the finance_daily rollup; shipment dates
+    come from stored shipment finance.
+    """
+    if date_field == DateFieldEnum.CREATED_AT:
+        return select(
+            FinanceDaily.day.label("day"),
+            FinanceDaily.client_id,
+            FinanceDaily.supplier_id,
+            FinanceDaily.cargo_type,
+            FinanceDaily.shipment_count,
+            FinanceDaily.quantity,
+            FinanceDaily.revenue,
+            FinanceDaily.cost_of_goods,
+            FinanceDaily.total_expenses,
+            FinanceDaily.profit,
+        ).subquery("source")
+
+    finance = stored_finance_subquery()
+    return select(
+        finance.c[date_field.value].label("day"),
+        finance.c.client_id,
+        finance.c.supplier_id,
+        finance.c.cargo_type,
+        func.count(finance.c.shipment_id).label("shipment_count"),
+        func.sum(finance.c.quantity).label("quantity"),
+        func.sum(finance.c.revenue).label("revenue"),
+        func.sum(finance.c.cost_of_goods).label("cost_of_goods"),
+        func.sum(finance.c.total_expenses).label("total_expenses"),
+        func.sum(finance.c.profit).label("profit"),
+    ).where(
+        finance.c[date_field.value].isnot(None)
+    ).group_by(
+        finance.c[date_field.value],
+        finance.c.client_id,
+        finance.c.supplier_id,
+        finance.c.cargo_type,
+    ).subquery("source")
+
+
+def finance_timeseries(
+    db: Session,
+    granularity: GranularityEnum = GranularityEnum.MONTH,
+    group_by: Optional[TimeseriesGroupEnum] = None,
+    date_field: DateFieldEnum = DateFieldEnum.CREATED_AT,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+) -> List[Dict]:
+    """
+    Revenue / profit per time bucket (and optionally per group) in one query.
+
+    Returns:
+        list of dicts ordered by bucket: bucket, group, group_name, shipments_count,
+        total_volume, total_revenue, total_cost_of_goods, total_expenses,
+        total_profit, average_margin_percent
+    """
+    source = _source(date_field)
+    bucket = _bucket(source.c.day, granularity).label("bucket")
+
+    group = None
+    group_name = None
+    if group_by is not None:
+        group = source.c[GROUP_COLUMNS[group_by]]
+        if group_by == TimeseriesGroupEnum.CLIENT:
+            group_name = Client.client_number
+        elif group_by == TimeseriesGroupEnum.SUPPLIER:
+            group_name = Supplier.name
+
+    columns = [bucket]
+    if group is not None:
+        columns.append(group.label("group"))
+    if group_name is not None:
+        columns.append(group_name.label("group_name"))
+
+    stmt = select(
+        *columns,
+        func.sum(source.c.shipment_count).label("shipments_count"),
+        func.sum(source.c.quantity).label("total_volume"),
+        func.sum(source.c.revenue).label("total_revenue"),
+        func.sum(source.c.cost_of_goods).label("total_cost_of_goods"),
+        func.sum(source.c.total_expenses).label("total_expenses"),
+        func.sum(source.c.profit).label("total_profit"),
+    )
+
+    if group_by == TimeseriesGroupEnum.CLIENT:
+        stmt = stmt.join(Client, Client.id == source.c.client_id)
+    elif group_by == TimeseriesGroupEnum.SUPPLIER:
+        stmt = stmt.join(Supplier, Supplier.id == source.c.supplier_id)
+
+    if date_from:
+        stmt = stmt.where(source.c.day >= date_from)
+    if date_to:
+        stmt = stmt.where(source.c.day <= date_to)
+
+    group_columns = [bucket] + [column for column in (group, group_name) if column is not None]
+    stmt = stmt.group_by(*group_columns).order_by(*group_columns)
+
+    series = []
+    for row in db.execute(stmt):
+        values = row._mapping
+        group_value = str(values["group"]) if "group" in values else None
+
+        series.append({
+            "bucket": row.bucket.isoformat(),
+            "group": group_value,
+            "group_name": values.get("group_name", group_value),
+            "shipments_count": row.shipments_count,
+            "total_volume": round(row.total_volume, 2),
+            "total_revenue": round(row.total_revenue, 2),
+            "total_cost_of_goods": round(row.total_cost_of_goods, 2),
+            "total_expenses": round(row.total_expenses, 2),
+            "total_profit": round(row.total_profit, 2),
+            "average_margin_percent": round(
+                (row.total_profit / row.total_revenue * 100) if row.total_revenue > 0 else 0.0, 2
+            )
+        })
+
+    return series
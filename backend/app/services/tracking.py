@@ -0,0 +1,116 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.models.shipment import Shipment
+
+# Shipment attributes shown on the public tracking page
+TRACKED_ATTRS = ("shipment_code", "status", "departure_date", "arrival_date")
+
+tracking_cache = LRUCache(max_entries=settings.TRACKING_CACHE_SIZE, ttl=settings.TRACKING_CACHE_TTL)
+
+
+@dataclass
+class TrackingInfo:
+    body: bytes  # JSON response, serialized once per cache load
+    etag: str
+    last_modified: datetime
+
+    @property
+    def last_modified_header(self) -> str:
+        return format_datetime(self.last_modified, usegmt=True)
+
+    def not_modified(self, if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+        """Whether a conditional request can be answered with 304"""
+        if if_none_match is not None:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return self.etag in tags or "*" in tags
+        if if_modified_since is not None:
+            try:
+                return self.last_modified <= parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+        return False
+
+
+def _tracking_info(row) -> TrackingInfo:
+    shipment_code, status, departure_date, arrival_date, changed_at = row
+    if changed_at.tzinfo is None:
+        changed_at = changed_at.replace(tzinfo=timezone.utc)
+    # HTTP dates have second precision
+    last_modified = changed_at.astimezone(timezone.utc).replace(microsecond=0)
+
+    body = json.dumps({
+        "shipment_code": shipment_code,
+        "status": status.value,
+        "departure_date": departure_date.isoformat() if departure_date else None,
+        "arrival_date": arrival_date.isoformat() if arrival_date else None,
+        "updated_at": changed_at.isoformat(),
+    }).encode()
+    etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+    return TrackingInfo(body=body, etag=etag, last_modified=last_modified)
+
+
+async def get_tracking(db: AsyncSession, shipment_code: str) -> Optional[TrackingInfo]:
+    """
+    Public tracking data of a shipment (None if there is no such code).
+
+    Served from tracking_cache; misses, unknown codes included, cost one
+    lookup on the shipment_code unique index. Pass a primary session: a
+    lagging replica row cached here would be served for the whole TTL.
+    Unknown codes are only cached for TRACKING_NOT_FOUND_TTL seconds:
+    shipments created in bulk or by imports skip the flush listeners below.
+    """
+    try:
+        return tracking_cache.get(shipment_code)
+    except KeyError:
+        pass
+
+    row = (await db.execute(
+        select(
+            Shipment.shipment_code,
+            Shipment.status,
+            Shipment.departure_date,
+            Shipment.arrival_date,
+            # updated_at is only set by updates
+            func.coalesce(Shipment.updated_at, Shipment.created_at),
+        ).where(Shipment.shipment_code == shipment_code)
+    )).first()
+    if row is None:
+        tracking_cache.set(shipment_code, None, ttl=settings.TRACKING_NOT_FOUND_TTL)
+        return None
+    info = _tracking_info(row)
+    tracking_cache.set(shipment_code, info)
+    return info
+
+
+@event.listens_for(Session, "after_flush")
+def receive_after_flush(session, flush_context):
+    """Remember codes of shipments whose tracking data changed in this transaction"""
+    codes = session.info.setdefault("tracking_changed_codes", set())
+    for obj in session.new | session.dirty | session.deleted:
+        if not isinstance(obj, Shipment):
+            continue
+        state = inspect(obj)
+        if obj in session.new or obj in session.deleted or any(state.attrs[attr].history.has_changes() for attr in TRACKED_ATTRS):
+            codes.add(obj.shipment_code)
+            # A renamed shipment leaves its old code behind
+            codes.update(state.attrs.shipment_code.history.deleted or ())
+
+
+@event.listens_for(Session, "after_commit")
+def receive_after_commit(session):
+    for code in session.info.pop("tracking_changed_codes", ()):
+        tracking_cache.pop(code)
+
+
+@event.listens_for(Session, "after_rollback")
+def receive_after_rollback(session):
+    session.info.pop("tracking_changed_codes", None)
@@ -16,6 +16,11 @@ echo "✅ Migrations applied"
 # echo "📊 Creating initial data..."
 # python create_initial_data.py || echo "⚠️  Initial data already exists or error occurred"
 
+# Prometheus samples of all uvicorn workers, emptied on every start
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus-multiproc}
+rm -rf "${PROMETHEUS_MULTIPROC_DIR}"
+mkdir -p "${PROMETHEUS_MULTIPROC_DIR}"
+
 # Check if running in production
 if [ "${ENVIRONMENT}" = "production" ]; then
     echo "🚀 Starting FastAPI server (PRODUCTION mode with 4 workers)..."
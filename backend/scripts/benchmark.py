@@ -0,0 +1,261 @@
+"""
+Нагрузочный прогон API
+
+Для каждого сценария (дашборд, отчёты, списки, финансы поставки,
+страницы админки) выполняет --requests запросов с --concurrency
+параллельными соединениями и выводит JSON: p50/p95/p99 задержки,
+пропускную способность и число SQL-запросов на запрос (из заголовка
+Server-Timing). Результаты разных прогонов можно сравнивать через
+--compare.
+
+Данные для прогона: python -m scripts.generate_benchmark_data
+
+Запуск (сервер уже запущен):
+cd backend
+python -m scripts.benchmark --base-url http://localhost:8000 --concurrency 16 --requests 500
+python -m scripts.benchmark --only dashboard_stats,shipments_list --output run.json
+python -m scripts.benchmark --compare previous.json --output current.json
+"""
+
+import argparse
+import http.client
+import json
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+from app.core.config import settings
+
+API = settings.API_V1_STR
+
+_QUERIES = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+class Client:
+    """Keep-alive HTTP connection of one worker thread"""
+
+    def __init__(self, base_url: str, cookie: Optional[str] = None):
+        url = urlsplit(base_url)
+        connection_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        self._connect = lambda: connection_class(url.hostname, url.port, timeout=60)
+        self.connection = self._connect()
+        self.cookie = cookie
+
+    def request(self, method: str, path: str, body: Optional[str] = None, headers: Optional[Dict] = None):
+        headers = dict(headers or {})
+        if self.cookie:
+            headers["Cookie"] = self.cookie
+        for attempt in range(2):
+            try:
+                self.connection.request(method, path, body=body, headers=headers)
+                response = self.connection.getresponse()
+                return response, response.read()
+            except (http.client.HTTPException, ConnectionError):
+                # The server closed the keep-alive connection: reconnect once
+                self.connection.close()
+                self.connection = self._connect()
+                if attempt:
+                    raise
+
+    def get_json(self, path: str):
+        response, body = self.request("GET", path)
+        if response.status != 200:
+            raise RuntimeError(f"GET {path}: HTTP {response.status}")
+        return json.loads(body)
+
+
+def admin_cookie(base_url: str, password: str) -> Optional[str]:
+    """Session cookie of a logged in admin (None if the login failed)"""
+    client = Client(base_url)
+    response, _ = client.request(
+        "POST", "/admin/login",
+        body=urlencode({"username": "admin", "password": password}),
+        headers={"Content-Type": "application/x-www-form-urlencoded"}
+    )
+    cookie = response.getheader("Set-Cookie")
+    if response.status not in (302, 303) or not cookie:
+        return None
+    return cookie.split(";", 1)[0]
+
+
+def sample_ids(base_url: str) -> Dict[str, List]:
+    """Ids and codes the parametrized scenarios pick from"""
+    client = Client(base_url)
+    shipments = client.get_json(f"{API}/shipments/?limit=200")
+    return {
+        "shipment_ids": [shipment["id"] for shipment in shipments],
+        "shipment_codes": [shipment["shipment_code"] for shipment in shipments],
+        "client_ids": [client_["id"] for client_ in client.get_json(f"{API}/clients/?limit=200")],
+        "supplier_ids": [supplier["id"] for supplier in client.get_json(f"{API}/suppliers/?limit=100")],
+    }
+
+
+def scenarios(ids: Dict[str, List]) -> Dict[str, Tuple[bool, Callable[[], str]]]:
+    """Scenario name -> (needs the admin session, path factory)"""
+    today = date.today()
+    last_quarter = {"date_from": (today - timedelta(days=90)).isoformat(), "date_to": today.isoformat()}
+
+    def pick(key):
+        return random.choice(ids[key]) if ids[key] else "00000000-0000-0000-0000-000000000000"
+
+    return {
+        "dashboard_stats": (False, lambda: f"{API}/dashboard/stats"),
+        "reports_summary": (False, lambda: f"{API}/reports/summary?{urlencode(last_quarter)}"),
+        "reports_timeseries": (False, lambda: f"{API}/reports/timeseries?granularity=week&group_by=client"),
+        "reports_by_client": (False, lambda: f"{API}/reports/by-client/{pick('client_ids')}"),
+        "reports_by_supplier": (False, lambda: f"{API}/reports/by-supplier/{pick('supplier_ids')}"),
+        "shipments_list": (False, lambda: f"{API}/shipments/?limit=100"),
+        "shipments_by_profit": (False, lambda: f"{API}/shipments/?limit=100&sort_by=profit&sort=desc"),
+        "clients_list": (False, lambda: f"{API}/clients/?limit=100"),
+        "shipment_finance": (False, lambda: f"{API}/shipments/{pick('shipment_ids')}/finance"),
+        "tracking": (False, lambda: f"{API}/track/{pick('shipment_codes')}"),
+        "admin_shipments": (True, lambda: "/admin/shipment/list"),
+        "admin_clients": (True, lambda: "/admin/client/list"),
+        "admin_dashboard": (True, lambda: "/admin/dashboard"),
+    }
+
+
+def percentile(ordered: List[float], share: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+def run_scenario(base_url: str, path: Callable[[], str], cookie: Optional[str], requests: int, concurrency: int) -> Dict:
+    latencies: List[float] = []
+    queries: List[int] = []
+    errors: Dict[str, int] = {}
+    lock = threading.Lock()
+    local = threading.local()
+
+    def one(_):
+        if not hasattr(local, "client"):
+            local.client = Client(base_url, cookie)
+        started = time.perf_counter()
+        try:
+            response, _ = local.client.request("GET", path())
+        except Exception as e:
+            with lock:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            return
+        elapsed = time.perf_counter() - started
+
+        match = _QUERIES.search(response.getheader("Server-Timing") or "")
+        with lock:
+            latencies.append(elapsed)
+            if match:
+                queries.append(int(match.group(1)))
+            if response.status >= 400:
+                errors[str(response.status)] = errors.get(str(response.status), 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / wall, 1) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        "queries_avg": round(sum(queries) / len(queries), 1) if queries else None,
+        "queries_max": max(queries) if queries else None,
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_comparison(previous: Dict, current: Dict) -> None:
+    print(f"\n📈 Сравнение с {previous.get('revision') or '?'} ({previous.get('started_at')}):", file=sys.stderr)
+    for name, result in current["endpoints"].items():
+        before = previous.get("endpoints", {}).get(name)
+        if not before or not before.get("p95_ms"):
+            continue
+        change = (result["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100
+        print(
+            f"   {name:28} p95 {before['p95_ms']:>9.1f} → {result['p95_ms']:>9.1f} ms ({change:+.0f}%), "
+            f"запросов SQL {before.get('queries_avg')} → {result['queries_avg']}",
+            file=sys.stderr
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный прогон API")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="запросов на сценарий")
+    parser.add_argument("--only", help="сценарии через запятую")
+    parser.add_argument("--admin-password", default=settings.ADMIN_PASSWORD)
+    parser.add_argument("--output", help="записать JSON в файл (по умолчанию stdout)")
+    parser.add_argument("--compare", help="JSON предыдущего прогона для сравнения")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    ids = sample_ids(args.base_url)
+    selected = scenarios(ids)
+    if args.only:
+        names = args.only.split(",")
+        unknown = [name for name in names if name not in selected]
+        if unknown:
+            print(f"❌ Неизвестные сценарии: {', '.join(unknown)}. Доступны: {', '.join(selected)}", file=sys.stderr)
+            return 1
+        selected = {name: selected[name] for name in names}
+
+    cookie = None
+    if any(needs_admin for needs_admin, _ in selected.values()):
+        cookie = admin_cookie(args.base_url, args.admin_password)
+        if cookie is None:
+            print("⚠️  Вход в админку не удался, сценарии админки пропущены", file=sys.stderr)
+            selected = {name: scenario for name, scenario in selected.items() if not scenario[0]}
+
+    report = {
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "base_url": args.base_url,
+        "concurrency": args.concurrency,
+        "requests_per_endpoint": args.requests,
+        "endpoints": {},
+    }
+    for name, (needs_admin, path) in selected.items():
+        print(f"🚀 {name}...", file=sys.stderr)
+        # Warm-up: connection pools and in-process caches
+        run_scenario(args.base_url, path, cookie if needs_admin else None, min(args.concurrency, args.requests), args.concurrency)
+        result = run_scenario(args.base_url, path, cookie if needs_admin else None, args.requests, args.concurrency)
+        report["endpoints"][name] = result
+        print(
+            f"   p50 {result['p50_ms']} ms, p95 {result['p95_ms']} ms, p99 {result['p99_ms']} ms, "
+            f"{result['throughput_rps']} rps, SQL {result['queries_avg']}, ошибки {result['errors'] or 0}",
+            file=sys.stderr
+        )
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as file:
+            print_comparison(json.load(file), report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
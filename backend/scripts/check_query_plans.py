@@ -0,0 +1,160 @@
+"""
+Проверка планов горячих запросов (EXPLAIN)
+
+Выполняет горячие запросы финансов, отчётов и списков API на заполненной
+базе, перехватывает их SQL и прогоняет через EXPLAIN. Завершается с кодом 1,
+если в плане есть Seq Scan по большой таблице (от --min-rows строк).
+
+Запросы, которые по смыслу читают всю таблицу (итоги дашборда, полная
+пересборка), не проверяются.
+
+Также проверяет, что журнал медленных запросов может снять EXPLAIN ANALYZE
+с запроса API (asyncpg, плейсхолдеры $1) через psycopg2.
+
+Запуск:
+cd backend
+python -m scripts.check_query_plans                  # таблицы от 10000 строк
+python -m scripts.check_query_plans --min-rows 1000
+"""
+
+import asyncio
+import json
+import sys
+from contextlib import contextmanager
+from datetime import date, timedelta
+from sqlalchemy import event, select, text
+from app.core.database import AsyncSessionLocal, SessionLocal, async_engine
+from app.core.pagination import encode_cursor, keyset_select
+from app.core.slow_queries import slow_query_log
+from app.models.shipment import Shipment
+from app.models.expense import Expense
+from app.models.rate import Rate
+from app.services.finance import calculate_shipment_finance, get_stored_finance_for, refresh_stored_finance
+from app.services.rollup import summarize_finance_daily
+
+CHECKED_TABLES = ("shipments", "expenses", "rates", "clients", "suppliers", "shipment_finance", "finance_daily")
+DEFAULT_MIN_ROWS = 10000
+
+
+@contextmanager
+def capture_statements(engine):
+    """Collect (statement, parameters) of everything executed on the engine"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def seq_scans(plan, tables):
+    """Names of the given tables read by a Seq Scan anywhere in the plan"""
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in tables:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", ()):
+        found.extend(seq_scans(child, tables))
+    return found
+
+
+def hot_queries(db):
+    """Name -> callable running one hot query against a sample shipment"""
+    shipment = db.query(Shipment).order_by(Shipment.created_at).first()
+    if shipment is None:
+        print("❌ В базе нет поставок, сначала заполните её")
+        sys.exit(1)
+
+    today = date.today()
+    return {
+        "finance: показатели одной поставки": lambda: calculate_shipment_finance(shipment.id, db),
+        "finance: сохранённые показатели страницы": lambda: get_stored_finance_for([shipment.id], db),
+        "finance: пересчёт после изменения ставки": lambda: refresh_stored_finance(
+            db.connection(), rate_ids=[shipment.rate_id]
+        ),
+        "reports: сводка за 30 дней": lambda: summarize_finance_daily(
+            db, date_from=today - timedelta(days=30), date_to=today
+        ),
+        "reports: отчёт по клиенту": lambda: summarize_finance_daily(db, client_id=shipment.client_id),
+        "reports: отчёт по поставщику": lambda: summarize_finance_daily(db, supplier_id=shipment.supplier_id),
+        "api: страница поставок по курсору": lambda: db.scalars(keyset_select(
+            select(Shipment), Shipment, cursor=encode_cursor(shipment.created_at, shipment.id)
+        )).unique().all(),
+        "api: расходы поставки": lambda: db.scalars(keyset_select(
+            select(Expense).where(Expense.shipment_id == shipment.id), Expense
+        )).all(),
+        "api: ставки поставщика": lambda: db.query(Rate).filter(
+            Rate.supplier_id == shipment.supplier_id, Rate.cargo_type == shipment.cargo_type
+        ).all(),
+    }
+
+
+async def async_statement(shipment_id):
+    """(statement, parameters) of a parameterized API query as asyncpg runs it"""
+    with capture_statements(async_engine.sync_engine) as statements:
+        async with AsyncSessionLocal() as db:
+            await db.scalars(select(Expense).where(Expense.shipment_id == shipment_id).limit(10))
+    await async_engine.dispose()
+    return statements[0]
+
+
+def main():
+    min_rows = DEFAULT_MIN_ROWS
+    if "--min-rows" in sys.argv:
+        min_rows = int(sys.argv[sys.argv.index("--min-rows") + 1])
+
+    db = SessionLocal()
+    try:
+        db.execute(text("ANALYZE"))
+        row_counts = dict(db.execute(
+            text("SELECT relname, reltuples FROM pg_class WHERE relkind = 'r' AND relname = ANY(:tables)"),
+            {"tables": list(CHECKED_TABLES)}
+        ).all())
+        large_tables = {table for table, rows in row_counts.items() if rows >= min_rows}
+
+        print(f"📊 Большие таблицы (от {min_rows} строк): {', '.join(sorted(large_tables)) or 'нет'}")
+
+        failed = 0
+        for name, run in hot_queries(db).items():
+            with capture_statements(db.get_bind()) as statements:
+                run()
+
+            problems = []
+            for statement, parameters in statements:
+                result = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+                plan = result.scalar()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                problems.extend(seq_scans(plan[0]["Plan"], large_tables))
+
+            if problems:
+                failed += 1
+                print(f"❌ {name}: Seq Scan по {', '.join(sorted(set(problems)))}")
+            else:
+                print(f"✅ {name}")
+
+        statement, parameters = asyncio.run(async_statement(db.scalar(select(Shipment.id).limit(1))))
+        try:
+            slow_query_log.explain(statement, parameters, async_engine.dialect.paramstyle)
+            print("✅ slow-query log: EXPLAIN ANALYZE запроса asyncpg")
+        except Exception as e:
+            failed += 1
+            print(f"❌ slow-query log: EXPLAIN ANALYZE запроса asyncpg не удался: {e}")
+
+        if failed:
+            print(f"\n❌ Проверок не пройдено: {failed}")
+            sys.exit(1)
+
+        print("\n✅ Все горячие запросы используют индексы")
+    finally:
+        # refresh_stored_finance writes - leave the database as it was
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Ночная компактизация таблицы finance_daily
+
+Пересобирает дневные итоги из shipment_finance и исправляет расхождения,
+оставленные массовыми изменениями в обход ORM.
+
+Запуск (например, из cron раз в сутки):
+cd backend
+python -m scripts.compact_finance_daily            # все дни
+python -m scripts.compact_finance_daily --days 35  # только последние 35 дней
+"""
+
+import sys
+from datetime import date, timedelta
+from app.core.database import SessionLocal
+from app.services.rollup import rebuild_finance_daily
+
+
+def main():
+    date_from = None
+    if "--days" in sys.argv:
+        days = int(sys.argv[sys.argv.index("--days") + 1])
+        date_from = date.today() - timedelta(days=days)
+
+    db = SessionLocal()
+    try:
+        period = f"с {date_from.isoformat()}" if date_from else "за всё время"
+        print(f"🔄 Пересборка finance_daily {period}...")
+        rebuild_finance_daily(db, date_from=date_from)
+        print("✅ finance_daily пересобрана")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
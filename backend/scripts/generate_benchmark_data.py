@@ -0,0 +1,305 @@
+"""
+Генерация синтетических данных для нагрузочного тестирования
+
+Поставщики, клиенты, тарифы, поставки и расходы в любом объёме (до
+миллионов поставок) с реалистичным перекосом: немногие крупные клиенты
+и поставщики дают большую часть поставок, популярные типы груза
+встречаются чаще, последние месяцы плотнее ранних.
+
+Строки генерируются частями и загружаются через COPY, затем одним
+запросом пересчитываются shipment_finance и finance_daily.
+Нужен PostgreSQL (psycopg2).
+
+Запуск:
+cd backend
+python -m scripts.generate_benchmark_data --shipments 1000000
+python -m scripts.generate_benchmark_data --suppliers 100 --clients 20000 --shipments 5000000 --expenses 2.5
+python -m scripts.generate_benchmark_data --shipments 100000 --clear   # удалить все данные перед загрузкой
+"""
+
+import argparse
+import csv
+import io
+import random
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from itertools import accumulate
+from sqlalchemy import text
+from app.core.database import SessionLocal
+from app.models.client import allocate_client_numbers, sync_client_number_seq
+from app.models.data_version import DASHBOARD_DATA, RATES_DATA, bump_data_version
+from app.models.expense import ExpenseTypeEnum
+from app.models.shipment import ShipmentStatusEnum
+from app.services.finance import rebuild_stored_finance
+from app.services.rollup import rebuild_finance_daily
+
+# Rows per COPY
+CHUNK_SIZE = 50000
+
+COUNTRIES = [("China", ["Guangzhou", "Shenzhen", "Yiwu", "Shanghai"]), ("Turkey", ["Istanbul", "Izmir"]), ("UAE", ["Dubai", "Sharjah"])]
+
+# Cargo type -> (unit, typical sell rate, popularity)
+CARGO_TYPES = {
+    "electronics": ("kg", 4.5, 30),
+    "clothing": ("kg", 2.2, 25),
+    "shoes": ("kg", 2.6, 12),
+    "perfumes": ("kg", 3.8, 8),
+    "cosmetics": ("kg", 3.2, 7),
+    "toys": ("cbm", 320.0, 6),
+    "furniture": ("cbm", 280.0, 5),
+    "auto parts": ("kg", 2.9, 4),
+    "textile": ("kg", 2.0, 4),
+    "household goods": ("cbm", 300.0, 3),
+    "tools": ("kg", 2.4, 3),
+    "lighting": ("cbm", 340.0, 2),
+}
+
+EXPENSE_AMOUNTS = {
+    ExpenseTypeEnum.CUSTOMS: (50, 2000),
+    ExpenseTypeEnum.DELIVERY: (20, 600),
+    ExpenseTypeEnum.AGENT_FEE: (10, 300),
+    ExpenseTypeEnum.WAREHOUSE: (5, 200),
+}
+
+
+def zipf_weights(count: int, exponent: float):
+    """Cumulative weights where the k-th item is picked ~1/k^exponent as often"""
+    return list(accumulate(1.0 / (rank ** exponent) for rank in range(1, count + 1)))
+
+
+def copy_rows(db, table: str, columns, rows) -> int:
+    """COPY rows (tuples in column order, None as NULL) into a table"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    count = 0
+    for row in rows:
+        writer.writerow(["" if value is None else value for value in row])
+        count += 1
+    buffer.seek(0)
+
+    with db.connection().connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    return count
+
+
+def copy_chunked(db, table: str, columns, rows, total: int) -> None:
+    started = time.perf_counter()
+    loaded = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == CHUNK_SIZE:
+            loaded += copy_rows(db, table, columns, chunk)
+            chunk = []
+            print(f"   ... {table}: {loaded}/{total}", end="\r")
+    if chunk:
+        loaded += copy_rows(db, table, columns, chunk)
+    db.commit()
+    print(f"\r✅ {table}: {loaded} строк за {time.perf_counter() - started:.1f} с")
+
+
+def clear_all_data(db) -> None:
+    print("🗑️  Очистка существующих данных...")
+    db.execute(text("TRUNCATE expenses, shipment_finance, finance_daily, shipments, rates, clients, suppliers CASCADE"))
+    db.commit()
+
+
+def random_timestamp(rng: random.Random, start: datetime, span: float) -> datetime:
+    # Business grows: later days get more shipments
+    return start + timedelta(seconds=span * rng.random() ** 0.6)
+
+
+def generate(db, args) -> None:
+    rng = random.Random(args.seed)
+    now = datetime.now(timezone.utc)
+    start = now - timedelta(days=365 * args.years)
+    span = (now - start).total_seconds()
+    run = uuid.uuid4().hex[:6].upper()
+
+    # Suppliers: each ships a handful of cargo types
+    supplier_ids = [uuid.uuid4() for _ in range(args.suppliers)]
+    supplier_cargo = {}
+
+    def suppliers():
+        for number, supplier_id in enumerate(supplier_ids, 1):
+            country, cities = rng.choice(COUNTRIES)
+            supplier_cargo[supplier_id] = rng.sample(list(CARGO_TYPES), rng.randint(2, 6))
+            yield (
+                supplier_id, f"Supplier {run}-{number}", country, rng.choice(cities),
+                f"Contact {number}", f"supplier{number}@example.com", random_timestamp(rng, start, span * 0.1)
+            )
+
+    copy_chunked(
+        db, "suppliers", ("id", "name", "country", "city", "contact_person", "contact_info", "created_at"),
+        suppliers(), args.suppliers
+    )
+
+    client_ids = [uuid.uuid4() for _ in range(args.clients)]
+    client_numbers = allocate_client_numbers(db.connection(), args.clients)
+
+    def clients():
+        for number, (client_id, client_number) in enumerate(zip(client_ids, client_numbers), 1):
+            yield (
+                client_id, client_number, f"Client {run}-{number}", f"Company {number} LLC",
+                f"+7900{number:07d}", random_timestamp(rng, start, span)
+            )
+
+    copy_chunked(
+        db, "clients", ("id", "client_number", "name", "company_name", "contact_info", "created_at"),
+        clients(), args.clients
+    )
+    sync_client_number_seq(db.connection())
+    db.commit()
+
+    # Base rates per (supplier, cargo type) for every year, plus own rates
+    # of the largest clients; shipments use the base rate of their year
+    years = list(range(start.year, now.year + 1))
+    base_rates = {}
+    rate_count = 0
+
+    def rates():
+        nonlocal rate_count
+        for supplier_id, cargo_types in supplier_cargo.items():
+            for cargo_type in cargo_types:
+                unit, typical, _ = CARGO_TYPES[cargo_type]
+                for year in years:
+                    sell = round(typical * rng.uniform(0.8, 1.2) * (1 + 0.05 * (year - years[0])), 2)
+                    buy = round(sell * rng.uniform(0.7, 0.9), 2)
+                    rate_id = uuid.uuid4()
+                    base_rates[supplier_id, cargo_type, year] = (rate_id, sell)
+                    rate_count += 1
+                    yield (
+                        rate_id, cargo_type, supplier_id, None, buy, sell, "USD", unit,
+                        date(year, 1, 1), date(year, 12, 31), datetime(year, 1, 1, tzinfo=timezone.utc)
+                    )
+                    top_clients = client_ids[:max(1, args.clients // 50)]
+                    for client_id in rng.sample(top_clients, min(3, len(top_clients))):
+                        rate_count += 1
+                        yield (
+                            uuid.uuid4(), cargo_type, supplier_id, client_id, buy, round(sell * 0.95, 2), "USD", unit,
+                            date(year, 1, 1), date(year, 12, 31), datetime(year, 1, 1, tzinfo=timezone.utc)
+                        )
+
+    rate_columns = (
+        "id", "cargo_type", "supplier_id", "client_id", "buy_rate", "sell_rate", "currency", "unit",
+        "valid_from", "valid_to", "created_at"
+    )
+    copy_chunked(db, "rates", rate_columns, rates(), len(supplier_cargo) * len(years) * 4)
+    print(f"   тарифов: {rate_count}")
+
+    client_weights = zipf_weights(args.clients, 1.1)
+    supplier_weights = zipf_weights(args.suppliers, 0.8)
+    cargo_weights = {
+        supplier_id: list(accumulate(CARGO_TYPES[cargo_type][2] for cargo_type in cargo_types))
+        for supplier_id, cargo_types in supplier_cargo.items()
+    }
+    today = now.date()
+    expense_types = list(EXPENSE_AMOUNTS)
+    whole, fraction = int(args.expenses), args.expenses - int(args.expenses)
+
+    def shipment_with_expenses(number):
+        supplier_id = rng.choices(supplier_ids, cum_weights=supplier_weights)[0]
+        cargo_type = rng.choices(supplier_cargo[supplier_id], cum_weights=cargo_weights[supplier_id])[0]
+        client_id = rng.choices(client_ids, cum_weights=client_weights)[0]
+        created_at = random_timestamp(rng, start, span)
+        rate_id, _ = base_rates[supplier_id, cargo_type, created_at.year]
+
+        departure = created_at.date() + timedelta(days=rng.randint(1, 14))
+        arrival = departure + timedelta(days=rng.randint(10, 45))
+        if departure > today:
+            status = ShipmentStatusEnum.PLANNED
+        elif arrival > today:
+            status = ShipmentStatusEnum.IN_TRANSIT
+        else:
+            status = ShipmentStatusEnum.DELIVERED
+
+        unit = CARGO_TYPES[cargo_type][0]
+        quantity = round(rng.lognormvariate(5.5, 1.0) if unit == "kg" else rng.lognormvariate(1.5, 0.8), 2)
+
+        shipment_id = uuid.uuid4()
+        shipment = (
+            shipment_id, f"BM{run}-{number:08d}", supplier_id, client_id, rate_id, cargo_type, quantity,
+            departure, arrival if status == ShipmentStatusEnum.DELIVERED else None, status.value, created_at
+        )
+
+        expenses = []
+        for _ in range(whole + (rng.random() < fraction)):
+            expense_type = rng.choice(expense_types)
+            low, high = EXPENSE_AMOUNTS[expense_type]
+            expense_date = departure + timedelta(days=rng.randint(0, 30))
+            expenses.append((
+                uuid.uuid4(), shipment_id, expense_type.value, round(rng.uniform(low, high), 2), "USD",
+                expense_date, datetime.combine(expense_date, datetime.min.time(), timezone.utc)
+            ))
+        return shipment, expenses
+
+    shipment_columns = (
+        "id", "shipment_code", "supplier_id", "client_id", "rate_id", "cargo_type", "quantity",
+        "departure_date", "arrival_date", "status", "created_at"
+    )
+    expense_columns = ("id", "shipment_id", "expense_type", "amount", "currency", "expense_date", "created_at")
+
+    # Shipments and their expenses chunk by chunk: memory stays flat at any scale
+    started = time.perf_counter()
+    expense_count = 0
+    for first in range(1, args.shipments + 1, CHUNK_SIZE):
+        shipments, expenses = [], []
+        for number in range(first, min(first + CHUNK_SIZE, args.shipments + 1)):
+            shipment, shipment_expenses = shipment_with_expenses(number)
+            shipments.append(shipment)
+            expenses.extend(shipment_expenses)
+        copy_rows(db, "shipments", shipment_columns, shipments)
+        expense_count += copy_rows(db, "expenses", expense_columns, expenses)
+        db.commit()
+        print(f"   ... shipments: {first + len(shipments) - 1}/{args.shipments}", end="\r")
+    print(f"\r✅ shipments: {args.shipments}, expenses: {expense_count} строк за {time.perf_counter() - started:.1f} с")
+
+    print("🔄 Пересчёт shipment_finance и finance_daily...")
+    started = time.perf_counter()
+    rebuild_stored_finance(db)
+    rebuild_finance_daily(db)
+    bump_data_version(db, DASHBOARD_DATA)
+    bump_data_version(db, RATES_DATA)
+    db.commit()
+    print(f"✅ Пересчёт за {time.perf_counter() - started:.1f} с")
+
+    print("📊 ANALYZE...")
+    db.execute(text("ANALYZE"))
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Синтетические данные для нагрузочного тестирования")
+    parser.add_argument("--suppliers", type=int, default=50)
+    parser.add_argument("--clients", type=int, default=5000)
+    parser.add_argument("--shipments", type=int, default=100000)
+    parser.add_argument("--expenses", type=float, default=2.0, help="среднее число расходов на поставку")
+    parser.add_argument("--years", type=int, default=3, help="период, за который создаются поставки")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--clear", action="store_true", help="удалить все данные перед загрузкой")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if db.get_bind().dialect.driver != "psycopg2":
+            print("❌ Нужен PostgreSQL с драйвером psycopg2 (загрузка через COPY)")
+            return 1
+
+        started = time.perf_counter()
+        if args.clear:
+            clear_all_data(db)
+        generate(db, args)
+        print(f"\n🎉 Готово за {time.perf_counter() - started:.0f} с")
+        return 0
+    except Exception as e:
+        print(f"\n❌ Ошибка: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
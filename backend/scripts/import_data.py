@@ -0,0 +1,81 @@
+"""
+Импорт ставок, поставок и расходов из CSV / XLSX
+
+Файл читается потоково, частями по 5000 строк: каждая часть загружается
+через COPY во временную таблицу и переносится одним INSERT ... SELECT.
+Прогресс сохраняется после каждой части - прерванный импорт того же
+файла продолжается с места остановки.
+
+Колонки (первая строка файла):
+rates:     cargo_type, supplier | supplier_id, client | client_id (необяз.),
+           buy_rate, sell_rate, currency, unit, valid_from, valid_to
+shipments: shipment_code, supplier | supplier_id, client | client_id,
+           rate_id (необяз., иначе ставка по поставщику, клиенту, грузу
+           и дате отправки),
+           cargo_type, quantity, departure_date, arrival_date, status
+expenses:  shipment_code | shipment_id, expense_type, amount, currency,
+           comment, expense_date
+
+supplier - название поставщика, client - номер клиента (CL-0001).
+
+Запуск:
+cd backend
+python -m scripts.import_data rates tariffs.xlsx
+python -m scripts.import_data shipments shipments.csv
+python -m scripts.import_data expenses expenses.csv --force   # импортировать файл повторно
+"""
+
+import sys
+from app.core.database import SessionLocal
+from app.models.import_job import ImportEntityEnum, ImportStatusEnum
+from app.services.importer import claim_job, file_checksum, find_or_create_job, run_import
+
+
+def print_progress(job):
+    print(f"   ... строк: {job.rows_processed}, загружено: {job.rows_imported}, с ошибками: {job.rows_failed}")
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    entities = [entity.value for entity in ImportEntityEnum]
+    if len(args) != 2 or args[0] not in entities:
+        print(f"Использование: python -m scripts.import_data {{{'|'.join(entities)}}} ФАЙЛ [--force]")
+        sys.exit(1)
+
+    entity, path = ImportEntityEnum(args[0]), args[1]
+
+    db = SessionLocal()
+    try:
+        job = find_or_create_job(db, entity, path, file_checksum(path), force="--force" in sys.argv)
+        claimed = job.status != ImportStatusEnum.COMPLETED and claim_job(db, job)
+        db.commit()
+
+        if job.status == ImportStatusEnum.COMPLETED:
+            print(f"✅ Файл уже импортирован (задача {job.id}), для повторного импорта добавьте --force")
+            return
+        if not claimed:
+            print(f"❌ Файл уже импортируется (задача {job.id})")
+            sys.exit(1)
+        if job.rows_processed:
+            print(f"🔄 Продолжение импорта с строки {job.rows_processed + 2} (задача {job.id})")
+        else:
+            print(f"📥 Импорт {entity.value} из {path} (задача {job.id})")
+
+        try:
+            run_import(db, job, path, on_progress=print_progress)
+        except Exception as exc:
+            print(f"❌ Импорт прерван: {exc}")
+            print("   Запустите команду ещё раз, чтобы продолжить")
+            sys.exit(1)
+
+        print(f"\n✅ Загружено: {job.rows_imported}, с ошибками: {job.rows_failed}")
+        for error in job.errors:
+            print(f"   строка {error['line']}: {'; '.join(error['errors'])}")
+        if job.rows_failed > len(job.errors):
+            print(f"   ... и ещё {job.rows_failed - len(job.errors)}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
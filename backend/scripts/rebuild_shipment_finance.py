@@ -0,0 +1,49 @@
+"""
+Скрипт пересчёта таблицы shipment_finance
+
+Пересчитывает сохранённые финансовые показатели всех поставок
+и сверяет их с расчётом "на лету".
+
+Запуск:
+cd backend
+python -m scripts.rebuild_shipment_finance
+python -m scripts.rebuild_shipment_finance --verify-only
+"""
+
+import sys
+from app.core.database import SessionLocal
+from app.services.finance import rebuild_stored_finance, verify_stored_finance
+from app.services.rollup import rebuild_finance_daily
+
+
+def main():
+    verify_only = "--verify-only" in sys.argv
+    db = SessionLocal()
+
+    try:
+        if not verify_only:
+            print("🔄 Пересчёт shipment_finance...")
+            rebuild_stored_finance(db)
+            rebuild_finance_daily(db)
+            print("✅ Пересчёт завершён (включая finance_daily)")
+
+        print("\n🔍 Сверка с расчётом на лету...")
+        mismatches = verify_stored_finance(db)
+
+        if not mismatches:
+            print("✅ Расхождений нет")
+            return 0
+
+        for mismatch in mismatches[:50]:
+            print(
+                f"❌ {mismatch['shipment_id']}: {mismatch['field'] or 'нет строки'} "
+                f"сохранено={mismatch['stored']} расчёт={mismatch['live']}"
+            )
+        print(f"\n❌ Всего расхождений: {len(mismatches)}")
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,7 +10,7 @@ from datetime import date, datetime, timedelta
 from sqlalchemy.orm import Session
 from app.core.database import SessionLocal
 from app.models.supplier import Supplier
-from app.models.client import Client
+from app.models.client import Client, sync_client_number_seq
 from app.models.rate import Rate
 from app.models.shipment import Shipment
 from app.models.expense import Expense
@@ -113,6 +113,9 @@ def create_clients(db: Session):
     for client in clients:
         db.add(client)
 
+    # Numbers above are explicit - new clients continue after them
+    db.flush()
+    sync_client_number_seq(db.connection())
     db.commit()
 
     for client in clients: